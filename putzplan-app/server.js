@@ -4,7 +4,10 @@ import path from 'path';
 import { fileURLToPath } from 'url';
 import { spawn, exec } from 'child_process';
 import { promisify } from 'util';
-import http from 'http';
+import { DataStore, writeFileAtomic } from './server/dataStore.js';
+import { SyncHub } from './server/syncHub.js';
+import { WahaClient } from './server/wahaClient.js';
+import { NotificationQueue } from './server/notificationQueue.js';
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
@@ -28,48 +31,6 @@ app.use(express.json({ limit: '10mb' }));
 
 // WAHA API Management Functions
 
-/**
- * Prüft ob WAHA API erreichbar ist
- */
-async function checkWahaStatus() {
-  return new Promise((resolve) => {
-    const options = {
-      hostname: 'localhost',
-      port: 3000,
-      path: '/api/sessions',
-      method: 'GET',
-      headers: {
-        'X-Api-Key': WAHA_CONFIG.apiKey,
-        'Content-Type': 'application/json'
-      },
-      timeout: 2000
-    };
-
-    const req = http.request(options, (res) => {
-      if (res.statusCode === 200) {
-        console.log('✅ WAHA API ist erreichbar');
-        resolve(true);
-      } else {
-        console.log('❌ WAHA API antwortet nicht korrekt:', res.statusCode);
-        resolve(false);
-      }
-    });
-
-    req.on('error', (error) => {
-      console.log('❌ WAHA API ist nicht erreichbar:', error.message);
-      resolve(false);
-    });
-
-    req.on('timeout', () => {
-      console.log('❌ WAHA API Timeout');
-      req.destroy();
-      resolve(false);
-    });
-
-    req.end();
-  });
-}
-
 /**
  * Startet WAHA API via Docker Compose
  */
@@ -112,41 +73,15 @@ async function startWahaAPI() {
   }
 }
 
-/**
- * Stellt sicher dass WAHA API läuft (prüfen + starten falls nötig)
- */
-async function ensureWahaRunning() {
-  console.log('🔍 Prüfe WAHA Status...');
-  
-  const isRunning = await checkWahaStatus();
-  if (isRunning) {
-    console.log('✅ WAHA läuft bereits');
-    return true;
-  }
-  
-  console.log('🚀 WAHA läuft nicht, versuche zu starten...');
-  try {
-    const started = await startWahaAPI();
-    
-    if (started) {
-      // Verify it's actually running
-      const isRunningNow = await checkWahaStatus();
-      if (isRunningNow) {
-        console.log('✅ WAHA erfolgreich gestartet');
-        return true;
-      } else {
-        console.log('❌ WAHA Start fehlgeschlagen - nicht erreichbar');
-        return false;
-      }
-    }
-  } catch (error) {
-    console.log('⚠️ WAHA konnte nicht gestartet werden:', error.message);
-    console.log('💡 Server läuft weiter ohne WhatsApp Integration');
-    return false;
-  }
-  
-  return false;
-}
+// Keep-Alive-Verbindung + gecachter Health-/Session-Status; startet WAHA bei Bedarf im Hintergrund
+const wahaClient = new WahaClient({
+  baseUrl: WAHA_CONFIG.baseUrl,
+  apiKey: WAHA_CONFIG.apiKey,
+  start: startWahaAPI
+});
+
+// Ausgehende WhatsApp-Nachrichten: gebündelt, mit Retry, ohne dass ein Request darauf wartet
+const notificationQueue = new NotificationQueue({ client: wahaClient });
 
 // Ensure data directory exists
 async function ensureDataDir() {
@@ -161,40 +96,44 @@ async function ensureDataDir() {
   }
 }
 
+const INITIAL_STATE = {
+  currentUser: null,
+  currentWG: null,
+  wgs: {},
+  users: {},
+  tasks: {},
+  executions: {},
+  ratings: {},
+  notifications: {},
+  monthlyStats: {},
+  taskSuggestions: [],
+  isLoading: false,
+  lastSyncAt: undefined,
+  absences: {},
+  temporaryResidents: {},
+  postExecutionRatings: {},
+  currentPeriod: undefined,
+  debugMode: false
+};
+
+// App-State: im Speicher, Änderungen als Journal, periodisch kompaktiert
+const dataStore = new DataStore({
+  dir: DATA_DIR,
+  file: path.basename(DATA_FILE),
+  initialState: INITIAL_STATE
+});
+
+// Push-Kanal: verteilt jede Änderung als Delta an alle Geräte
+const syncHub = new SyncHub({ store: dataStore });
+
+// Schreibender Client (für Versionsvektor / Echo-Erkennung im Sync-Kanal)
+const syncMeta = (req) => ({ origin: req.get('X-Sync-Client'), clock: req.get('X-Sync-Clock') });
+
 // Initialize data files if they don't exist
 async function initializeDataFiles() {
-  console.log(`📄 Checking data files...`);
-  try {
-    await fs.access(DATA_FILE);
-    console.log(`✅ Data file exists: ${DATA_FILE}`);
-  } catch {
-    console.log(`📄 Creating initial data file: ${DATA_FILE}`);
-    const initialData = {
-      version: '1.0',
-      state: {
-        currentUser: null,
-        currentWG: null,
-        wgs: {},
-        users: {},
-        tasks: {},
-        executions: {},
-        ratings: {},
-        notifications: {},
-        monthlyStats: {},
-        taskSuggestions: [],
-        isLoading: false,
-        lastSyncAt: undefined,
-        absences: {},
-        temporaryResidents: {},
-        postExecutionRatings: {},
-        currentPeriod: undefined,
-        debugMode: false
-      },
-      savedAt: new Date().toISOString()
-    };
-    await fs.writeFile(DATA_FILE, JSON.stringify(initialData, null, 2));
-    console.log(`✅ Initial data file created`);
-  }
+  console.log(`📄 Loading data store...`);
+  await dataStore.open();
+  console.log(`✅ Data loaded: ${DATA_FILE} (seq ${dataStore.seq}, ${dataStore.journalEntries} journal entries)`);
 
   try {
     await fs.access(SETTINGS_FILE);
@@ -207,7 +146,7 @@ async function initializeDataFiles() {
       language: 'de',
       dashboardWidth: 'normal'
     };
-    await fs.writeFile(SETTINGS_FILE, JSON.stringify(initialSettings, null, 2));
+    await writeFileAtomic(SETTINGS_FILE, JSON.stringify(initialSettings, null, 2));
     console.log(`✅ Initial settings file created`);
   }
 }
@@ -217,8 +156,9 @@ async function initializeDataFiles() {
 // WAHA API Management Routes
 app.get('/api/waha/status', async (req, res) => {
   try {
-    const isRunning = await checkWahaStatus();
-    res.json({ running: isRunning, message: isRunning ? 'WAHA ist verfügbar' : 'WAHA ist nicht erreichbar' });
+    const health = await wahaClient.health();
+    const isRunning = health.reachable;
+    res.json({ running: isRunning, session: health.session, starting: health.starting, message: isRunning ? 'WAHA ist verfügbar' : 'WAHA ist nicht erreichbar' });
   } catch (error) {
     res.status(500).json({ running: false, error: error.message });
   }
@@ -226,7 +166,10 @@ app.get('/api/waha/status', async (req, res) => {
 
 app.post('/api/waha/start', async (req, res) => {
   try {
-    const started = await ensureWahaRunning();
+    let started = (await wahaClient.health({ force: true })).reachable;
+    if (!started && await startWahaAPI()) {
+      started = (await wahaClient.health({ force: true })).reachable;
+    }
     if (started) {
       res.json({ success: true, message: 'WAHA erfolgreich gestartet' });
     } else {
@@ -237,45 +180,108 @@ app.post('/api/waha/start', async (req, res) => {
   }
 });
 
+// Antwortet sofort; ein nötiger Start läuft im Hintergrund (`starting: true`)
 app.post('/api/waha/ensure', async (req, res) => {
   try {
-    const running = await ensureWahaRunning();
+    const health = await wahaClient.ensureRunning();
+    const running = health.reachable;
     res.json({ 
       success: running, 
-      message: running ? 'WAHA läuft' : 'WAHA konnte nicht gestartet werden' 
+      starting: health.starting,
+      message: running ? 'WAHA läuft' : (health.starting ? 'WAHA wird gestartet' : 'WAHA konnte nicht gestartet werden')
     });
   } catch (error) {
     res.status(500).json({ success: false, error: error.message });
   }
 });
 
-// Get app data
-app.get('/api/data', async (req, res) => {
+// Benachrichtigung einreihen (202: wird asynchron gesendet)
+app.post('/api/whatsapp/notify', (req, res) => {
   try {
-    const data = await fs.readFile(DATA_FILE, 'utf8');
-    res.json(JSON.parse(data));
+    const { chatId, title, details, key } = req.body || {};
+    const queued = notificationQueue.enqueue({ chatId, title, details, key });
+    res.status(202).json({ success: true, ...queued });
+  } catch (error) {
+    if (error instanceof TypeError) {
+      return res.status(400).json({ success: false, error: error.message });
+    }
+    res.status(503).json({ success: false, error: error.message });
+  }
+});
+
+// Kennzahlen der WhatsApp-Warteschlange
+app.get('/api/whatsapp/metrics', (req, res) => {
+  res.json(notificationQueue.metrics());
+});
+
+// Get app data (aus dem Speicher; unverändert -> 304 per If-None-Match)
+app.get('/api/data', (req, res) => {
+  try {
+    const { body, etag } = dataStore.read();
+    res.set('ETag', etag);
+    res.set('Cache-Control', 'no-cache');
+    const ifNoneMatch = req.get('If-None-Match');
+    if (ifNoneMatch && (ifNoneMatch.trim() === '*' || ifNoneMatch.split(',').some(tag => tag.trim() === etag))) {
+      return res.status(304).end();
+    }
+    res.type('application/json').send(body);
   } catch (error) {
     console.error('Error reading data:', error);
     res.status(500).json({ error: 'Failed to read data' });
   }
 });
 
-// Save app data
+// Apply deltas (ops from serverDataManager.saveToServer)
+app.patch('/api/data', async (req, res) => {
+  try {
+    const result = await dataStore.patch(req.body && req.body.ops, syncMeta(req), { ifMatch: req.get('If-Match') });
+    res.set('ETag', result.etag);
+    res.json({ success: true, ...result });
+  } catch (error) {
+    if (error instanceof TypeError) {
+      return res.status(400).json({ error: error.message });
+    }
+    if (error.status === 412) {
+      return res.status(412).json({ error: error.message, etag: error.etag });
+    }
+    console.error('Error saving data:', error);
+    res.status(500).json({ error: 'Failed to save data' });
+  }
+});
+
+// Save app data (voller State; journalisiert wird nur die Differenz)
 app.post('/api/data', async (req, res) => {
   try {
-    const dataToSave = {
-      version: '1.0',
-      state: req.body,
-      savedAt: new Date().toISOString()
-    };
-    await fs.writeFile(DATA_FILE, JSON.stringify(dataToSave, null, 2));
-    res.json({ success: true, savedAt: dataToSave.savedAt });
+    const result = await dataStore.replace(req.body, syncMeta(req));
+    res.set('ETag', result.etag);
+    res.json({ success: true, ...result });
   } catch (error) {
+    if (error instanceof TypeError) {
+      return res.status(400).json({ error: error.message });
+    }
     console.error('Error saving data:', error);
     res.status(500).json({ error: 'Failed to save data' });
   }
 });
 
+// Sync-Kanal (Server-Sent Events); Last-Event-ID hat beim Reconnect Vorrang
+app.get('/api/sync/events', (req, res) => {
+  syncHub.attach(req, res, req.get('Last-Event-ID') ?? req.query.since);
+});
+
+// Verpasste Deltas nachholen; 410 wenn der Puffer nicht so weit zurückreicht
+app.get('/api/sync/changes', (req, res) => {
+  const since = Number(req.query.since);
+  if (!Number.isInteger(since) || since < 0) {
+    return res.status(400).json({ error: 'since must be a non-negative integer' });
+  }
+  const deltas = syncHub.changesSince(since);
+  if (!deltas) {
+    return res.status(410).json({ error: 'Changes no longer available', ...syncHub.version });
+  }
+  res.json({ ...syncHub.version, deltas });
+});
+
 // Get settings
 app.get('/api/settings', async (req, res) => {
   try {
@@ -290,7 +296,7 @@ app.get('/api/settings', async (req, res) => {
 // Save settings
 app.post('/api/settings', async (req, res) => {
   try {
-    await fs.writeFile(SETTINGS_FILE, JSON.stringify(req.body, null, 2));
+    await writeFileAtomic(SETTINGS_FILE, JSON.stringify(req.body, null, 2));
     res.json({ success: true });
   } catch (error) {
     console.error('Error saving settings:', error);
@@ -350,7 +356,7 @@ async function startServer() {
     // Auto-start WAHA API (graceful failure if Docker not available)
     console.log('🔄 WAHA Status wird überprüft...');
     try {
-      const wahaRunning = await checkWahaStatus();
+      const wahaRunning = (await wahaClient.health()).reachable;
       if (wahaRunning) {
         console.log('✅ WAHA läuft bereits');
       } else {
@@ -380,7 +386,15 @@ async function startServer() {
     // Graceful shutdown
     process.on('SIGINT', () => {
       console.log('\n📴 Shutting down server...');
-      server.close(() => {
+      syncHub.close();
+      notificationQueue.close();
+      wahaClient.close();
+      server.close(async () => {
+        try {
+          await dataStore.close();
+        } catch (error) {
+          console.error('❌ Failed to compact data on shutdown:', error);
+        }
         console.log('✅ Server stopped');
         process.exit(0);
       });
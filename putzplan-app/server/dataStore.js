@@ -0,0 +1,360 @@
+import fs from 'fs/promises';
+import path from 'path';
+import crypto from 'crypto';
+
+// ========================================
+// DATENSPEICHER: SNAPSHOT + JOURNAL
+// ========================================
+
+/**
+ * Schreibt eine Datei atomar: erst in eine temporäre Datei daneben, dann
+ * fsync + rename. Leser sehen immer entweder die alte oder die neue Version.
+ */
+export async function writeFileAtomic(file, text) {
+  const tmp = `${file}.tmp-${process.pid}-${crypto.randomBytes(4).toString('hex')}`;
+  const handle = await fs.open(tmp, 'w');
+  try {
+    await handle.writeFile(text);
+    await handle.sync();
+  } finally {
+    await handle.close();
+  }
+  try {
+    await fs.rename(tmp, file);
+  } catch (error) {
+    await fs.rm(tmp, { force: true });
+    throw error;
+  }
+  // Persist the rename itself; not supported on every platform
+  try {
+    const dir = await fs.open(path.dirname(file), 'r');
+    try { await dir.sync(); } finally { await dir.close(); }
+  } catch { /* best effort */ }
+}
+
+/**
+ * Prüft eine Liste von Delta-Ops (`{ path, value }` bzw. `{ path, delete: true }`,
+ * siehe src/services/stateDelta.ts) und wirft bei ungültigem Format.
+ */
+export function validateOps(ops) {
+  if (!Array.isArray(ops)) throw new TypeError('ops must be an array');
+  ops.forEach((op, i) => {
+    if (!op || !Array.isArray(op.path) || op.path.length === 0 ||
+        !op.path.every(key => typeof key === 'string' && key !== '__proto__' && key !== 'constructor' && key !== 'prototype')) {
+      throw new TypeError(`invalid path in op ${i}`);
+    }
+    if (op.delete !== true && !('value' in op)) throw new TypeError(`op ${i} needs a value or delete: true`);
+  });
+}
+
+/** Wendet Delta-Ops in Reihenfolge auf `state` an (in place). */
+export function applyOps(state, ops) {
+  ops.forEach(op => {
+    let target = state;
+    for (let i = 0; i < op.path.length - 1; i++) {
+      const key = op.path[i];
+      if (!target[key] || typeof target[key] !== 'object') {
+        if (op.delete === true) return;
+        target[key] = {};
+      }
+      target = target[key];
+    }
+    const last = op.path[op.path.length - 1];
+    if (op.delete === true) delete target[last];
+    else target[last] = op.value;
+  });
+  return state;
+}
+
+const ENTITY_COLLECTIONS = new Set([
+  'wgs', 'users', 'tasks', 'executions', 'ratings', 'notifications',
+  'monthlyStats', 'absences', 'temporaryResidents', 'postExecutionRatings'
+]);
+
+const sameJson = (a, b) => a === b || JSON.stringify(a) === JSON.stringify(b);
+
+/**
+ * Ops, die den gespeicherten State in einen per POST geschickten vollen State
+ * überführen. Entity-Maps werden Eintrag für Eintrag verglichen, damit auch
+ * ein voller Upload nur die tatsächlich geänderten Datensätze journalisiert.
+ */
+export function diffStates(prev, next) {
+  const ops = [];
+  Object.keys(prev).forEach(key => {
+    if (!(key in next)) ops.push({ path: [key], delete: true });
+  });
+  Object.keys(next).forEach(key => {
+    const a = prev[key];
+    const b = next[key];
+    const collection = ENTITY_COLLECTIONS.has(key) && a && b && typeof a === 'object' && typeof b === 'object';
+    if (!collection) {
+      if (!(key in prev) || !sameJson(a, b)) ops.push({ path: [key], value: b });
+      return;
+    }
+    Object.keys(a).forEach(id => {
+      if (!(id in b)) ops.push({ path: [key, id], delete: true });
+    });
+    Object.keys(b).forEach(id => {
+      if (!(id in a) || !sameJson(a[id], b[id])) ops.push({ path: [key, id], value: b[id] });
+    });
+  });
+  return ops;
+}
+
+/**
+ * Hält den App-State im Speicher und persistiert Änderungen als Journal.
+ *
+ * - `data/putzplan-data.json` ist der letzte kompaktierte Snapshot (mit `seq`).
+ * - `data/putzplan-data.journal` enthält danach jede Änderung als eine Zeile
+ *   `{ seq, at, ops }` (plus `origin`/`clock` des schreibenden Clients).
+ *   Schreiben hängt nur an; ein abgerissener letzter
+ *   Eintrag nach einem Absturz wird beim Start verworfen.
+ * - Die Kompaktierung schreibt einen neuen Snapshot atomar (Temp-Datei +
+ *   rename), legt den vorherigen unter `data/snapshots/` ab und behält davon
+ *   nur die neuesten `keepSnapshots`.
+ *
+ * Lesen kostet keinen Plattenzugriff: `read()` liefert den serialisierten
+ * State aus dem Speicher samt ETag, der sich mit jeder Änderung ändert.
+ */
+export class DataStore {
+  constructor({
+    dir,
+    file = 'putzplan-data.json',
+    initialState = {},
+    compactEvery = 500,
+    compactBytes = 8 * 1024 * 1024,
+    compactIntervalMs = 5 * 60 * 1000,
+    keepSnapshots = 5
+  }) {
+    this.file = path.join(dir, file);
+    this.journalFile = path.join(dir, file.replace(/\.json$/, '') + '.journal');
+    this.snapshotDir = path.join(dir, 'snapshots');
+    this.initialState = initialState;
+    this.options = { compactEvery, compactBytes, compactIntervalMs, keepSnapshots };
+
+    this.version = '1.0';
+    this.state = null;
+    this.savedAt = null;
+    this.seq = 0;
+    this.snapshotSeq = 0;
+    this.base = '';
+    this.journalEntries = 0;
+    this.journalBytes = 0;
+    this.journalHandle = null;
+    this.body = null;
+    this.queue = Promise.resolve();
+    this.timer = null;
+    this.listeners = new Set();
+  }
+
+  /** Lädt Snapshot + Journal; legt den Snapshot an, falls er fehlt. */
+  async open() {
+    let raw;
+    try {
+      raw = await fs.readFile(this.file, 'utf8');
+    } catch (error) {
+      if (error.code !== 'ENOENT') throw error;
+      raw = JSON.stringify({ version: this.version, state: this.initialState, savedAt: new Date().toISOString(), seq: 0 });
+      await writeFileAtomic(this.file, raw);
+    }
+    const data = JSON.parse(raw);
+    this.version = data.version || '1.0';
+    this.state = data.state || {};
+    this.savedAt = data.savedAt || null;
+    this.seq = this.snapshotSeq = Number(data.seq) || 0;
+    // Distinguishes ETags across snapshots that were replaced outside the store
+    this.base = crypto.createHash('sha1').update(raw).digest('hex').slice(0, 8);
+
+    const torn = await this.replayJournal();
+    if (torn) await this.compact();
+
+    if (this.options.compactIntervalMs > 0) {
+      this.timer = setInterval(() => {
+        if (this.journalEntries > 0) this.compact().catch(error => console.error('❌ Compaction failed:', error));
+      }, this.options.compactIntervalMs);
+      this.timer.unref?.();
+    }
+    return this;
+  }
+
+  get etag() {
+    return `"${this.base}-${this.seq}"`;
+  }
+
+  /** Serialisierter State (`{ version, state, savedAt, seq }`) und ETag, ohne Plattenzugriff. */
+  read() {
+    if (this.body === null) {
+      this.body = JSON.stringify({ version: this.version, state: this.state, savedAt: this.savedAt, seq: this.seq });
+    }
+    return { body: this.body, etag: this.etag };
+  }
+
+  /**
+   * Wendet Delta-Ops an und hängt sie ans Journal. `meta.origin` / `meta.clock`
+   * kennzeichnen den schreibenden Client (siehe server/syncHub.js).
+   *
+   * Mit `ifMatch` wird erst innerhalb der serialisierten Übernahme gegen den
+   * aktuellen ETag geprüft; passt er nicht, wird mit einem Fehler
+   * (`status` 412, `etag`) abgelehnt.
+   */
+  patch(ops, meta = {}, { ifMatch } = {}) {
+    validateOps(ops);
+    return this.enqueue(() => {
+      if (ifMatch && ifMatch !== this.etag) {
+        const error = new Error('State changed');
+        error.status = 412;
+        error.etag = this.etag;
+        throw error;
+      }
+      return this.commit(ops, meta);
+    });
+  }
+
+  /** Ersetzt den ganzen State (altes POST); journalisiert nur die Differenz. */
+  replace(state, meta = {}) {
+    if (!state || typeof state !== 'object' || Array.isArray(state)) {
+      return Promise.reject(new TypeError('state must be an object'));
+    }
+    return this.enqueue(() => this.commit(diffStates(this.state, state), meta));
+  }
+
+  /** Ruft `listener(entry)` nach jeder übernommenen Änderung auf; liefert die Abmeldung. */
+  subscribe(listener) {
+    this.listeners.add(listener);
+    return () => this.listeners.delete(listener);
+  }
+
+  /** Schreibt einen neuen Snapshot und leert das Journal. */
+  compact() {
+    return this.enqueue(() => this.compactNow());
+  }
+
+  /** Kompaktiert offene Änderungen und stoppt den Timer. */
+  async close() {
+    if (this.timer) clearInterval(this.timer);
+    this.timer = null;
+    if (this.journalEntries > 0) await this.compact();
+    await this.enqueue(() => this.closeJournal());
+  }
+
+  // ----------------------------------------
+  // Intern
+  // ----------------------------------------
+
+  enqueue(task) {
+    const run = this.queue.then(task);
+    this.queue = run.catch(() => {});
+    return run;
+  }
+
+  async commit(ops, meta = {}) {
+    const at = new Date().toISOString();
+    if (ops.length === 0) return { seq: this.seq, savedAt: this.savedAt || at, etag: this.etag };
+
+    const entry = { seq: this.seq + 1, at, ops };
+    if (typeof meta.origin === 'string' && meta.origin) {
+      entry.origin = meta.origin;
+      entry.clock = Number(meta.clock) || 0;
+    }
+    const line = JSON.stringify(entry) + '\n';
+    try {
+      if (!this.journalHandle) this.journalHandle = await fs.open(this.journalFile, 'a');
+      await this.journalHandle.write(line);
+      await this.journalHandle.datasync();
+    } catch (error) {
+      // A partial line would hide every later entry on replay: start a fresh journal
+      await this.closeJournal().catch(() => {});
+      await this.compactNow().catch(() => {});
+      throw error;
+    }
+
+    applyOps(this.state, ops);
+    this.seq = entry.seq;
+    this.savedAt = at;
+    this.body = null;
+    this.journalEntries++;
+    this.journalBytes += Buffer.byteLength(line);
+
+    this.listeners.forEach(listener => {
+      try { listener(entry); } catch (error) { console.error('❌ DataStore listener failed:', error); }
+    });
+
+    if (this.journalEntries >= this.options.compactEvery || this.journalBytes >= this.options.compactBytes) {
+      this.compact().catch(error => console.error('❌ Compaction failed:', error));
+    }
+    return { seq: this.seq, savedAt: at, etag: this.etag };
+  }
+
+  /** Spielt das Journal ein; liefert `true`, wenn ein abgerissener Eintrag verworfen wurde. */
+  async replayJournal() {
+    let text;
+    try {
+      text = await fs.readFile(this.journalFile, 'utf8');
+    } catch (error) {
+      if (error.code === 'ENOENT') return false;
+      throw error;
+    }
+    const lines = text.split('\n');
+    for (let i = 0; i < lines.length; i++) {
+      if (!lines[i]) continue;
+      let entry;
+      try {
+        entry = JSON.parse(lines[i]);
+        validateOps(entry.ops);
+      } catch {
+        console.warn(`⚠️ Journal: discarding unreadable entry at line ${i + 1} and everything after it`);
+        return true;
+      }
+      // Entries up to the snapshot's seq are already contained in it
+      if (entry.seq <= this.seq) continue;
+      applyOps(this.state, entry.ops);
+      this.seq = entry.seq;
+      this.savedAt = entry.at;
+      this.journalEntries++;
+      this.journalBytes += Buffer.byteLength(lines[i]) + 1;
+    }
+    return false;
+  }
+
+  async compactNow() {
+    const text = JSON.stringify({ version: this.version, state: this.state, savedAt: this.savedAt, seq: this.seq });
+    await fs.mkdir(this.snapshotDir, { recursive: true });
+    try {
+      await fs.copyFile(this.file, this.snapshotPath(this.snapshotSeq));
+    } catch (error) {
+      if (error.code !== 'ENOENT') throw error;
+    }
+    await writeFileAtomic(this.file, text);
+
+    // Snapshot is durable; the journal entries it contains can go
+    await this.closeJournal();
+    await writeFileAtomic(this.journalFile, '');
+    this.snapshotSeq = this.seq;
+    this.journalEntries = 0;
+    this.journalBytes = 0;
+    await this.pruneSnapshots();
+  }
+
+  async closeJournal() {
+    if (!this.journalHandle) return;
+    const handle = this.journalHandle;
+    this.journalHandle = null;
+    await handle.close();
+  }
+
+  snapshotPath(seq) {
+    const name = path.basename(this.file).replace(/\.json$/, '');
+    return path.join(this.snapshotDir, `${name}.${seq}.json`);
+  }
+
+  async pruneSnapshots() {
+    const name = path.basename(this.file).replace(/\.json$/, '');
+    const pattern = new RegExp(`^${name.replace(/[.*+?^${}()|[\]\\]/g, '\\$&')}\\.(\\d+)\\.json$`);
+    const snapshots = (await fs.readdir(this.snapshotDir))
+      .map(entry => ({ entry, match: pattern.exec(entry) }))
+      .filter(({ match }) => match)
+      .sort((a, b) => Number(b.match[1]) - Number(a.match[1]));
+    await Promise.all(snapshots.slice(this.options.keepSnapshots)
+      .map(({ entry }) => fs.rm(path.join(this.snapshotDir, entry), { force: true })));
+  }
+}
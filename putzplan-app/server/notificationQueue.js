@@ -0,0 +1,260 @@
+// ========================================
+// WHATSAPP-AUSGANGSWARTESCHLANGE
+// ========================================
+
+/**
+ * Text für eine oder mehrere Hot-Task-Benachrichtigungen an denselben Chat.
+ * Eine einzelne behält das bisherige Format von whatsappService.js.
+ */
+export function formatHotTasks(items, now = new Date()) {
+  const stamp = `💡 Putzplan App - ${now.toLocaleString('de-DE')}`;
+  if (items.length === 1) {
+    const [{ title, details }] = items;
+    return `🔥 HOT TASK ALERT! 🔥\n\n` +
+      `Aufgabe: ${title}\n` +
+      (details ? `Details: ${details}\n` : '') +
+      `\n⏰ Sofortige Aufmerksamkeit erforderlich!\n` +
+      stamp;
+  }
+  return `🔥 HOT TASK ALERT! 🔥\n\n` +
+    `${items.length} Aufgaben:\n` +
+    items.map(({ title, details }) => `• ${title}${details ? ` – ${details}` : ''}`).join('\n') +
+    `\n\n⏰ Sofortige Aufmerksamkeit erforderlich!\n` +
+    stamp;
+}
+
+const percentile = (sorted, p) =>
+  sorted.length === 0 ? 0 : sorted[Math.min(sorted.length - 1, Math.floor(p * sorted.length))];
+
+/**
+ * Versendet Benachrichtigungen asynchron über einen WahaClient.
+ *
+ * `enqueue()` kehrt sofort zurück. Benachrichtigungen an denselben Chat, die
+ * innerhalb von `coalesceMs` eintreffen, gehen als eine Nachricht raus
+ * (höchstens `maxBatch` Einträge; gleiche `key`s werden zusammengefasst,
+ * der Rest folgt in weiteren Nachrichten). Gesendet wird nacheinander mit
+ * mindestens `minIntervalMs` Abstand. Schlägt ein Versand fehl oder ist WAHA
+ * nicht bereit, werden die Einträge mit exponentiellem Backoff erneut
+ * versucht, vor den inzwischen eingetroffenen. Fehlgeschlagene Sendungen
+ * zählen gegen `maxAttempts`; solange WAHA bzw. die Session erst hochfährt,
+ * wird stattdessen bis `notReadyTimeoutMs` gewartet und bei jedem weiteren
+ * Versuch der Zustand frisch (ohne Health-Cache) geprüft.
+ */
+export class NotificationQueue {
+  constructor({
+    client,
+    format = formatHotTasks,
+    coalesceMs = 1500,
+    maxBatch = 10,
+    minIntervalMs = 1000,
+    maxAttempts = 5,
+    notReadyTimeoutMs = 300000,
+    backoffMs = 2000,
+    maxBackoffMs = 60000,
+    latencySamples = 200
+  }) {
+    this.client = client;
+    this.format = format;
+    this.options = { coalesceMs, maxBatch, minIntervalMs, maxAttempts, notReadyTimeoutMs, backoffMs, maxBackoffMs, latencySamples };
+    this.batches = new Map();
+    this.sending = null;
+    this.timer = null;
+    this.lastSendAt = 0;
+    this.idleWaiters = [];
+    this.nextId = 1;
+    this.closed = false;
+    this.stats = {
+      enqueued: 0,
+      coalesced: 0,
+      messagesSent: 0,
+      notificationsDelivered: 0,
+      retries: 0,
+      failed: 0,
+      lastError: null,
+      lastSentAt: null
+    };
+    this.latencies = [];
+    this.deliveredAt = [];
+  }
+
+  /**
+   * Reiht eine Benachrichtigung `{ chatId, title, details?, key? }` ein.
+   * Liefert `{ id, queuedAt, batchSize }` ohne auf WAHA zu warten.
+   */
+  enqueue({ chatId, title, details = '', key }) {
+    if (this.closed) throw new Error('Queue is closed');
+    if (!chatId || !title) throw new TypeError('chatId and title are required');
+    const now = Date.now();
+    this.stats.enqueued++;
+
+    let batch = this.batches.get(chatId);
+    if (!batch) {
+      batch = { chatId, items: [], attempts: 0, waits: 0, notReadySince: null, readyAt: now + this.options.coalesceMs };
+      this.batches.set(chatId, batch);
+    }
+    const item = { id: this.nextId++, key: key || title, title, details, queuedAt: now };
+    const duplicate = batch.items.find(existing => existing.key === item.key);
+    if (duplicate) {
+      this.stats.coalesced++;
+      duplicate.details = details || duplicate.details;
+      item.id = duplicate.id;
+    } else {
+      batch.items.push(item);
+      if (batch.items.length > 1) this.stats.coalesced++;
+    }
+    if (batch.items.length >= this.options.maxBatch && batch.attempts + batch.waits === 0) batch.readyAt = now;
+
+    this.schedule();
+    return { id: item.id, queuedAt: new Date(now).toISOString(), batchSize: batch.items.length };
+  }
+
+  /** Durchsatz-, Latenz- und Fehlerkennzahlen. */
+  metrics() {
+    const now = Date.now();
+    this.deliveredAt = this.deliveredAt.filter(at => now - at < 60000);
+    const sorted = [...this.latencies].sort((a, b) => a - b);
+    const pending = Array.from(this.batches.values()).reduce((sum, batch) => sum + batch.items.length, 0);
+    return {
+      ...this.stats,
+      pending,
+      inFlight: this.sending ? this.sending.items.length : 0,
+      deliveredLastMinute: this.deliveredAt.length,
+      latencyMs: {
+        avg: sorted.length ? Math.round(sorted.reduce((a, b) => a + b, 0) / sorted.length) : 0,
+        p50: percentile(sorted, 0.5),
+        p95: percentile(sorted, 0.95),
+        max: sorted.length ? sorted[sorted.length - 1] : 0
+      },
+      waha: this.client.lastHealth
+    };
+  }
+
+  /** Wartet, bis nichts mehr eingereiht oder unterwegs ist. */
+  drain() {
+    if (this.batches.size === 0 && !this.sending) return Promise.resolve();
+    return new Promise(resolve => this.idleWaiters.push(resolve));
+  }
+
+  /** Stoppt den Timer; noch Wartendes wird verworfen, `drain()` kehrt zurück. */
+  close() {
+    this.closed = true;
+    clearTimeout(this.timer);
+    this.timer = null;
+    this.notifyIdle();
+  }
+
+  // ----------------------------------------
+  // Intern
+  // ----------------------------------------
+
+  schedule() {
+    if (this.closed || this.sending) return;
+    clearTimeout(this.timer);
+    this.timer = null;
+    const next = this.nextBatch();
+    if (!next) {
+      this.notifyIdle();
+      return;
+    }
+    const at = Math.max(next.readyAt, this.lastSendAt + this.options.minIntervalMs);
+    this.timer = setTimeout(() => {
+      this.timer = null;
+      this.pump();
+    }, Math.max(0, at - Date.now()));
+    this.timer.unref?.();
+  }
+
+  nextBatch() {
+    let next = null;
+    this.batches.forEach(batch => {
+      if (!next || batch.readyAt < next.readyAt) next = batch;
+    });
+    return next;
+  }
+
+  async pump() {
+    const batch = this.nextBatch();
+    if (!batch || batch.readyAt > Date.now() || this.sending) {
+      this.schedule();
+      return;
+    }
+    // Höchstens maxBatch Einträge pro Nachricht; der Rest bleibt als nächster Batch stehen
+    const { chatId, attempts, waits, notReadySince } = batch;
+    const sending = { chatId, items: batch.items.splice(0, this.options.maxBatch), attempts, waits, notReadySince };
+    if (batch.items.length === 0) {
+      this.batches.delete(batch.chatId);
+    } else {
+      Object.assign(batch, { attempts: 0, waits: 0, notReadySince: null });
+    }
+    this.sending = sending;
+    this.lastSendAt = Date.now();
+    try {
+      // Nach "nicht bereit" frisch prüfen, sonst antwortet der Health-Cache bis zu healthTtlMs lang gleich
+      if (!(await this.client.isReady({ force: sending.waits > 0 }))) {
+        this.client.ensureRunning().catch(() => {});
+        throw Object.assign(new Error('WAHA nicht bereit'), { notReady: true });
+      }
+      await this.client.sendText(sending.chatId, this.format(sending.items));
+      const now = Date.now();
+      this.stats.messagesSent++;
+      this.stats.notificationsDelivered += sending.items.length;
+      this.stats.lastSentAt = new Date(now).toISOString();
+      sending.items.forEach(item => {
+        this.latencies.push(now - item.queuedAt);
+        this.deliveredAt.push(now);
+      });
+      if (this.latencies.length > this.options.latencySamples) {
+        this.latencies.splice(0, this.latencies.length - this.options.latencySamples);
+      }
+    } catch (error) {
+      this.retry(sending, error);
+    } finally {
+      this.sending = null;
+      this.schedule();
+    }
+  }
+
+  retry(sent, error) {
+    this.stats.lastError = error.message;
+    const now = Date.now();
+    // "Nicht bereit" zählt nicht gegen maxAttempts, sondern gegen notReadyTimeoutMs
+    const attempts = error.notReady ? sent.attempts : sent.attempts + 1;
+    const waits = error.notReady ? sent.waits + 1 : sent.waits;
+    const notReadySince = error.notReady ? sent.notReadySince || now : null;
+    const expired = error.notReady
+      ? now - notReadySince >= this.options.notReadyTimeoutMs
+      : attempts >= this.options.maxAttempts;
+    if (expired) {
+      this.stats.failed += sent.items.length;
+      console.error(`❌ WhatsApp: ${sent.items.length} Benachrichtigung(en) an ${sent.chatId} verworfen:`, error.message);
+      return;
+    }
+    this.stats.retries++;
+    const delay = Math.min(this.options.maxBackoffMs, this.options.backoffMs * 2 ** (attempts + waits - 1));
+    // Fehlgeschlagene Einträge kommen vor die inzwischen eingereihten; pump()
+    // schickt davon wieder höchstens maxBatch in einer Nachricht
+    const newer = this.batches.get(sent.chatId);
+    const items = [...sent.items];
+    if (newer) {
+      newer.items.forEach(item => {
+        if (!items.some(existing => existing.key === item.key)) items.push(item);
+      });
+    }
+    this.batches.set(sent.chatId, {
+      chatId: sent.chatId,
+      items,
+      attempts,
+      waits,
+      notReadySince,
+      // Jitter, damit nach einem WAHA-Neustart nicht alles gleichzeitig kommt
+      readyAt: now + Math.round(delay * (0.8 + Math.random() * 0.4))
+    });
+    console.warn(`⚠️ WhatsApp-Versand fehlgeschlagen (${error.message}), Versuch ${attempts + waits + 1} in ${delay} ms`);
+  }
+
+  notifyIdle() {
+    const waiters = this.idleWaiters;
+    this.idleWaiters = [];
+    waiters.forEach(resolve => resolve());
+  }
+}
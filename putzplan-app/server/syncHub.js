@@ -0,0 +1,111 @@
+// ========================================
+// SYNC-KANAL: SERVER-SENT EVENTS
+// ========================================
+
+const MAX_VECTOR_CLIENTS = 64;
+
+/**
+ * Verteilt jede Änderung am DataStore per Server-Sent Events an alle
+ * verbundenen Clients.
+ *
+ * Jede Nachricht ist ein `delta` `{ seq, origin, clock, at, ops, vector }`:
+ * `seq` ist die fortlaufende Nummer des Stores (Event-ID), `origin`/`clock`
+ * identifizieren den schreibenden Client und dessen n-te Änderung, `vector`
+ * ist der Versionsvektor (höchste übernommene `clock` je Client). Clients
+ * erkennen Lücken an `seq` und holen fehlende Deltas über `changesSince()`;
+ * ist der Puffer dafür zu kurz, bekommen sie `resync` und laden neu.
+ */
+export class SyncHub {
+  constructor({ store, bufferSize = 1000, heartbeatMs = 25000 }) {
+    this.store = store;
+    this.bufferSize = bufferSize;
+    this.heartbeatMs = heartbeatMs;
+    this.buffer = [];
+    this.vector = {};
+    this.clients = new Set();
+    this.unsubscribe = store.subscribe(entry => this.publish(entry));
+  }
+
+  /** Versionsvektor + seq, z.B. für GET /api/data. */
+  get version() {
+    return { seq: this.store.seq, vector: { ...this.vector } };
+  }
+
+  /**
+   * Öffnet einen Event-Stream auf `res` (Node/Express-Response). Fortsetzen
+   * ab `since` (Query) bzw. `Last-Event-ID` (automatischer Reconnect).
+   */
+  attach(req, res, since) {
+    res.writeHead(200, {
+      'Content-Type': 'text/event-stream',
+      'Cache-Control': 'no-cache, no-transform',
+      Connection: 'keep-alive',
+      'X-Accel-Buffering': 'no'
+    });
+    const client = { res, heartbeat: null };
+    this.clients.add(client);
+
+    this.send(client, 'hello', this.version);
+    if (since !== undefined && since !== null && since !== '' && Number(since) < this.store.seq) {
+      const missed = this.changesSince(Number(since));
+      if (missed) missed.forEach(delta => this.send(client, 'delta', delta, delta.seq));
+      else this.send(client, 'resync', this.version);
+    }
+
+    if (this.heartbeatMs > 0) {
+      client.heartbeat = setInterval(() => res.write(': ping\n\n'), this.heartbeatMs);
+      client.heartbeat.unref?.();
+    }
+    const detach = () => {
+      clearInterval(client.heartbeat);
+      this.clients.delete(client);
+    };
+    req.on('close', detach);
+    return detach;
+  }
+
+  /** Deltas mit `seq > since`, oder `null`, wenn der Puffer nicht so weit zurückreicht. */
+  changesSince(since) {
+    if (since >= this.store.seq) return [];
+    const first = this.buffer.length > 0 ? this.buffer[0].seq : this.store.seq + 1;
+    if (since + 1 < first) return null;
+    return this.buffer.filter(delta => delta.seq > since);
+  }
+
+  /** Beendet alle Streams. */
+  close() {
+    this.unsubscribe();
+    this.clients.forEach(client => {
+      clearInterval(client.heartbeat);
+      client.res.end();
+    });
+    this.clients.clear();
+  }
+
+  publish(entry) {
+    const origin = entry.origin || null;
+    if (origin && entry.clock) this.vector[origin] = Math.max(this.vector[origin] || 0, entry.clock);
+    const delta = {
+      seq: entry.seq,
+      origin,
+      clock: entry.clock || 0,
+      at: entry.at,
+      ops: entry.ops,
+      vector: { ...this.vector }
+    };
+    this.buffer.push(delta);
+    if (this.buffer.length > this.bufferSize) this.buffer.splice(0, this.buffer.length - this.bufferSize);
+    // Every page load is a new client id: forget writers that left the buffer
+    if (Object.keys(this.vector).length > MAX_VECTOR_CLIENTS) {
+      const recent = new Set(this.buffer.map(entry => entry.origin));
+      Object.keys(this.vector).forEach(client => {
+        if (!recent.has(client)) delete this.vector[client];
+      });
+    }
+    this.clients.forEach(client => this.send(client, 'delta', delta, delta.seq));
+  }
+
+  send(client, event, data, id) {
+    client.res.write(`${id !== undefined ? `id: ${id}\n` : ''}event: ${event}\ndata: ${JSON.stringify(data)}\n\n`);
+  }
+}
@@ -0,0 +1,144 @@
+import http from 'http';
+import https from 'https';
+
+// ========================================
+// WAHA-CLIENT: KEEP-ALIVE + HEALTH-CACHE
+// ========================================
+
+/**
+ * HTTP-Client für die WAHA API.
+ *
+ * Alle Requests laufen über einen Keep-Alive-Agent, damit nicht jede
+ * Nachricht einen neuen TCP-Handshake kostet. Der Zustand (API erreichbar,
+ * Session-Status) kommt aus einem einzigen GET /api/sessions/<session> und
+ * wird `healthTtlMs` lang gecacht; gleichzeitige Abfragen teilen sich einen
+ * Request. `ensureRunning()` startet WAHA (z.B. per Docker) im Hintergrund
+ * und blockiert den Aufrufer nie.
+ */
+export class WahaClient {
+  constructor({ baseUrl, apiKey, session = 'default', healthTtlMs = 15000, timeoutMs = 5000, start = null }) {
+    this.baseUrl = new URL(baseUrl);
+    this.apiKey = apiKey;
+    this.session = session;
+    this.healthTtlMs = healthTtlMs;
+    this.timeoutMs = timeoutMs;
+    this.start = start;
+    this.transport = this.baseUrl.protocol === 'https:' ? https : http;
+    this.agent = new this.transport.Agent({ keepAlive: true, maxSockets: 4 });
+    this.cached = null;
+    this.checking = null;
+    this.starting = null;
+  }
+
+  /**
+   * `{ reachable, session, checkedAt, starting }` — aus dem Cache, solange er
+   * jünger als `healthTtlMs` ist (oder `force`).
+   */
+  async health({ force = false } = {}) {
+    if (!force && this.cached && Date.now() - this.cached.checkedAt < this.healthTtlMs) {
+      return { ...this.cached, starting: !!this.starting };
+    }
+    if (!this.checking) {
+      this.checking = this.request('GET', `/api/sessions/${encodeURIComponent(this.session)}`)
+        .then(({ status, body }) => ({
+          // 404: WAHA läuft, aber die Session existiert (noch) nicht
+          reachable: status < 500,
+          session: status === 200 && body && body.status ? body.status : null
+        }))
+        .catch(() => ({ reachable: false, session: null }))
+        .then(result => {
+          this.cached = { ...result, checkedAt: Date.now() };
+          this.checking = null;
+          return this.cached;
+        });
+    }
+    const result = await this.checking;
+    return { ...result, starting: !!this.starting };
+  }
+
+  /** Letzter bekannter Zustand ohne Netzwerkzugriff (null = noch nie geprüft). */
+  get lastHealth() {
+    return this.cached ? { ...this.cached, starting: !!this.starting } : null;
+  }
+
+  /** Bereit zum Senden: API erreichbar und Session WORKING (`force`: ohne Cache). */
+  async isReady({ force = false } = {}) {
+    const health = await this.health({ force });
+    return health.reachable && health.session === 'WORKING';
+  }
+
+  /**
+   * Prüft den (gecachten) Zustand und stößt bei Bedarf den Start an, ohne
+   * darauf zu warten. Liefert den aktuellen Zustand.
+   */
+  async ensureRunning() {
+    const health = await this.health();
+    if (health.reachable || !this.start) return health;
+    if (!this.starting) {
+      console.log('🚀 WAHA nicht erreichbar, starte im Hintergrund...');
+      this.starting = Promise.resolve()
+        .then(() => this.start())
+        .catch(error => {
+          console.log('⚠️ WAHA konnte nicht gestartet werden:', error.message);
+          return false;
+        })
+        .then(() => this.health({ force: true }))
+        .finally(() => { this.starting = null; });
+    }
+    return { ...health, starting: true };
+  }
+
+  /** Sendet eine Textnachricht; wirft bei HTTP-Fehlern (mit `status`). */
+  async sendText(chatId, text) {
+    const { status, body } = await this.request('POST', '/api/sendText', { session: this.session, chatId, text });
+    if (status < 200 || status >= 300) {
+      // Fehler deuten oft auf eine verlorene Session hin: nächste Prüfung frisch
+      this.cached = null;
+      const error = new Error(`WAHA sendText HTTP ${status}`);
+      error.status = status;
+      throw error;
+    }
+    return body || {};
+  }
+
+  /** Generischer JSON-Request über den Keep-Alive-Agent. */
+  request(method, path, payload) {
+    return new Promise((resolve, reject) => {
+      const data = payload === undefined ? null : JSON.stringify(payload);
+      const req = this.transport.request({
+        protocol: this.baseUrl.protocol,
+        hostname: this.baseUrl.hostname,
+        port: this.baseUrl.port,
+        path,
+        method,
+        agent: this.agent,
+        timeout: this.timeoutMs,
+        headers: {
+          'X-Api-Key': this.apiKey,
+          'Content-Type': 'application/json',
+          ...(data ? { 'Content-Length': Buffer.byteLength(data) } : {})
+        }
+      }, res => {
+        let text = '';
+        res.setEncoding('utf8');
+        res.on('data', chunk => { text += chunk; });
+        res.on('end', () => {
+          let body = null;
+          try { body = text.trim() ? JSON.parse(text) : null; } catch { body = { raw: text }; }
+          resolve({ status: res.statusCode, body });
+        });
+      });
+      req.on('timeout', () => req.destroy(new Error('WAHA Timeout')));
+      req.on('error', error => {
+        this.cached = { reachable: false, session: null, checkedAt: Date.now() };
+        reject(error);
+      });
+      if (data) req.write(data);
+      req.end();
+    });
+  }
+
+  close() {
+    this.agent.destroy();
+  }
+}
@@ -0,0 +1,136 @@
+import { describe, it, expect, beforeEach } from 'vitest';
+import { AnalyticsService } from '../services/analyticsService';
+import { analyticsCache, AnalyticsCache, ALL_PERIODS, periodScope } from '../services/analyticsCache';
+import { buildBenchmarkState } from '../services/seed';
+
+const summary = (analytics: any) => ({
+  totalPoints: analytics.totalPoints,
+  totalTasks: analytics.totalTasks,
+  totalHotTasks: analytics.totalHotTasks,
+  leaderboard: analytics.leaderboard.map((u: any) => [u.userId, u.totalPoints, u.totalTasks, u.hotTaskCount, u.streak]),
+  // ties may come out in a different order, so only compare the counts
+  topTasks: analytics.topTasks.map((t: any) => t.count)
+});
+
+// Reference result: the uncached full scan the analytics pages used before
+const expected = (state: any, wgId: string, filter: (e: any) => boolean = () => true) => {
+  const wg = state.wgs[wgId];
+  const tasks = Object.values(state.tasks).filter((t: any) => t.wgId === wgId) as any[];
+  const executions = (Object.values(state.executions) as any[])
+    .filter(e => state.tasks[e.taskId]?.wgId === wgId && filter(e));
+  const users = wg.memberIds.map((id: string) => state.users[id]);
+  return summary(AnalyticsService.calculateOverallAnalytics(executions, tasks, users));
+};
+
+describe('AnalyticsCache', () => {
+  beforeEach(() => analyticsCache.clear());
+
+  it('matches the full-scan analytics for every scope', () => {
+    const state: any = buildBenchmarkState({ wgCount: 2, executionsPerWg: 1500 });
+    const wg = state.wgs['w0-wg'];
+    const period = wg.periods[4];
+
+    expect(summary(AnalyticsService.getOverallAnalytics(state, wg))).toEqual(expected(state, 'w0-wg'));
+    expect(summary(AnalyticsService.getOverallAnalytics(state, wg, periodScope(period.id))))
+      .toEqual(expected(state, 'w0-wg', e => e.periodId === period.id));
+
+    const user = state.users['w0-u2'];
+    const single = AnalyticsService.getUserAnalytics(state, 'w0-wg', user.id)!;
+    const executions = (Object.values(state.executions) as any[]).filter(e => state.tasks[e.taskId]?.wgId === 'w0-wg');
+    const reference = AnalyticsService.calculateUserAnalytics(user.id, user, executions, Object.values(state.tasks) as any[]);
+    expect([single.totalPoints, single.totalTasks, single.streak, single.weeklyProgress, single.timeOfDayStats])
+      .toEqual([reference.totalPoints, reference.totalTasks, reference.streak, reference.weeklyProgress, reference.timeOfDayStats]);
+  });
+
+  it('stays correct across incremental updates and memoizes unchanged scopes', () => {
+    let state: any = buildBenchmarkState({ wgCount: 2, executionsPerWg: 800 });
+    const wg = state.wgs['w0-wg'];
+    const first = AnalyticsService.getOverallAnalytics(state, wg);
+    expect(AnalyticsService.getOverallAnalytics({ ...state }, wg)).toBe(first);
+
+    // add, replace and delete executions the way DataManager does
+    const executions = { ...state.executions };
+    executions['w0-new'] = { ...executions['w0-e1'], id: 'w0-new', pointsAwarded: 99 };
+    executions['w0-e2'] = { ...executions['w0-e2'], executedBy: 'w0-u6', pointsAwarded: 3 };
+    delete executions['w0-e5'];
+    state = { ...state, executions };
+    expect(summary(AnalyticsService.getOverallAnalytics(state, wg))).toEqual(expected(state, 'w0-wg'));
+
+    // the other WG's result is untouched by changes to w0
+    const other = state.wgs['w1-wg'];
+    const otherResult = AnalyticsService.getOverallAnalytics(state, other);
+    state = { ...state, executions: { ...state.executions, 'w0-e7': { ...state.executions['w0-e7'], pointsAwarded: 1 } } };
+    expect(AnalyticsService.getOverallAnalytics(state, other)).toBe(otherResult);
+
+    // moving a task to another WG re-files its executions
+    state = { ...state, tasks: { ...state.tasks, 'w0-t3': { ...state.tasks['w0-t3'], wgId: 'w1-wg' } } };
+    expect(summary(AnalyticsService.getOverallAnalytics(state, wg))).toEqual(expected(state, 'w0-wg'));
+    expect(summary(AnalyticsService.getOverallAnalytics(state, other))).toEqual(expected(state, 'w1-wg'));
+  });
+
+  it('applies noteExecutionsChanged hints without diffing', () => {
+    const state: any = buildBenchmarkState({ wgCount: 1, executionsPerWg: 300 });
+    const cache = new AnalyticsCache().sync(state);
+    const prev = state.executions;
+    const next = { ...prev, 'w0-hint': { ...prev['w0-e0'], id: 'w0-hint', pointsAwarded: 40 } };
+    cache.noteExecutionsChanged(prev, next, ['w0-hint']);
+
+    const before = cache.scopeAggregate('w0-wg', ALL_PERIODS).users.get(prev['w0-e0'].executedBy)!.totalPoints;
+    cache.sync({ ...state, executions: next });
+    expect(cache.scopeAggregate('w0-wg', ALL_PERIODS).users.get(prev['w0-e0'].executedBy)!.totalPoints).toBe(before);
+
+    const fresh = new AnalyticsCache().sync({ ...state, executions: next });
+    expect(fresh.scopeAggregate('w0-wg', ALL_PERIODS).users.get(prev['w0-e0'].executedBy)!.totalPoints).toBe(before);
+  });
+
+  it('summarizes months like a scan and keeps untouched months memoized', () => {
+    let state: any = buildBenchmarkState({ wgCount: 2, executionsPerWg: 1200 });
+    const months = AnalyticsService.getMonthSummaries(state, 'w0-wg');
+
+    const scan = new Map<string, any>();
+    (Object.values(state.executions) as any[]).forEach(e => {
+      if (state.tasks[e.taskId]?.wgId !== 'w0-wg') return;
+      const date = new Date(e.date || e.executedAt);
+      const key = `${date.getFullYear()}-${date.getMonth()}`;
+      const month = scan.get(key) || { totalPoints: 0, completedTasks: 0, users: {} as any, tasks: new Set() };
+      month.totalPoints += e.pointsAwarded || 0;
+      month.completedTasks++;
+      month.tasks.add(e.taskId);
+      const user = month.users[e.executedBy] || (month.users[e.executedBy] = { totalPoints: 0, completedTasks: 0 });
+      user.totalPoints += e.pointsAwarded || 0;
+      user.completedTasks++;
+      scan.set(key, month);
+    });
+    expect(months.map(m => `${m.year}-${m.monthIndex}`).sort()).toEqual(Array.from(scan.keys()).sort());
+    months.forEach(m => {
+      const reference = scan.get(`${m.year}-${m.monthIndex}`);
+      expect([m.totalPoints, m.completedTasks, m.taskCount, m.users])
+        .toEqual([reference.totalPoints, reference.completedTasks, reference.tasks.size, reference.users]);
+    });
+
+    // changing one execution only recomputes its own month
+    const changed = state.executions['w0-e3'];
+    const date = new Date(changed.date || changed.executedAt);
+    state = { ...state, executions: { ...state.executions, 'w0-e3': { ...changed, pointsAwarded: (changed.pointsAwarded || 0) + 7 } } };
+    const next = AnalyticsService.getMonthSummaries(state, 'w0-wg');
+    next.forEach((m, i) => {
+      const own = m.year === date.getFullYear() && m.monthIndex === date.getMonth();
+      expect(m === months[i]).toBe(!own);
+      if (own) expect(m.totalPoints).toBe(months[i].totalPoints + 7);
+    });
+  });
+
+  it('returns the executions of a range like a scan over the collection', () => {
+    const state: any = buildBenchmarkState({ wgCount: 2, executionsPerWg: 1000 });
+    const cache = new AnalyticsCache().sync(state);
+    const start = new Date('2025-03-10T15:30:00Z').getTime();
+    const end = new Date('2025-04-02T09:00:00Z').getTime();
+
+    const scan = (Object.values(state.executions) as any[]).filter(e => {
+      const time = new Date(e.date || e.executedAt).getTime();
+      return state.tasks[e.taskId]?.wgId === 'w0-wg' && time >= start && time <= end;
+    });
+    const ids = (list: any[]) => list.map(e => e.id).sort();
+    expect(ids(cache.executionsBetween('w0-wg', start, end))).toEqual(ids(scan));
+  });
+});
@@ -32,15 +32,19 @@ vi.mock('../hooks/usePutzplanStore', () => ({
   })
 }));
 
-vi.mock('../services/analyticsService', () => ({
-  AnalyticsService: {
-    calculateOverallAnalytics: () => ({
-      totalPoints: 0,
-      totalTasks: 0,
-      userAnalytics: []
-    })
-  }
-}));
+vi.mock('../services/analyticsService', () => {
+  const overall = () => ({
+    totalPoints: 0,
+    totalTasks: 0,
+    userAnalytics: []
+  });
+  return {
+    AnalyticsService: {
+      calculateOverallAnalytics: overall,
+      getOverallAnalytics: overall
+    }
+  };
+});
 
 describe('Analytics Custom Period 19.11-16.12 Visibility Test', () => {
 
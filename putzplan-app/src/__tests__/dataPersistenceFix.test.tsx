@@ -54,10 +54,10 @@ describe('Data Persistence Fix', () => {
     console.log('📦 [FIX TEST] localStorage content exists:', !!storedData);
     
     if (storedData) {
-      const parsed = JSON.parse(storedData);
-      console.log('📦 [FIX TEST] Parsed data has user:', !!parsed.state?.users?.[user.id]);
-      expect(parsed.state.users[user.id]).toBeTruthy();
-      expect(parsed.state.users[user.id].name).toBe('Persistence Test User');
+      const users = JSON.parse(mockStorage['putzplan-data:users']);
+      console.log('📦 [FIX TEST] Parsed data has user:', !!users?.[user.id]);
+      expect(users[user.id]).toBeTruthy();
+      expect(users[user.id].name).toBe('Persistence Test User');
     } else {
       console.error('❌ [FIX TEST] No data found in localStorage!');
       expect(storedData).toBeTruthy();
@@ -81,8 +81,8 @@ describe('Data Persistence Fix', () => {
     expect(storedData).toBeTruthy();
     
     if (storedData) {
-      const parsed = JSON.parse(storedData);
-      expect(parsed.state.users[user.id]).toBeTruthy();
+      const users = JSON.parse(mockStorage['putzplan-data:users']);
+      expect(users[user.id]).toBeTruthy();
       console.log('✅ [FIX TEST] Manual save works correctly');
     }
   });
@@ -0,0 +1,116 @@
+import { describe, it, expect, beforeEach, afterEach } from 'vitest';
+import fs from 'node:fs/promises';
+import os from 'node:os';
+import path from 'node:path';
+// @ts-ignore - plain JS server module
+import { DataStore } from '../../server/dataStore.js';
+
+const initialState = { users: {}, tasks: {}, executions: {}, currentWG: null };
+
+describe('DataStore', () => {
+  let dir: string;
+  const open = (options: Record<string, unknown> = {}) =>
+    new DataStore({ dir, initialState, compactIntervalMs: 0, ...options }).open();
+
+  beforeEach(async () => {
+    dir = await fs.mkdtemp(path.join(os.tmpdir(), 'putzplan-store-'));
+  });
+
+  afterEach(async () => {
+    await fs.rm(dir, { recursive: true, force: true });
+  });
+
+  it('creates the snapshot and serves reads from memory with a changing ETag', async () => {
+    const store = await open();
+    const first = store.read();
+    expect(JSON.parse(first.body).state).toEqual(initialState);
+
+    await store.patch([{ path: ['tasks', 't1'], value: { id: 't1', title: 'Bad' } }]);
+    const second = store.read();
+    expect(second.etag).not.toBe(first.etag);
+    expect(JSON.parse(second.body).state.tasks.t1.title).toBe('Bad');
+    expect(store.read().body).toBe(second.body);
+    await store.close();
+  });
+
+  it('journals deltas and replays them after a restart', async () => {
+    const store = await open();
+    await store.patch([{ path: ['users', 'u1'], value: { id: 'u1', name: 'Anna' } }]);
+    await store.patch([{ path: ['users', 'u2'], value: { id: 'u2', name: 'Ben' } }, { path: ['users', 'u1'], delete: true }]);
+    const etag = store.etag;
+
+    // Simulate a crash: no compaction, only the journal survives
+    await store.closeJournal();
+    const snapshot = JSON.parse(await fs.readFile(path.join(dir, 'putzplan-data.json'), 'utf8'));
+    expect(snapshot.state.users).toEqual({});
+
+    const reopened = await open();
+    expect(reopened.state.users).toEqual({ u2: { id: 'u2', name: 'Ben' } });
+    expect(reopened.etag).toBe(etag);
+    await reopened.close();
+  });
+
+  it('drops a torn journal tail and compacts on open', async () => {
+    const store = await open();
+    await store.patch([{ path: ['tasks', 't1'], value: { id: 't1' } }]);
+    await store.closeJournal();
+    await fs.appendFile(path.join(dir, 'putzplan-data.journal'), '{"seq":2,"at":"x","ops":[{"pa');
+
+    const reopened = await open();
+    expect(Object.keys(reopened.state.tasks)).toEqual(['t1']);
+    expect(await fs.readFile(path.join(dir, 'putzplan-data.journal'), 'utf8')).toBe('');
+    expect(JSON.parse(await fs.readFile(path.join(dir, 'putzplan-data.json'), 'utf8')).seq).toBe(1);
+    await reopened.close();
+  });
+
+  it('journals only the difference of a full replace', async () => {
+    const store = await open();
+    await store.replace({ ...initialState, tasks: { t1: { id: 't1' }, t2: { id: 't2' } } });
+    await store.replace({ ...initialState, tasks: { t1: { id: 't1' }, t2: { id: 't2', title: 'neu' } } });
+    await store.closeJournal();
+
+    const lines = (await fs.readFile(path.join(dir, 'putzplan-data.journal'), 'utf8')).trim().split('\n');
+    expect(JSON.parse(lines[1]).ops).toEqual([{ path: ['tasks', 't2'], value: { id: 't2', title: 'neu' } }]);
+  });
+
+  it('compacts atomically and keeps a bounded number of snapshots', async () => {
+    const store = await open({ compactEvery: 2, keepSnapshots: 2 });
+    for (let i = 0; i < 10; i++) {
+      await store.patch([{ path: ['executions', `e${i}`], value: { id: `e${i}` } }]);
+    }
+    await store.compact();
+
+    const snapshots = await fs.readdir(path.join(dir, 'snapshots'));
+    expect(snapshots.length).toBe(2);
+    const files = await fs.readdir(dir);
+    expect(files.some(f => f.includes('.tmp-'))).toBe(false);
+    const data = JSON.parse(await fs.readFile(path.join(dir, 'putzplan-data.json'), 'utf8'));
+    expect(Object.keys(data.state.executions)).toHaveLength(10);
+    expect(data.seq).toBe(10);
+    await store.close();
+  });
+
+  it('checks If-Match inside the serialized commit', async () => {
+    const store = await open();
+    const etag = store.etag;
+
+    const results = await Promise.allSettled([
+      store.patch([{ path: ['tasks', 't1'], value: { id: 't1', title: 'A' } }], {}, { ifMatch: etag }),
+      store.patch([{ path: ['tasks', 't1'], value: { id: 't1', title: 'B' } }], {}, { ifMatch: etag })
+    ]);
+
+    expect(results[0].status).toBe('fulfilled');
+    expect(results[1]).toMatchObject({ status: 'rejected', reason: { status: 412, etag: store.etag } });
+    expect(store.state.tasks.t1.title).toBe('A');
+    expect(store.seq).toBe(1);
+    await store.close();
+  });
+
+  it('rejects malformed ops without touching the state', async () => {
+    const store = await open();
+    expect(() => store.patch([{ path: ['__proto__', 'x'], value: 1 }])).toThrow(TypeError);
+    expect(() => store.patch([{ path: ['tasks', 't1'] }])).toThrow(TypeError);
+    expect(store.seq).toBe(0);
+    await store.close();
+  });
+});
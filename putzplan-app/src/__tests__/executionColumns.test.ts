@@ -0,0 +1,64 @@
+import { describe, it, expect } from 'vitest';
+import { buildExecutionColumns, bucketPoints, bucketEdges, sumPointsByUser } from '../services/executionColumns';
+import { buildBenchmarkState } from '../services/seed';
+
+const DAY_MS = 86400000;
+
+describe('ExecutionColumns', () => {
+  const state: any = buildBenchmarkState({ wgCount: 1, executionsPerWg: 2000 });
+  const executions = Object.values(state.executions) as any[];
+  const members = state.wgs['w0-wg'].memberIds;
+  const time = (e: any) => new Date(e.date || e.executedAt).getTime();
+
+  it('stores executions sorted by time with members interned first', () => {
+    const columns = buildExecutionColumns(executions, members);
+    expect(columns.length).toBe(executions.length);
+    expect(columns.userIds.slice(0, members.length)).toEqual(members);
+    for (let row = 1; row < columns.length; row++) {
+      expect(columns.times[row]).toBeGreaterThanOrEqual(columns.times[row - 1]);
+    }
+    const total = executions.reduce((sum, e) => sum + (e.pointsAwarded || 0), 0);
+    expect(columns.points.reduce((sum, p) => sum + p, 0)).toBe(total);
+  });
+
+  it('sums points per user within a range like a filter over the objects', () => {
+    const columns = buildExecutionColumns(executions, members);
+    const period = state.wgs['w0-wg'].periods[5];
+    const start = new Date(period.startDate).getTime();
+    const end = new Date(period.endDate).getTime();
+    const sums = sumPointsByUser(columns, start, end);
+
+    members.forEach((userId: string) => {
+      const expected = executions
+        .filter(e => e.executedBy === userId && time(e) >= start && time(e) <= end)
+        .reduce((sum, e) => sum + (e.pointsAwarded || 0), 0);
+      expect(sums[columns.userIndex.get(userId)!]).toBe(expected);
+    });
+  });
+
+  it('buckets points by day and by week', () => {
+    const columns = buildExecutionColumns(executions, members);
+    const start = Date.UTC(2025, 2, 3);
+    const end = Date.UTC(2025, 4, 1);
+
+    [DAY_MS, 7 * DAY_MS].forEach(width => {
+      const edges = bucketEdges(start, end, width);
+      const bucketed = bucketPoints(columns, edges);
+      expect(bucketed.buckets).toBe(edges.length - 1);
+      for (let b = 0; b < bucketed.buckets; b++) {
+        const inBucket = executions.filter(e => time(e) >= edges[b] && time(e) < edges[b + 1]);
+        const userId = members[b % members.length];
+        const cell = b * bucketed.users + columns.userIndex.get(userId)!;
+        const mine = inBucket.filter(e => e.executedBy === userId);
+        expect(bucketed.counts[cell]).toBe(mine.length);
+        expect(bucketed.points[cell]).toBe(mine.reduce((sum, e) => sum + (e.pointsAwarded || 0), 0));
+      }
+    });
+  });
+
+  it('skips executions without a timestamp', () => {
+    const columns = buildExecutionColumns([{ ...executions[0], executedAt: undefined, date: undefined }, executions[1]]);
+    expect(columns.length).toBe(1);
+    expect(columns.userIds).toEqual([executions[1].executedBy]);
+  });
+});
@@ -0,0 +1,215 @@
+import { describe, it, expect, afterEach } from 'vitest';
+import http from 'node:http';
+// @ts-ignore - plain JS server module
+import { NotificationQueue, formatHotTasks } from '../../server/notificationQueue.js';
+// @ts-ignore - plain JS server module
+import { WahaClient } from '../../server/wahaClient.js';
+
+interface StubOptions {
+  session?: string;
+  failSends?: number;
+  /** Session reports STARTING for this many checks before `session` */
+  startingChecks?: number;
+}
+
+// Minimal WAHA: session status plus sendText, recording what it receives
+const startStubWaha = async ({ session = 'WORKING', failSends = 0, startingChecks = 0 }: StubOptions = {}) => {
+  const stub = { sessionChecks: 0, connections: 0, sends: [] as any[], failures: 0 };
+  const server = http.createServer((req, res) => {
+    let text = '';
+    req.on('data', chunk => { text += chunk; });
+    req.on('end', () => {
+      res.setHeader('Content-Type', 'application/json');
+      if (req.method === 'GET' && req.url === '/api/sessions/default') {
+        stub.sessionChecks++;
+        res.end(JSON.stringify({ name: 'default', status: stub.sessionChecks > startingChecks ? session : 'STARTING' }));
+      } else if (req.method === 'POST' && req.url === '/api/sendText') {
+        if (stub.failures < failSends) {
+          stub.failures++;
+          res.statusCode = 500;
+          res.end(JSON.stringify({ error: 'boom' }));
+          return;
+        }
+        stub.sends.push(JSON.parse(text));
+        res.end(JSON.stringify({ id: `msg${stub.sends.length}` }));
+      } else {
+        res.statusCode = 404;
+        res.end('{}');
+      }
+    });
+  });
+  server.on('connection', () => { stub.connections++; });
+  await new Promise<void>(resolve => server.listen(0, '127.0.0.1', resolve));
+  const { port } = server.address() as { port: number };
+  return { stub, server, url: `http://127.0.0.1:${port}` };
+};
+
+// Task titles in a message sent by formatHotTasks
+const titlesIn = (text: string): string[] =>
+  text.includes('Aufgaben:')
+    ? Array.from(text.matchAll(/^• (.+?)(?: – .*)?$/gm), match => match[1])
+    : [text.match(/Aufgabe: (.+)/)![1]];
+
+describe('NotificationQueue against a stub WAHA', () => {
+  const cleanup: Array<() => void> = [];
+
+  afterEach(() => {
+    cleanup.splice(0).forEach(fn => fn());
+  });
+
+  const setup = async (stubOptions: StubOptions = {}, queueOptions: Record<string, unknown> = {}, clientOptions: Record<string, unknown> = {}) => {
+    const waha = await startStubWaha(stubOptions);
+    const client = new WahaClient({ baseUrl: waha.url, apiKey: 'test', ...clientOptions });
+    const queue = new NotificationQueue({ client, coalesceMs: 20, minIntervalMs: 0, backoffMs: 10, ...queueOptions });
+    cleanup.push(() => {
+      queue.close();
+      client.close();
+      waha.server.close();
+    });
+    return { stub: waha.stub, client, queue };
+  };
+
+  it('returns immediately and coalesces notifications fired in quick succession', async () => {
+    const { stub, queue } = await setup();
+
+    const first = queue.enqueue({ chatId: 'g1@g.us', title: 'Bad putzen' });
+    queue.enqueue({ chatId: 'g1@g.us', title: 'Müll rausbringen', details: 'Gelber Sack' });
+    const third = queue.enqueue({ chatId: 'g1@g.us', title: 'Bad putzen', details: 'mit Spiegel' });
+    expect(stub.sends).toHaveLength(0);
+    expect(third).toMatchObject({ id: first.id, batchSize: 2 });
+
+    await queue.drain();
+    expect(stub.sends).toHaveLength(1);
+    expect(stub.sends[0]).toMatchObject({ session: 'default', chatId: 'g1@g.us' });
+    expect(stub.sends[0].text).toContain('2 Aufgaben:');
+    expect(stub.sends[0].text).toContain('• Bad putzen – mit Spiegel');
+    expect(stub.sends[0].text).toContain('• Müll rausbringen – Gelber Sack');
+
+    const metrics = queue.metrics();
+    expect(metrics).toMatchObject({ enqueued: 3, coalesced: 2, messagesSent: 1, notificationsDelivered: 2, pending: 0, deliveredLastMinute: 2 });
+    expect(metrics.latencyMs.max).toBeGreaterThanOrEqual(15);
+  });
+
+  it('retries failed sends with backoff and records the outcome', async () => {
+    const { stub, queue } = await setup({ failSends: 2 });
+
+    queue.enqueue({ chatId: 'g1@g.us', title: 'Küche' });
+    await queue.drain();
+
+    expect(stub.failures).toBe(2);
+    expect(stub.sends).toHaveLength(1);
+    expect(queue.metrics()).toMatchObject({ retries: 2, failed: 0, messagesSent: 1, lastError: 'WAHA sendText HTTP 500' });
+  });
+
+  it('gives up after maxAttempts', async () => {
+    const { stub, queue } = await setup({ failSends: 10 }, { maxAttempts: 3 });
+
+    queue.enqueue({ chatId: 'g1@g.us', title: 'Küche' });
+    await queue.drain();
+
+    expect(stub.failures).toBe(3);
+    expect(queue.metrics()).toMatchObject({ retries: 2, failed: 1, messagesSent: 0, pending: 0 });
+  });
+
+  it('retries without sending while the session is not working', async () => {
+    let starts = 0;
+    const { stub, queue } = await setup({ session: 'STARTING' }, { maxAttempts: 1, notReadyTimeoutMs: 50 }, {
+      healthTtlMs: 0,
+      start: () => { starts++; }
+    });
+
+    queue.enqueue({ chatId: 'g1@g.us', title: 'Küche' });
+    await queue.drain();
+
+    expect(stub.sends).toHaveLength(0);
+    expect(stub.sessionChecks).toBeGreaterThanOrEqual(2);
+    // The API is reachable, so no start is needed
+    expect(starts).toBe(0);
+    expect(queue.metrics()).toMatchObject({ failed: 1, lastError: 'WAHA nicht bereit' });
+  });
+
+  it('rechecks a starting session past the health cache instead of using up maxAttempts', async () => {
+    // Default 15 s health TTL; the session comes up on the fourth check
+    const { stub, queue } = await setup({ startingChecks: 3 }, { maxAttempts: 2 });
+
+    queue.enqueue({ chatId: 'g1@g.us', title: 'Küche' });
+    await queue.drain();
+
+    expect(stub.sessionChecks).toBe(4);
+    expect(stub.sends).toHaveLength(1);
+    expect(queue.metrics()).toMatchObject({ retries: 3, failed: 0, messagesSent: 1 });
+  });
+
+  it('caches health within the TTL and reuses one kept-alive connection', async () => {
+    const { stub, client, queue } = await setup();
+
+    for (let i = 0; i < 3; i++) {
+      queue.enqueue({ chatId: `chat${i}@c.us`, title: `Aufgabe ${i}` });
+    }
+    await queue.drain();
+    await Promise.all([client.health(), client.health(), client.isReady()]);
+
+    expect(stub.sends.map(send => send.chatId)).toEqual(['chat0@c.us', 'chat1@c.us', 'chat2@c.us']);
+    expect(stub.sessionChecks).toBe(1);
+    expect(stub.connections).toBe(1);
+    expect(queue.metrics().waha).toMatchObject({ reachable: true, session: 'WORKING' });
+  });
+
+  it('splits a chat into messages of at most maxBatch entries', async () => {
+    const { stub, queue } = await setup({}, { maxBatch: 3 });
+
+    for (let i = 0; i < 8; i++) {
+      queue.enqueue({ chatId: 'g1@g.us', title: `Aufgabe ${i}` });
+    }
+    await queue.drain();
+
+    const titles = stub.sends.map(send => titlesIn(send.text));
+    expect(titles.map(message => message.length)).toEqual([3, 3, 2]);
+    expect(titles.flat()).toEqual(Array.from({ length: 8 }, (_, i) => `Aufgabe ${i}`));
+    expect(queue.metrics()).toMatchObject({ messagesSent: 3, notificationsDelivered: 8, pending: 0, inFlight: 0 });
+  });
+
+  it('keeps retried entries within maxBatch and sends the rest afterwards', async () => {
+    const { stub, queue } = await setup({ failSends: 1 }, { maxBatch: 2 });
+
+    queue.enqueue({ chatId: 'g1@g.us', title: 'A' });
+    queue.enqueue({ chatId: 'g1@g.us', title: 'B' });
+    // Arrive while the first message is in flight or backing off
+    await new Promise(resolve => setTimeout(resolve, 5));
+    queue.enqueue({ chatId: 'g1@g.us', title: 'C' });
+    queue.enqueue({ chatId: 'g1@g.us', title: 'D' });
+    queue.enqueue({ chatId: 'g1@g.us', title: 'E' });
+    await queue.drain();
+
+    expect(stub.failures).toBe(1);
+    expect(stub.sends.map(send => titlesIn(send.text))).toEqual([['A', 'B'], ['C', 'D'], ['E']]);
+    expect(queue.metrics()).toMatchObject({ notificationsDelivered: 5, failed: 0, pending: 0 });
+  });
+
+  it('resolves pending drain() calls on close', async () => {
+    const { queue } = await setup({ session: 'STARTING' }, { backoffMs: 10_000 }, { healthTtlMs: 0, start: () => {} });
+
+    queue.enqueue({ chatId: 'g1@g.us', title: 'Küche' });
+    const drained = queue.drain();
+    queue.close();
+    await expect(drained).resolves.toBeUndefined();
+  });
+
+  it('rejects notifications without chat or title', async () => {
+    const { queue } = await setup();
+    expect(() => queue.enqueue({ chatId: '', title: 'x' })).toThrow(TypeError);
+    expect(() => queue.enqueue({ chatId: 'g1@g.us', title: '' })).toThrow(TypeError);
+  });
+});
+
+describe('formatHotTasks', () => {
+  it('keeps the single-task format and lists batches', () => {
+    const now = new Date('2025-01-01T12:00:00Z');
+    const single = formatHotTasks([{ title: 'Bad', details: 'gründlich' }], now);
+    expect(single).toContain('Aufgabe: Bad\nDetails: gründlich\n');
+    expect(single).not.toContain('Aufgaben:');
+
+    const batch = formatHotTasks([{ title: 'Bad', details: '' }, { title: 'Küche', details: '' }], now);
+    expect(batch).toContain('2 Aufgaben:\n• Bad\n• Küche');
+  });
+});
@@ -0,0 +1,260 @@
+import { describe, it, expect, beforeEach } from 'vitest';
+import { SegmentedLog, SnapshotStore, StorageLike } from '../services/snapshotStore';
+import { stateBackupManager } from '../services/stateBackupManager';
+import { EventSourcingManager } from '../services/eventSourcingManager.impl';
+
+const memoryStorage = (quota = Infinity) => {
+  const data = new Map<string, string>();
+  const writes: string[] = [];
+  const used = () => Array.from(data.values()).reduce((sum, value) => sum + value.length, 0);
+  const storage: StorageLike & { data: Map<string, string>; writes: string[] } = {
+    data,
+    writes,
+    getItem: key => (data.has(key) ? data.get(key)! : null),
+    setItem: (key, value) => {
+      if (used() - (data.get(key)?.length || 0) + value.length > quota) throw new Error('QuotaExceededError');
+      writes.push(key);
+      data.set(key, value);
+    },
+    removeItem: key => { data.delete(key); },
+    key: index => Array.from(data.keys())[index] ?? null,
+    get length() { return data.size; }
+  };
+  return storage;
+};
+
+const makeState = (taskCount: number) => {
+  const tasks: Record<string, any> = {};
+  for (let i = 0; i < taskCount; i++) tasks[`t${i}`] = { id: `t${i}`, title: `Aufgabe ${i}`, notes: 'x'.repeat(200) };
+  return { currentUser: null, users: { u1: { id: 'u1', name: 'Anna' } }, tasks, wgs: {}, ratings: {} };
+};
+
+const blobCount = (storage: { data: Map<string, string> }) =>
+  Array.from(storage.data.keys()).filter(key => key.includes(':blob:')).length;
+
+describe('SnapshotStore', () => {
+  it('shares unchanged records between snapshots and restores both', () => {
+    const storage = memoryStorage();
+    const store = new SnapshotStore({ prefix: 'snap', maxBytes: 1_000_000, storage: () => storage });
+    const first = makeState(100);
+    const second = { ...first, tasks: { ...first.tasks, t5: { ...first.tasks.t5, title: 'Geändert' } } };
+
+    const a = store.put('a', first, {}, 1)!;
+    const b = store.put('b', second, {}, 2)!;
+
+    expect(b.size).toBeGreaterThan(20_000);
+    // The changed task plus the tasks node (one hash per task) and the root
+    expect(b.added).toBeLessThan(b.size / 5);
+    expect(store.get('a')).toEqual(first);
+    expect(store.get('b')).toEqual(second);
+
+    store.remove('a');
+    expect(store.get('b')).toEqual(second);
+    expect(blobCount(storage)).toBe(1 + 4 + 100 + 1);
+  });
+
+  it('diffs against the current state by record hash', () => {
+    const storage = memoryStorage();
+    const store = new SnapshotStore({ prefix: 'snap', maxBytes: 1_000_000, storage: () => storage });
+    const saved = makeState(10);
+    store.put('s', saved);
+
+    const tasks: Record<string, any> = { ...saved.tasks, t1: { ...saved.tasks.t1, title: 'neu' }, t99: { id: 't99' } };
+    delete tasks.t2;
+    delete tasks.t3;
+    const diff = store.diff({ ...saved, tasks }, 's', ['tasks', 'users', 'wgs']);
+
+    // Restoring the snapshot re-adds t2/t3, drops t99 and reverts t1
+    expect(diff.tasks).toEqual({ added: 2, modified: 1, removed: 1 });
+    expect(diff.users).toEqual({ added: 0, modified: 0, removed: 0 });
+    expect(diff.wgs).toEqual({ added: 0, modified: 0, removed: 0 });
+  });
+
+  it('evicts the oldest snapshots beyond the byte budget and frees their blobs', () => {
+    const storage = memoryStorage();
+    const store = new SnapshotStore({ prefix: 'snap', maxBytes: 60_000, storage: () => storage });
+    for (let i = 0; i < 5; i++) {
+      const state = makeState(100);
+      Object.values(state.tasks).forEach((task: any) => { task.notes = `${i}`.repeat(200); });
+      store.put(`s${i}`, state, {}, i);
+    }
+
+    expect(store.list().map(s => s.id)).toEqual(['s3', 's4']);
+    expect(store.storedBytes).toBeLessThanOrEqual(60_000);
+    const stored = Array.from(storage.data.values()).reduce((sum, value) => sum + value.length, 0);
+    expect(stored).toBe(store.storedBytes);
+  });
+
+  it('makes room when the storage quota is hit', () => {
+    const storage = memoryStorage(50_000);
+    const store = new SnapshotStore({ prefix: 'snap', maxBytes: Infinity, storage: () => storage });
+    store.put('old', { data: makeState(100) }, {}, 1);
+    const fresh = { data: makeState(100) };
+    Object.values(fresh.data.tasks).forEach((task: any) => { task.notes = 'y'.repeat(200); });
+
+    expect(store.put('new', fresh, {}, 2)).not.toBeNull();
+    expect(store.list().map(s => s.id)).toEqual(['new']);
+    expect(store.get('new')).toEqual(fresh);
+  });
+
+  it('reports a snapshot that does not fit and leaves the store consistent', () => {
+    const storage = memoryStorage(30_000);
+    const store = new SnapshotStore({ prefix: 'snap', maxBytes: Infinity, storage: () => storage });
+    expect(store.put('small', makeState(10), {}, 1)).not.toBeNull();
+    storage.setItem('other-app-data', 'z'.repeat(20_000));
+
+    expect(store.put('big', makeState(100), {}, 2)).toBeNull();
+    expect(store.list()).toEqual([]);
+    expect(blobCount(storage)).toBe(0);
+    expect(store.storedBytes).toBe((storage.getItem('snap:index') || '').length);
+  });
+
+  it('picks up changes made by another instance and removes orphaned blobs', () => {
+    const storage = memoryStorage();
+    const one = new SnapshotStore({ prefix: 'snap', maxBytes: 1_000_000, storage: () => storage });
+    const two = new SnapshotStore({ prefix: 'snap', maxBytes: 1_000_000, storage: () => storage });
+    one.put('a', makeState(3), {}, 1);
+    storage.setItem('snap:blob:orphan', '{}');
+
+    expect(two.get('a')).toEqual(makeState(3));
+    expect(storage.getItem('snap:blob:orphan')).toBeNull();
+    two.remove('a');
+    expect(one.list()).toEqual([]);
+    expect(blobCount(storage)).toBe(0);
+  });
+});
+
+describe('SegmentedLog', () => {
+  it('rewrites only the tail segment and trims whole segments', () => {
+    const storage = memoryStorage();
+    const log = new SegmentedLog<number>({ prefix: 'events', segmentSize: 10, storage: () => storage });
+    for (let i = 0; i < 35; i++) log.append(i);
+    storage.writes.length = 0;
+    log.append(35);
+    expect(storage.writes).toEqual(['events:seg:3']);
+
+    const dropped = log.trim(20);
+    expect(dropped).toEqual([0, 1, 2, 3, 4, 5, 6, 7, 8, 9]);
+    expect(storage.getItem('events:seg:0')).toBeNull();
+
+    const reloaded = new SegmentedLog<number>({ prefix: 'events', segmentSize: 10, storage: () => storage });
+    expect(reloaded.items()).toEqual(Array.from({ length: 26 }, (_, i) => i + 10));
+  });
+});
+
+describe('SegmentedLog under a storage quota', () => {
+  it('drops the oldest segments to make room and reports them', () => {
+    const storage = memoryStorage(1_000);
+    const log = new SegmentedLog<string>({ prefix: 'events', segmentSize: 5, storage: () => storage });
+    const dropped: string[] = [];
+    for (let i = 0; i < 40; i++) dropped.push(...log.append(`${i}`.padStart(40, '.')));
+
+    expect(dropped.length).toBeGreaterThan(0);
+    expect(dropped.length % 5).toBe(0);
+    expect([...dropped, ...log.items()]).toEqual(Array.from({ length: 40 }, (_, i) => `${i}`.padStart(40, '.')));
+    const reloaded = new SegmentedLog<string>({ prefix: 'events', segmentSize: 5, storage: () => storage });
+    expect(reloaded.items()).toEqual(log.items());
+  });
+
+  it('throws and keeps the log unchanged when an entry cannot fit at all', () => {
+    const storage = memoryStorage(500);
+    const log = new SegmentedLog<string>({ prefix: 'events', segmentSize: 5, storage: () => storage });
+    log.append('a');
+
+    expect(() => log.append('x'.repeat(600))).toThrow('QuotaExceededError');
+    expect(log.items()).toEqual(['a']);
+    const reloaded = new SegmentedLog<string>({ prefix: 'events', segmentSize: 5, storage: () => storage });
+    expect(reloaded.items()).toEqual(['a']);
+  });
+});
+
+describe('StateBackupManager storage', () => {
+  beforeEach(() => {
+    localStorage.clear();
+    stateBackupManager.clearAll();
+  });
+
+  it('migrates inline backups and keeps payloads out of the index', () => {
+    localStorage.setItem('putzplan-state-backups', JSON.stringify({
+      version: '1.0.0',
+      lastBackupAt: '2025-01-01T00:00:00.000Z',
+      snapshots: [{ id: 'b1', timestamp: '2025-01-01T00:00:00.000Z', type: 'DELETE_TASK', entity: 'task', entityId: 't1', data: { id: 't1', title: 'Bad' } }]
+    }));
+
+    const [restored] = stateBackupManager.getSnapshotsForEntity('task', 't1');
+    expect((restored as any).data).toEqual({ id: 't1', title: 'Bad' });
+    expect(localStorage.getItem('putzplan-state-backups')).not.toContain('Bad');
+
+    const state = makeState(50);
+    stateBackupManager.createFullStateBackup('eins', state);
+    const before = stateBackupManager.getBackupStats().storageSize;
+    stateBackupManager.createFullStateBackup('zwei', { ...state, users: { u1: { id: 'u1', name: 'Ben' } } });
+    expect(stateBackupManager.getBackupStats().storageSize - before).toBeLessThan(2_000);
+    expect(stateBackupManager.getAllSnapshots().map(s => s.afterState?.users?.u1?.name).filter(Boolean)).toEqual(['Anna', 'Ben']);
+  });
+});
+
+describe('legacy migration under a storage quota', () => {
+  // Legacy states differ in one task each, as successive full-state copies do
+  const legacyStates = (count: number) => {
+    const base = makeState(20);
+    return Array.from({ length: count }, (_, i) => ({ ...base, tasks: { ...base.tasks, t0: { ...base.tasks.t0, title: `Version ${i}` } } }));
+  };
+
+  // Runs `fn` with a quota-limited global localStorage holding `legacy`, sized so the legacy blobs fill it
+  const withFullStorage = <T>(legacy: Record<string, string>, fn: () => T): T => {
+    const size = Object.values(legacy).reduce((sum, value) => sum + value.length, 0);
+    const storage = memoryStorage(size + 2_000);
+    Object.entries(legacy).forEach(([key, value]) => storage.setItem(key, value));
+    const original = Object.getOwnPropertyDescriptor(globalThis, 'localStorage');
+    Object.defineProperty(globalThis, 'localStorage', { value: storage, configurable: true, writable: true });
+    try {
+      return fn();
+    } finally {
+      if (original) Object.defineProperty(globalThis, 'localStorage', original);
+    }
+  };
+
+  it('keeps every event-sourcing snapshot when the legacy blobs filled the quota', () => {
+    const states = legacyStates(6);
+    const legacy = {
+      eventSourcing_events: JSON.stringify(states.map((state, i) => ({
+        id: `e${i}`, timestamp: 1_000 + i, action: 'DELETE_TASK', data: {}, previousState: state, metadata: { critical: true }
+      }))),
+      eventSourcing_snapshots: JSON.stringify(states.map((state, i) => ({
+        id: `s${i}`, timestamp: 1_000 + i, triggerEvent: 'DELETE_TASK', state, metadata: { version: '1.0', size: 0, compressed: false }
+      })))
+    };
+
+    const { snapshots, events } = withFullStorage(legacy, () => {
+      const manager = new EventSourcingManager();
+      return {
+        snapshots: manager.getSnapshots().map(snapshot => snapshot.state.tasks.t0.title),
+        events: manager.getEvents().map(event => event.previousStateRef)
+      };
+    });
+
+    expect(snapshots.sort()).toEqual(states.map(state => state.tasks.t0.title).sort());
+    expect(events.filter(Boolean)).toHaveLength(6);
+  });
+
+  it('keeps every state backup when the legacy index filled the quota', () => {
+    const states = legacyStates(6);
+    const legacy = {
+      'putzplan-state-backups': JSON.stringify({
+        version: '1.0.0',
+        lastBackupAt: '2025-01-01T00:00:00.000Z',
+        snapshots: states.map((state, i) => ({
+          id: `b${i}`, timestamp: `2025-01-0${i + 1}T00:00:00.000Z`, description: 'Full State Backup', type: 'BULK_UPDATE',
+          entity: 'app-state', entityId: 'full-state', beforeState: null, afterState: state
+        }))
+      })
+    };
+
+    const titles = withFullStorage(legacy, () =>
+      stateBackupManager.getAllSnapshots().map(snapshot => snapshot.afterState?.tasks?.t0?.title)
+    );
+
+    expect(titles).toEqual(states.map(state => state.tasks.t0.title));
+  });
+});
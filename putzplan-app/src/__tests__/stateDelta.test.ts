@@ -0,0 +1,28 @@
+import { describe, it, expect } from 'vitest';
+import { captureState, diffState } from '../services/stateDelta';
+
+describe('stateDelta', () => {
+  it('diffs entity maps record by record and other fields as a whole', () => {
+    const state: any = {
+      tasks: { t1: { id: 't1' }, t2: { id: 't2' } },
+      users: { u1: { id: 'u1' } },
+      currentUser: null,
+      debugMode: false
+    };
+    const baseline = captureState(state);
+
+    // in-place writes like serverDataManager does
+    state.tasks.t2 = { id: 't2', title: 'neu' };
+    state.tasks.t3 = { id: 't3' };
+    delete state.tasks.t1;
+    state.currentUser = state.users.u1;
+
+    expect(diffState(baseline, state)).toEqual([
+      { path: ['tasks', 't1'], delete: true },
+      { path: ['tasks', 't2'], value: { id: 't2', title: 'neu' } },
+      { path: ['tasks', 't3'], value: { id: 't3' } },
+      { path: ['currentUser'], value: { id: 'u1' } }
+    ]);
+    expect(diffState(captureState(state), state)).toEqual([]);
+  });
+});
@@ -0,0 +1,77 @@
+import { bench, describe } from 'vitest';
+import { StateIndex } from '../services/stateIndex';
+import { AnalyticsService } from '../services/analyticsService';
+import { buildBenchmarkState } from '../services/seed';
+import { buildExecutionColumns, sumPointsByUser } from '../services/executionColumns';
+
+// Run with `npm run bench`. Compares the indexed queries DataManager now uses
+// against the full scans they replaced, on seeded WGs of 10k – 100k executions.
+
+for (const executionsPerWg of [10_000, 100_000]) {
+  const state = buildBenchmarkState({ wgCount: 2, executionsPerWg });
+  const executions = Object.values(state.executions);
+  const tasks = Object.values(state.tasks);
+  const wgId = 'w0-wg';
+  const period = state.wgs[wgId].periods![11];
+  const start = new Date(period.startDate).getTime();
+  const end = new Date(period.endDate).getTime();
+  const index = new StateIndex().sync(state);
+
+  describe(`period executions (${executionsPerWg} per WG)`, () => {
+    bench('full scan', () => {
+      executions.filter((e: any) => {
+        if (e.periodId !== undefined && e.periodId !== null) return e.periodId === period.id;
+        const t = new Date(e.executedAt).getTime();
+        return t >= start && t <= end;
+      });
+    });
+    bench('index', () => {
+      index.sync(state).executionsInPeriod(period.id, start, end);
+    });
+  });
+
+  describe(`WG executions (${executionsPerWg} per WG)`, () => {
+    bench('full scan', () => {
+      executions.filter(e => state.tasks[e.taskId]?.wgId === wgId);
+    });
+    bench('index', () => {
+      index.sync(state).executionsForWg(wgId);
+    });
+  });
+
+  describe(`incremental update (${executionsPerWg} per WG)`, () => {
+    let n = 0;
+    bench('add one execution + sync', () => {
+      const id = `bench-${n++}`;
+      const next = { ...state, executions: { ...state.executions, [id]: { ...executions[0], id } } };
+      index.sync(next);
+      index.sync(state);
+    });
+  });
+
+  describe(`overall analytics (${executionsPerWg} per WG)`, () => {
+    const users = Object.values(state.users).filter(u => state.wgs[wgId].memberIds.includes(u.id));
+    const wgExecutions = index.executionsForWg(wgId);
+    bench('calculateOverallAnalytics', () => {
+      AnalyticsService.calculateOverallAnalytics(wgExecutions, tasks, users);
+    });
+  });
+
+  describe(`per-user sums over all periods (${executionsPerWg} per WG)`, () => {
+    const periods = state.wgs[wgId].periods!.map(p => [new Date(p.startDate).getTime(), new Date(p.endDate).getTime()]);
+    const wgExecutions = index.executionsForWg(wgId);
+    const columns = buildExecutionColumns(wgExecutions, state.wgs[wgId].memberIds);
+    bench('execution objects', () => {
+      periods.forEach(([periodStart, periodEnd]) => {
+        const sums: Record<string, number> = {};
+        wgExecutions.forEach(e => {
+          const t = new Date((e as any).date || e.executedAt);
+          if (t >= new Date(periodStart) && t <= new Date(periodEnd)) sums[e.executedBy] = (sums[e.executedBy] || 0) + (e.pointsAwarded || 0);
+        });
+      });
+    });
+    bench('columns', () => {
+      periods.forEach(([periodStart, periodEnd]) => sumPointsByUser(columns, periodStart, periodEnd));
+    });
+  });
+}
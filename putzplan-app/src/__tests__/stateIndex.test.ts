@@ -0,0 +1,77 @@
+import { describe, it, expect } from 'vitest';
+import { StateIndex, executionTime } from '../services/stateIndex';
+import { buildBenchmarkState } from '../services/seed';
+
+const ids = (list: Array<{ id: string }>) => list.map(x => x.id);
+
+const expectConsistent = (index: StateIndex, state: any) => {
+  const executions = Object.values(state.executions) as any[];
+  const tasks = Object.values(state.tasks) as any[];
+  const ratings = Object.values(state.ratings) as any[];
+
+  ['w0-u1', 'w0-u4', 'w1-u2'].forEach(userId => {
+    expect(ids(index.executionsForUser(userId))).toEqual(ids(executions.filter(e => e.executedBy === userId)));
+    expect(ids(index.ratingsForUser(userId))).toEqual(ids(ratings.filter(r => r.userId === userId)));
+  });
+  ['w0-t1', 'w0-t13', 'w1-t5'].forEach(taskId => {
+    expect(ids(index.executionsForTask(taskId))).toEqual(ids(executions.filter(e => e.taskId === taskId)));
+    expect(ids(index.ratingsForTask(taskId))).toEqual(ids(ratings.filter(r => r.taskId === taskId)));
+  });
+  ['w0-wg', 'w1-wg'].forEach(wgId => {
+    expect(ids(index.tasksForWg(wgId))).toEqual(ids(tasks.filter(t => t.wgId === wgId)));
+    expect(ids(index.executionsForWg(wgId))).toEqual(ids(executions.filter(e => state.tasks[e.taskId]?.wgId === wgId)));
+  });
+
+  const period = state.wgs['w0-wg'].periods[3];
+  const start = new Date(period.startDate).getTime();
+  const end = new Date(period.endDate).getTime();
+  expect(ids(index.executionsForPeriod(period.id))).toEqual(ids(executions.filter(e => e.periodId === period.id)));
+  expect(ids(index.executionsBetween(start, end))).toEqual(ids(executions.filter(e => {
+    const t = executionTime(e);
+    return t >= start && t <= end;
+  })));
+  expect(ids(index.executionsInPeriod(period.id, start, end))).toEqual(ids(executions.filter(e => {
+    if (e.periodId !== undefined && e.periodId !== null) return e.periodId === period.id;
+    const t = executionTime(e);
+    return t >= start && t <= end;
+  })));
+};
+
+describe('StateIndex', () => {
+  it('answers queries like the equivalent full scans', () => {
+    const state = buildBenchmarkState({ wgCount: 2, executionsPerWg: 2000 });
+    expectConsistent(new StateIndex().sync(state), state);
+  });
+
+  it('follows immutable updates incrementally', () => {
+    let state: any = buildBenchmarkState({ wgCount: 2, executionsPerWg: 1000 });
+    const index = new StateIndex().sync(state);
+
+    // add, reassign and delete single executions the way DataManager does
+    const executions = { ...state.executions };
+    executions['w0-new'] = { ...executions['w0-e1'], id: 'w0-new', executedAt: new Date('2025-04-02T08:00:00Z'), periodId: undefined };
+    executions['w0-e2'] = { ...executions['w0-e2'], executedBy: 'w0-u6', taskId: 'w0-t13' };
+    delete executions['w0-e4'];
+    state = { ...state, executions };
+    expectConsistent(index.sync(state), state);
+
+    // move a task to another WG and add a rating
+    state = {
+      ...state,
+      tasks: { ...state.tasks, 'w0-t13': { ...state.tasks['w0-t13'], wgId: 'w1-wg' } },
+      ratings: { ...state.ratings, 'w1-rX': { ...state.ratings['w1-r1'], id: 'w1-rX', taskId: 'w0-t1' } }
+    };
+    expectConsistent(index.sync(state), state);
+
+    // large replacement falls back to a rebuild
+    const rebuilt = buildBenchmarkState({ wgCount: 2, executionsPerWg: 500 });
+    expectConsistent(index.sync(rebuilt), rebuilt);
+  });
+
+  it('keeps results in collection order after an execution is replaced', () => {
+    const state: any = buildBenchmarkState({ wgCount: 1, executionsPerWg: 50 });
+    const index = new StateIndex().sync(state);
+    const replaced = { ...state, executions: { ...state.executions, 'w0-e0': { ...state.executions['w0-e0'], pointsAwarded: 1 } } };
+    expect(index.sync(replaced).executionsForUser(state.executions['w0-e0'].executedBy)[0].id).toBe('w0-e0');
+  });
+});
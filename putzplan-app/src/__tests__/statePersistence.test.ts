@@ -0,0 +1,124 @@
+import { describe, it, expect, beforeEach, vi } from 'vitest';
+import { StatePersistence } from '../services/statePersistence';
+
+const createStorage = () => {
+  const store: Record<string, string> = {};
+  return {
+    store,
+    storage: {
+      getItem: vi.fn((k: string) => (k in store ? store[k] : null)),
+      setItem: vi.fn((k: string, v: string) => { store[k] = v; }),
+      removeItem: vi.fn((k: string) => { delete store[k]; }),
+      clear: vi.fn(() => { Object.keys(store).forEach(k => delete store[k]); }),
+      key: vi.fn((i: number) => Object.keys(store)[i] || null),
+      get length() { return Object.keys(store).length; }
+    } as Storage
+  };
+};
+
+const buildState = () => {
+  const wg: any = {
+    id: 'wg1',
+    name: 'WG',
+    memberIds: ['u1'],
+    periods: [{ id: 'p2', savedState: { executions: [{ id: 'e1' }] } }],
+    historicalPeriods: [{ id: 'p1', savedState: { executions: [] } }]
+  };
+  return {
+    users: { u1: { id: 'u1', name: 'Anna' } },
+    wgs: { wg1: wg },
+    tasks: { t1: { id: 't1', title: 'Bad' } },
+    executions: {},
+    ratings: {},
+    currentWG: wg,
+    currentUser: null,
+    currentPeriod: { id: 'p2' }
+  } as any;
+};
+
+describe('StatePersistence', () => {
+  let store: Record<string, string>;
+  let storage: Storage;
+
+  beforeEach(() => {
+    ({ store, storage } = createStorage());
+  });
+
+  it('writes each entity collection and period snapshot to its own key', () => {
+    const persistence = new StatePersistence(storage, 'putzplan-data');
+    persistence.save(buildState(), { version: '1.0' });
+
+    expect(JSON.parse(store['putzplan-data:users']).u1.name).toBe('Anna');
+    expect(JSON.parse(store['putzplan-data:snapshot:wg1:periods:p2']).executions).toHaveLength(1);
+    const main = JSON.parse(store['putzplan-data']);
+    expect(main.layout).toBe('split');
+    expect(main.state.currentPeriod.id).toBe('p2');
+    expect(main.state.users).toBeUndefined();
+    expect(main.state.currentWG).toEqual({ $ref: 'wgs', id: 'wg1' });
+  });
+
+  it('only rewrites collections whose reference changed', () => {
+    const persistence = new StatePersistence(storage, 'putzplan-data');
+    const state = buildState();
+    persistence.save(state, { version: '1.0' });
+
+    const written = persistence.save({ ...state, executions: { e2: { id: 'e2' } } }, { version: '1.0' });
+    expect(written).toEqual(['putzplan-data:executions', 'putzplan-data']);
+  });
+
+  it('does not rewrite unchanged period snapshots when a WG changes', () => {
+    const persistence = new StatePersistence(storage, 'putzplan-data');
+    const state = buildState();
+    persistence.save(state, { version: '1.0' });
+
+    const wg = { ...state.wgs.wg1, name: 'Renamed' };
+    const written = persistence.save({ ...state, wgs: { wg1: wg }, currentWG: wg }, { version: '1.0' });
+    expect(written).toEqual(['putzplan-data:wgs', 'putzplan-data']);
+  });
+
+  it('round-trips through read/attach and hydrates snapshots lazily', () => {
+    new StatePersistence(storage, 'putzplan-data').save(buildState(), { version: '1.0' });
+
+    const persistence = new StatePersistence(storage, 'putzplan-data');
+    const data = persistence.read()!;
+    const deserialize = vi.fn((raw: any) => raw);
+    persistence.attach(data.state, data.layout, deserialize);
+
+    expect(data.state.currentWG).toBe(data.state.wgs.wg1);
+    expect(deserialize).not.toHaveBeenCalled();
+    expect(data.state.wgs.wg1.periods[0].savedState.executions[0].id).toBe('e1');
+    expect(deserialize).toHaveBeenCalledTimes(1);
+
+    // Nothing changed since loading: only the main record is written
+    expect(persistence.save(data.state, { version: '1.0' })).toEqual(['putzplan-data']);
+  });
+
+  it('reads the legacy single-key layout and migrates it on the next save', () => {
+    store['putzplan-data'] = JSON.stringify({ version: '1.0', state: buildState() });
+    const persistence = new StatePersistence(storage, 'putzplan-data');
+    const data = persistence.read()!;
+    expect(data.state.users.u1.name).toBe('Anna');
+
+    persistence.attach(data.state, data.layout, raw => raw);
+    persistence.save(data.state, { version: '1.0' });
+    expect(store['putzplan-data:tasks']).toBeTruthy();
+    expect(JSON.parse(store['putzplan-data']).layout).toBe('split');
+  });
+
+  it('removes snapshots of deleted periods and rewrites everything after an external clear', () => {
+    const persistence = new StatePersistence(storage, 'putzplan-data');
+    const state = buildState();
+    persistence.save(state, { version: '1.0' });
+
+    const wg = { ...state.wgs.wg1, historicalPeriods: [] };
+    persistence.save({ ...state, wgs: { wg1: wg }, currentWG: wg }, { version: '1.0' });
+    expect(store['putzplan-data:snapshot:wg1:historicalPeriods:p1']).toBeUndefined();
+
+    storage.clear();
+    persistence.save({ ...state, wgs: { wg1: wg }, currentWG: wg }, { version: '1.0' });
+    expect(store['putzplan-data:users']).toBeTruthy();
+
+    persistence.clear();
+    expect(Object.keys(store)).toHaveLength(0);
+  });
+});
@@ -61,9 +61,10 @@ describe('Storage Consistency - Browser Isolation Issues', () => {
       console.log('✅ [STORAGE TEST] Data stored in localStorage');
 
       if (storedData) {
-        const parsed = JSON.parse(storedData);
-        expect(parsed.state.users[user.id]).toBeTruthy();
-        expect(parsed.state.users[user.id].name).toBe('Browser Test User');
+        // Users are persisted under their own key next to the main record
+        const users = JSON.parse(mockStorage['putzplan-data:users']);
+        expect(users[user.id]).toBeTruthy();
+        expect(users[user.id].name).toBe('Browser Test User');
         console.log('✅ [STORAGE TEST] User data found in storage');
       }
 
@@ -155,7 +156,8 @@ describe('Storage Consistency - Browser Isolation Issues', () => {
       });
 
       // Prüfe auf unerwartete Keys, die Konflikte verursachen könnten
-      const unexpectedKeys = Object.keys(mockStorage).filter(key => !expectedKeys.includes(key));
+      // (Entity-Keys wie "putzplan-data:users" gehören zum Haupt-Record)
+      const unexpectedKeys = Object.keys(mockStorage).filter(key => !expectedKeys.includes(key) && !key.startsWith('putzplan-data:'));
       if (unexpectedKeys.length > 0) {
         console.warn('⚠️ [STORAGE TEST] Unexpected keys found:', unexpectedKeys);
       }
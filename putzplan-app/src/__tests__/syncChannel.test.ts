@@ -0,0 +1,242 @@
+import { describe, it, expect, beforeEach, afterEach } from 'vitest';
+import fs from 'node:fs/promises';
+import os from 'node:os';
+import path from 'node:path';
+import { DataManager } from '../services/dataManager';
+import { stateBackupManager } from '../services/stateBackupManager';
+import { applyDelta } from '../services/stateDelta';
+import { createSyncHarness } from './syncHarness';
+
+const initialState = { users: {}, tasks: {}, executions: {} };
+
+describe('SyncChannel', () => {
+  let dir: string;
+  let harness: Awaited<ReturnType<typeof createSyncHarness>>;
+
+  beforeEach(async () => {
+    dir = await fs.mkdtemp(path.join(os.tmpdir(), 'putzplan-sync-'));
+  });
+
+  afterEach(async () => {
+    await harness?.close();
+    await fs.rm(dir, { recursive: true, force: true });
+  });
+
+  it('converges all clients and does not re-apply its own echo', async () => {
+    harness = await createSyncHarness({ dir, initialState });
+    const [a, b, c] = ['a', 'b', 'c'].map(id => harness.connect(id));
+    await harness.settle();
+
+    await a.write([{ path: ['tasks', 't1'], value: { id: 't1', title: 'Bad' } }]);
+    await b.write([{ path: ['users', 'u1'], value: { id: 'u1', name: 'Anna' } }]);
+    await c.write([{ path: ['tasks', 't1'], delete: true }, { path: ['tasks', 't2'], value: { id: 't2', title: 'Küche' } }]);
+    await harness.settle();
+
+    const server = JSON.parse(harness.store.read().body).state;
+    [a, b, c].forEach(client => {
+      expect(client.state).toEqual(server);
+      expect(client.channel.seq).toBe(3);
+    });
+    expect(a.received).toHaveLength(2);
+    expect(a.channel.vector).toEqual({ a: 1, b: 1, c: 1 });
+  });
+
+  it('skips remote ops on a path with an unacknowledged local write', async () => {
+    harness = await createSyncHarness({ dir, initialState });
+    const a = harness.connect('a');
+    const b = harness.connect('b');
+    await harness.settle();
+
+    const release = a.hold();
+    const sent = a.write([{ path: ['tasks', 't1'], value: { id: 't1', title: 'from a' } }]);
+    await b.write([
+      { path: ['tasks', 't1'], value: { id: 't1', title: 'from b' } },
+      { path: ['users', 'u1'], value: { id: 'u1', name: 'Ben' } }
+    ]);
+    await harness.settle();
+    // b's write was sequenced first and will be overwritten: a keeps its value
+    expect(a.state.tasks.t1.title).toBe('from a');
+    expect(a.state.users.u1.name).toBe('Ben');
+
+    release();
+    await sent;
+    await harness.settle();
+    expect(a.state).toEqual(b.state);
+    expect(b.state.tasks.t1.title).toBe('from a');
+  });
+
+  it('fetches missed deltas after a gap', async () => {
+    harness = await createSyncHarness({ dir, initialState });
+    const a = harness.connect('a');
+    const b = harness.connect('b');
+    await harness.settle();
+
+    b.setOffline(true);
+    await a.write([{ path: ['tasks', 't1'], value: { id: 't1' } }]);
+    await a.write([{ path: ['tasks', 't2'], value: { id: 't2' } }]);
+    b.setOffline(false);
+    await a.write([{ path: ['tasks', 't3'], value: { id: 't3' } }]);
+    await harness.settle();
+
+    expect(Object.keys(b.state.tasks).sort()).toEqual(['t1', 't2', 't3']);
+    expect(b.channel.seq).toBe(3);
+    expect(b.snapshots).toBe(0);
+  });
+
+  it('reloads the full state when the server no longer has the gap', async () => {
+    harness = await createSyncHarness({ dir, initialState, bufferSize: 2 });
+    const a = harness.connect('a');
+    const b = harness.connect('b');
+    await harness.settle();
+
+    b.setOffline(true);
+    for (let i = 1; i <= 4; i++) await a.write([{ path: ['tasks', `t${i}`], value: { id: `t${i}` } }]);
+    b.setOffline(false);
+    await a.write([{ path: ['tasks', 't5'], value: { id: 't5' } }]);
+    await harness.settle();
+
+    expect(b.snapshots).toBe(1);
+    expect(b.state).toEqual(a.state);
+    expect(b.channel.seq).toBe(5);
+  });
+
+  it('resumes a reconnecting stream from its last seq', async () => {
+    harness = await createSyncHarness({ dir, initialState });
+    const a = harness.connect('a');
+    const b = harness.connect('b');
+    await harness.settle();
+
+    b.channel.close();
+    await a.write([{ path: ['users', 'u1'], value: { id: 'u1' } }]);
+    b.channel.connect(b.channel.seq);
+    await harness.settle();
+
+    expect(b.state.users.u1).toEqual({ id: 'u1' });
+    expect(harness.hub.clients.size).toBe(2);
+  });
+});
+
+describe('DataManager server sync', () => {
+  let dir: string;
+  let harness: Awaited<ReturnType<typeof createSyncHarness>>;
+  const managers: DataManager[] = [];
+
+  const memoryStorage = () => {
+    const data = new Map<string, string>();
+    return {
+      getItem: (key: string) => (data.has(key) ? data.get(key)! : null),
+      setItem: (key: string, value: string) => { data.set(key, value); },
+      removeItem: (key: string) => { data.delete(key); },
+      clear: () => data.clear(),
+      key: (index: number) => Array.from(data.keys())[index] ?? null,
+      get length() { return data.size; }
+    } as Storage;
+  };
+
+  const connectManager = async (clientId: string, prepare: (manager: DataManager) => void = () => {}) => {
+    const manager = new DataManager();
+    manager._TEST_setLocalStorage(memoryStorage());
+    prepare(manager);
+    const transport = harness.transport();
+    await manager.connectServer({ clientId, fetch: transport.fetch, createEventSource: transport.createEventSource });
+    managers.push(manager);
+    return { manager, hold: transport.hold };
+  };
+
+  beforeEach(async () => {
+    dir = await fs.mkdtemp(path.join(os.tmpdir(), 'putzplan-sync-'));
+    harness = await createSyncHarness({ dir, initialState });
+  });
+
+  afterEach(async () => {
+    managers.splice(0).forEach(manager => manager.disconnectServer());
+    await harness.close();
+    await fs.rm(dir, { recursive: true, force: true });
+  });
+
+  it('pushes writes of the app data manager to the other clients', async () => {
+    const { manager: a } = await connectManager('a');
+    const { manager: b } = await connectManager('b');
+    await harness.settle();
+
+    a.addTask({ id: 't1', title: 'Bad' } as any);
+    await a.forceSave();
+    await harness.settle();
+
+    expect(b.getState().tasks.t1).toEqual({ id: 't1', title: 'Bad' });
+    expect(JSON.parse(harness.store.read().body).state.tasks.t1.title).toBe('Bad');
+
+    // A new client takes the server's state instead of its own empty one
+    const { manager: c } = await connectManager('c');
+    expect(c.getState().tasks.t1).toEqual({ id: 't1', title: 'Bad' });
+  });
+
+  it('keeps and uploads local-only data when a device connects for the first time', async () => {
+    const { manager: a } = await connectManager('a');
+    a.addTask({ id: 't1', title: 'Bad' } as any);
+    await a.forceSave();
+    await harness.settle();
+    const backups = stateBackupManager.getAllSnapshots().length;
+
+    const { manager: d } = await connectManager('d', manager => {
+      manager.addTask({ id: 't9', title: 'Offline angelegt' } as any);
+    });
+    await harness.settle();
+
+    expect(d.getState().tasks.t1.title).toBe('Bad');
+    expect(d.getState().tasks.t9.title).toBe('Offline angelegt');
+    expect(JSON.parse(harness.store.read().body).state.tasks.t9.title).toBe('Offline angelegt');
+    expect(a.getState().tasks.t9.title).toBe('Offline angelegt');
+    // The local state was backed up before merging
+    expect(stateBackupManager.getAllSnapshots().length).toBe(backups + 1);
+    expect(stateBackupManager.getAllSnapshots().at(-1)!.afterState.tasks.t9.title).toBe('Offline angelegt');
+  });
+
+  it('keeps remote changes that arrive while a save is in flight', async () => {
+    const { manager: a, hold } = await connectManager('a');
+    const { manager: b } = await connectManager('b');
+    b.addTask({ id: 't0', title: 'B0' } as any);
+    await b.forceSave();
+    await harness.settle();
+
+    const release = hold();
+    a.addTask({ id: 't1', title: 'from a' } as any);
+    const saving = a.forceSave();
+    b.updateTask('t0', { title: 'B1' });
+    await b.forceSave();
+    await harness.settle();
+    release();
+    await saving;
+    await harness.settle();
+
+    b.updateTask('t0', { title: 'B2' });
+    await b.forceSave();
+    await harness.settle();
+    // Nothing local is left to send: a must not push B1 back over B2
+    const seq = harness.store.seq;
+    await a.forceSave();
+
+    expect(harness.store.seq).toBe(seq);
+    expect(JSON.parse(harness.store.read().body).state.tasks.t0.title).toBe('B2');
+    expect(a.getState().tasks.t0.title).toBe('B2');
+    expect(a.getState().tasks.t1.title).toBe('from a');
+    expect(b.getState().tasks.t1.title).toBe('from a');
+  });
+});
+
+describe('applyDelta', () => {
+  it('copies only along written paths', () => {
+    const state = { tasks: { t1: { id: 't1' }, t2: { id: 't2' } }, users: { u1: { id: 'u1' } } };
+    const next = applyDelta(state, [
+      { path: ['tasks', 't1'], value: { id: 't1', done: true } },
+      { path: ['tasks', 't2'], delete: true },
+      { path: ['notifications', 'n1'], value: { id: 'n1' } }
+    ]);
+
+    expect(state.tasks).toEqual({ t1: { id: 't1' }, t2: { id: 't2' } });
+    expect(next.tasks).toEqual({ t1: { id: 't1', done: true } });
+    expect(next.users).toBe(state.users);
+    expect((next as any).notifications).toEqual({ n1: { id: 'n1' } });
+    expect(applyDelta(state, [{ path: ['missing', 'x'], delete: true }])).not.toHaveProperty('missing');
+  });
+});
@@ -0,0 +1,157 @@
+// @ts-ignore - plain JS server module
+import { DataStore } from '../../server/dataStore.js';
+// @ts-ignore - plain JS server module
+import { SyncHub } from '../../server/syncHub.js';
+import { applyDelta, DeltaOp } from '../services/stateDelta';
+import { SyncChannel, SyncEventSource } from '../services/syncChannel';
+
+/**
+ * In-process server for sync tests: a real DataStore and SyncHub, with the
+ * HTTP routes of server.js replaced by a fetch function and the SSE stream by
+ * a fake EventSource that parses the frames the hub writes.
+ */
+
+type Listener = (event: { data: string }) => void;
+
+export interface HarnessClient {
+  channel: SyncChannel;
+  state: any;
+  /** Every op set handed to onDelta, in order. */
+  received: DeltaOp[][];
+  snapshots: number;
+  /** Local write: applied at once, then sent like serverDataManager does. */
+  write(ops: DeltaOp[]): Promise<unknown>;
+  /** Drop (true) or deliver (false) incoming SSE frames, e.g. to simulate a lost connection. */
+  setOffline(offline: boolean): void;
+  /** Hold outgoing requests until the returned function is called. */
+  hold(): () => void;
+}
+
+const jsonResponse = (status: number, body: unknown) => ({
+  ok: status >= 200 && status < 300,
+  status,
+  json: async () => body
+}) as unknown as Response;
+
+export const createSyncHarness = async (options: { dir: string; initialState: any; bufferSize?: number }) => {
+  const store = await new DataStore({ dir: options.dir, initialState: options.initialState, compactIntervalMs: 0 }).open();
+  const hub = new SyncHub({ store, bufferSize: options.bufferSize, heartbeatMs: 0 });
+
+  const route = async (url: string, init: RequestInit = {}): Promise<Response> => {
+    const { pathname, searchParams } = new URL(url, 'http://harness');
+    const method = init.method || 'GET';
+    if (pathname === '/api/data' && method === 'GET') {
+      return jsonResponse(200, JSON.parse(store.read().body));
+    }
+    if (pathname === '/api/data' && method === 'PATCH') {
+      const headers = (init.headers || {}) as Record<string, string>;
+      const { ops } = JSON.parse(String(init.body));
+      const result = await store.patch(ops, { origin: headers['X-Sync-Client'], clock: headers['X-Sync-Clock'] });
+      return jsonResponse(200, { success: true, ...result });
+    }
+    if (pathname === '/api/sync/changes') {
+      const deltas = hub.changesSince(Number(searchParams.get('since')));
+      return deltas ? jsonResponse(200, { ...hub.version, deltas }) : jsonResponse(410, hub.version);
+    }
+    return jsonResponse(404, { error: 'Not found' });
+  };
+
+  /** Fetch and EventSource for one client, e.g. for DataManager.connectServer(). */
+  const transport = () => {
+    let offline = false;
+    let gate: Promise<void> | null = null;
+
+    const createEventSource = (url: string): SyncEventSource => {
+      const listeners = new Map<string, Listener[]>();
+      const closeHandlers: Array<() => void> = [];
+      const res = {
+        writeHead() {},
+        end() {},
+        write(chunk: string) {
+          if (offline) return;
+          chunk.split('\n\n').forEach(frame => {
+            let event = 'message';
+            let data = '';
+            frame.split('\n').forEach(line => {
+              if (line.startsWith('event: ')) event = line.slice(7);
+              else if (line.startsWith('data: ')) data = line.slice(6);
+            });
+            if (data) (listeners.get(event) || []).forEach(listener => listener({ data }));
+          });
+        }
+      };
+      const req = { on: (_event: string, handler: () => void) => closeHandlers.push(handler) };
+      const since = new URL(url, 'http://harness').searchParams.get('since');
+      // Like the browser: the stream opens after the current task
+      queueMicrotask(() => hub.attach(req, res, since));
+      return {
+        addEventListener: (type, listener) => listeners.set(type, [...(listeners.get(type) || []), listener]),
+        close: () => closeHandlers.forEach(handler => handler())
+      };
+    };
+
+    return {
+      createEventSource,
+      fetch: (async (url: string, init?: RequestInit) => {
+        if (gate) await gate;
+        return route(url, init);
+      }) as typeof fetch,
+      setOffline(value: boolean) {
+        offline = value;
+      },
+      hold() {
+        let release = () => {};
+        gate = new Promise(resolve => { release = resolve; });
+        return () => {
+          gate = null;
+          release();
+        };
+      }
+    };
+  };
+
+  const connect = (clientId: string): HarnessClient => {
+    const { createEventSource, fetch, setOffline, hold } = transport();
+    const client: HarnessClient = {
+      state: null,
+      received: [],
+      snapshots: 0,
+      channel: new SyncChannel({
+        clientId,
+        createEventSource,
+        fetch,
+        onDelta: ops => {
+          client.received.push(ops);
+          client.state = applyDelta(client.state, ops);
+        },
+        onSnapshot: ({ state }) => {
+          client.snapshots++;
+          client.state = state;
+        }
+      }),
+      write(ops) {
+        client.state = applyDelta(client.state, ops);
+        return client.channel.send(ops);
+      },
+      setOffline,
+      hold
+    };
+
+    const { state, seq } = JSON.parse(store.read().body);
+    client.state = state;
+    client.channel.connect(seq);
+    return client;
+  };
+
+  /** Lets queued stream openings, requests and catch-ups run. */
+  const settle = async () => {
+    for (let i = 0; i < 20; i++) await new Promise(resolve => setTimeout(resolve, 0));
+  };
+
+  const close = async () => {
+    hub.close();
+    await store.close();
+  };
+
+  return { store, hub, transport, connect, settle, close };
+};
@@ -4,6 +4,7 @@ import { Button, Card, ProgressBar, Badge } from '../ui';
 import { usePutzplanStore } from '../../hooks/usePutzplanStore';
 import { formatShortLabel } from '../period/periodUtils';
 import { AnalyticsService, OverallAnalytics, UserAnalytics } from '../../services/analyticsService';
+import { ALL_PERIODS, monthScope } from '../../services/analyticsCache';
 import { PeriodAnalyticsService, PeriodAnalytics, PeriodDefinition } from '../../services/periodAnalyticsService';
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts';
 import { User } from '../../types';
@@ -34,31 +35,10 @@ export const AnalyticsPage: React.FC<AnalyticsPageProps> = ({ onBack, onUserSele
   const analytics = useMemo(() => {
     if (!currentWG) return null;
 
-    const executions = Object.values(state.executions || {}).filter((e: any) => {
-      const task = state.tasks[e.taskId];
-      return task && task.wgId === currentWG.id;
-    });
-
-    const now = new Date();
-    let filteredExecutions;
-    if (selectedPeriod === 'month') {
-      filteredExecutions = executions.filter((e: any) => {
-        const execDate = new Date(e.date || e.executedAt);
-        return execDate.getMonth() === now.getMonth() && execDate.getFullYear() === now.getFullYear();
-      });
-    } else {
-      filteredExecutions = executions;
-    }
-
-    const tasks = Object.values(state.tasks || {}).filter((t: any) => t.wgId === currentWG.id && t.isActive);
-    const users = currentWG.memberIds.map((id: string) => state.users[id]).filter(Boolean);
-
-    // Debug: Vergleiche mit TaskTable Datenquelle
-    console.log(`📊 [Analytics] Using ${filteredExecutions.length}/${executions.length} executions (period: ${selectedPeriod})`);
-    console.log(`👥 [Analytics] Users: ${users.map((u: any) => u.name).join(', ')}`);
-
-    const analytics = AnalyticsService.calculateOverallAnalytics(filteredExecutions as any, tasks as any, users);
-    console.log(`💰 [Analytics] Total points in filtered executions: ${analytics.totalPoints}P`);
+    // Aggregates are maintained incrementally per WG / month; unchanged data is served from the cache
+    const scope = selectedPeriod === 'month' ? monthScope(new Date()) : ALL_PERIODS;
+    const analytics = AnalyticsService.getOverallAnalytics(state, currentWG, scope, { activeTasksOnly: true });
+    console.log(`📊 [Analytics] ${analytics.totalTasks} executions, ${analytics.totalPoints}P (period: ${selectedPeriod})`);
 
     return analytics;
   }, [state, currentWG, selectedPeriod]);
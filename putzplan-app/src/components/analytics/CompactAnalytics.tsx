@@ -5,20 +5,25 @@ import { Bar, Pie } from 'react-chartjs-2';
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip as RechartsTooltip, Legend as RechartsLegend, ResponsiveContainer, BarChart, Bar as RechartsBar } from 'recharts';
 import { usePutzplanStore } from '../../hooks/usePutzplanStore';
 import { dataManager } from '../../services/dataManager';
+import { analyticsCache } from '../../services/analyticsCache';
+import { AnalyticsService, ExecutionSummary } from '../../services/analyticsService';
 import { formatShortLabel, dedupeByDate } from '../period/periodUtils';
 import { ArrowLeft } from 'lucide-react';
 import styles from './CompactAnalytics.module.css';
 
 ChartJS.register(CategoryScale, LinearScale, BarElement, ArcElement, Title, Tooltip, Legend, ChartDataLabels);
 
-interface MonthData {
+interface MonthData extends ExecutionSummary {
+  id?: string;
   key: string;
   month: string;
+  startDate: string;
+  endDate: string;
   year: number;
   monthIndex: number;
-  totalPoints: number;
-  completedTasks: number;
-  executions: any[];
+  /** Unset for months served from the analytics cache; see monthExecutions() */
+  executions?: any[];
+  isHistorical?: boolean;
 }
 
 interface UserStat {
@@ -43,38 +48,6 @@ export const CompactAnalytics: React.FC<CompactAnalyticsProps> = ({ onBack }) =>
   const [showDeleteModal, setShowDeleteModal] = useState<string | null>(null);
   const [showRestoreModal, setShowRestoreModal] = useState(false);
 
-  // Debug: Log raw state for inspection
-  React.useEffect(() => {
-    if (currentWG) {
-      const allExecutions = Object.values(state.executions || {});
-      console.log(`📊 [CompactAnalytics] Raw state inspection:`);
-      console.log(`📊 Total executions in state: ${allExecutions.length}`);
-      
-      // Filter and validate executions
-      const sample = allExecutions[0] as any;
-      if (sample) {
-        console.log(`📊 Sample execution structure:`, sample);
-        try {
-          console.log(`📊 Sample execution fields:`, Object.keys(sample));
-        } catch (_) {
-          console.log('📊 Sample execution fields: <unable to enumerate>');
-        }
-        console.log(`📊 Sample pointsAwarded:`, sample.pointsAwarded);
-        console.log(`📊 Sample points:`, sample.points);
-      }
-
-      const filteredExecs = allExecutions.filter((e: any) => {
-        const task = state.tasks[e.taskId];
-        return task && task.wgId === currentWG.id;
-      });
-      
-      console.log(`📊 Executions for WG ${currentWG.name}: ${filteredExecs.length}`);
-      filteredExecs.forEach((exec: any) => {
-        console.log(`📊 Exec ${exec.id}: taskId=${exec.taskId}, userId=${exec.executedBy}, points=${exec.pointsAwarded || exec.points || 0}, date=${exec.executedAt || exec.date}`);
-      });
-    }
-  }, [state, currentWG]);
-
   // Load deletion state from localStorage for browser consistency
   React.useEffect(() => {
     try {
@@ -97,101 +70,98 @@ export const CompactAnalytics: React.FC<CompactAnalyticsProps> = ({ onBack }) =>
     }
   }, []);
 
+  // Executions of a custom historical period: its savedState snapshot or,
+  // for legacy periods, the live executions in its date range
+  const historicalPeriodExecutions = (p: any, start: Date, end: Date): any[] => {
+    const snapshot = p && p.savedState && Array.isArray(p.savedState.executions) ? p.savedState.executions : null;
+    if (snapshot) {
+      return analyticsCache.remember(`compact-snapshot|${currentWG.id}|${p.id}`, [snapshot, state.tasks], () =>
+        snapshot.filter((ex: any) => {
+          const task = state.tasks[ex.taskId] || null;
+          // If the saved snapshot contains tasks without matching live tasks,
+          // include them anyway as they are part of the archived snapshot.
+          return !task || task.wgId === currentWG.id;
+        })
+      );
+    }
+    const cache = analyticsCache.sync(state);
+    const from = start.getTime();
+    const to = end.getTime();
+    return cache.remember(`compact-range|${currentWG.id}|${p.id}`, [cache.rangeVersion(currentWG.id, from, to), from, to], () =>
+      // Prefer explicit period binding when present (newer executions)
+      cache.executionsBetween(currentWG.id, from, to).filter((ex: any) => ex.periodId === undefined || ex.periodId === null || ex.periodId === p.id)
+    );
+  };
+
+  // Executions behind a month entry; cached months load them only when expanded
+  const monthExecutions = (monthData: MonthData | undefined): any[] => {
+    if (!monthData || !currentWG) return [];
+    if (monthData.executions) return monthData.executions;
+    const from = new Date(monthData.year, monthData.monthIndex, 1).getTime();
+    const to = new Date(monthData.year, monthData.monthIndex + 1, 1).getTime() - 1;
+    return analyticsCache.sync(state).executionsBetween(currentWG.id, from, to);
+  };
+
   // Generate available months from executions
   const availableMonths = useMemo(() => {
     if (!currentWG) return [];
 
+    const monthEntry = (year: number, month: number, summary: ExecutionSummary, executions?: any[]): MonthData => {
+      const monthStart = new Date(year, month, 1);
+      const monthEnd = new Date(year, month + 1, 0);
+      return {
+        key: `${year}-${month}`,
+        month: formatShortLabel({ startDate: monthStart.toISOString(), endDate: monthEnd.toISOString() } as any),
+        startDate: monthStart.toISOString(),
+        endDate: monthEnd.toISOString(),
+        year,
+        monthIndex: month,
+        ...summary,
+        executions
+      };
+    };
+
     // Use the store-provided `displayPeriodExecutions` for the currently displayed (live) period
     // so Analytics and TaskTable share the same source for live/current view. When a historical
-    // display period is selected, fall back to scanning `state.executions` (historical handled later).
+    // display period is selected, the months come from the cached per-month aggregates.
     const displayPeriodId = getDisplayPeriod();
-    let executions: any[] = [];
+    const monthsMap = new Map<string, MonthData>();
     if (!displayPeriodId) {
-      const map = displayPeriodExecutions || {};
-      executions = Object.values(map).filter((e: any) => {
+      const byMonth = new Map<string, any[]>();
+      Object.values(displayPeriodExecutions || {}).forEach((e: any) => {
         const task = state.tasks[e.taskId];
-        return task && task.wgId === currentWG.id;
+        if (!task || task.wgId !== currentWG.id) return;
+        const execDate = new Date(e.date || e.executedAt);
+        const monthKey = `${execDate.getFullYear()}-${execDate.getMonth()}`;
+        if (!byMonth.has(monthKey)) byMonth.set(monthKey, []);
+        byMonth.get(monthKey)!.push(e);
+      });
+      byMonth.forEach((executions, monthKey) => {
+        const [year, month] = monthKey.split('-').map(Number);
+        monthsMap.set(monthKey, monthEntry(year, month, AnalyticsService.summarizeExecutions(executions), executions));
       });
     } else {
-      executions = Object.values(state.executions || {}).filter((e: any) => {
-        const task = state.tasks[e.taskId];
-        return task && task.wgId === currentWG.id;
+      AnalyticsService.getMonthSummaries(state, currentWG.id).forEach(summary => {
+        const entry = monthEntry(summary.year, summary.monthIndex, summary);
+        monthsMap.set(entry.key, entry);
       });
     }
 
-    console.log(`📊 [AvailableMonths] Found ${executions.length} executions for WG ${currentWG.name}`);
-    console.log(`📊 [AvailableMonths] Sample executions:`, executions.slice(0, 3).map(e => ({
-      id: (e as any).id,
-      taskId: (e as any).taskId,
-      executedBy: (e as any).executedBy,
-      pointsAwarded: (e as any).pointsAwarded,
-      points: (e as any).points,
-      executedAt: (e as any).executedAt,
-      date: (e as any).date
-    })));
-
-    const monthsMap = new Map<string, MonthData>();
+    // Always ensure current month is included (short label TT.MM – TT.MM)
     const now = new Date();
-
     const currentMonthKey = `${now.getFullYear()}-${now.getMonth()}`;
-
-    // Always ensure current month is included (short label TT.MM – TT.MM)
-    const currentMonthStart = new Date(now.getFullYear(), now.getMonth(), 1);
-    const currentMonthEnd = new Date(now.getFullYear(), now.getMonth() + 1, 0);
-    const currentMonthName = formatShortLabel({ startDate: currentMonthStart.toISOString(), endDate: currentMonthEnd.toISOString() } as any);
-    monthsMap.set(currentMonthKey, {
-      key: currentMonthKey,
-      month: currentMonthName,
-      startDate: currentMonthStart.toISOString(),
-      endDate: currentMonthEnd.toISOString(),
-      year: now.getFullYear(),
-      monthIndex: now.getMonth(),
-      totalPoints: 0,
-      completedTasks: 0,
-      executions: []
-    });
-
-    executions.forEach((e: any) => {
-      const execDate = new Date(e.executedAt || e.date);
-      const year = execDate.getFullYear();
-      const month = execDate.getMonth();
-      const monthKey = `${year}-${month}`;
-      const monthStart = new Date(year, month, 1);
-      const monthEnd = new Date(year, month + 1, 0);
-      const monthName = formatShortLabel({ startDate: monthStart.toISOString(), endDate: monthEnd.toISOString() } as any);
-
-      if (!monthsMap.has(monthKey)) {
-        monthsMap.set(monthKey, {
-          key: monthKey,
-          month: monthName,
-          startDate: monthStart.toISOString(),
-          endDate: monthEnd.toISOString(),
-          year,
-          monthIndex: month,
-          totalPoints: 0,
-          completedTasks: 0,
-          executions: []
-        });
-      }
-
-      const monthData = monthsMap.get(monthKey)!;
-      monthData.executions.push(e);
-      const points = e.pointsAwarded || 0; // Use the primary field pointsAwarded, same as TaskTable
-      monthData.totalPoints += points;
-      monthData.completedTasks += 1;
-      
-      // Debug: Log each execution being added
-      console.log(`📊 [AvailableMonths] Adding execution for ${monthName}: ${points} points (pointsAwarded: ${e.pointsAwarded}, taskId: ${e.taskId}, userId: ${e.executedBy})`);
-    });
+    if (!monthsMap.has(currentMonthKey)) {
+      monthsMap.set(currentMonthKey, monthEntry(now.getFullYear(), now.getMonth(), AnalyticsService.summarizeExecutions([]), []));
+    }
 
     // Sort by date (newest first)
-    let combined = Array.from(monthsMap.values()).sort((a: MonthData, b: MonthData) => b.year - a.year || b.monthIndex - a.monthIndex);
+    let combined: MonthData[] = Array.from(monthsMap.values()).sort((a: MonthData, b: MonthData) => b.year - a.year || b.monthIndex - a.monthIndex);
 
     // Also include custom historical periods from the store (if any)
     try {
       const historical = dataManager.getHistoricalPeriods();
       if (Array.isArray(historical) && historical.length > 0) {
-        const histItems: any[] = [];
+        const histItems: MonthData[] = [];
         historical.forEach((p: any) => {
           try {
             const rawStart = p.start || p.startDate || p.startAt || p.startISO || p.startTimestamp;
@@ -205,73 +175,32 @@ export const CompactAnalytics: React.FC<CompactAnalyticsProps> = ({ onBack }) =>
 
             // Prefer using a period's savedState snapshot if present — this keeps
             // analytics consistent with the TaskTable view which reads savedState
-            // when displaying historical periods. Fall back to scanning global
-            // state.executions for legacy data.
-            let periodExecs: any[] = [];
-            try {
-              if (p && (p as any).savedState && Array.isArray((p as any).savedState.executions)) {
-                periodExecs = (p as any).savedState.executions.filter((ex: any) => {
-                  const task = state.tasks[ex.taskId] || null;
-                  // If the saved snapshot contains tasks without matching live tasks,
-                  // include them anyway as they are part of the archived snapshot.
-                  return !task || task.wgId === currentWG.id;
-                });
-              } else {
-                periodExecs = Object.values(state.executions || {}).filter((ex: any) => {
-                  const task = state.tasks[ex.taskId];
-                  if (!task || task.wgId !== currentWG.id) return false;
-
-                  // Prefer explicit period binding when present (newer executions)
-                  if (ex.periodId !== undefined && ex.periodId !== null) {
-                    return ex.periodId === p.id;
-                  }
-
-                  // Fallback for legacy executions without periodId: use executedAt/date range
-                  const d = new Date(ex.executedAt || ex.date);
-                  return d >= start && d <= end;
-                });
-              }
-            } catch (err) {
-              console.warn('[CompactAnalytics] Failed to read savedState for period, falling back to live executions', err);
-              periodExecs = Object.values(state.executions || {}).filter((ex: any) => {
-                const task = state.tasks[ex.taskId];
-                if (!task || task.wgId !== currentWG.id) return false;
-                if (ex.periodId !== undefined && ex.periodId !== null) return ex.periodId === p.id;
-                const d = new Date(ex.executedAt || ex.date);
-                return d >= start && d <= end;
-              });
-            }
-
-            const totalPoints = periodExecs.reduce((sum: number, ex: any) => sum + (ex.pointsAwarded || 0), 0);
-            const completedTasks = periodExecs.length;
-            const label = formatShortLabel({ startDate: start.toISOString(), endDate: end.toISOString() } as any) || p.name;
+            // when displaying historical periods. Fall back to the live executions
+            // in the period's date range for legacy data.
+            const periodExecs = historicalPeriodExecutions(p, start, end);
+            const summary = analyticsCache.remember(
+              `compact|${currentWG.id}|${p.id}`,
+              [periodExecs],
+              () => AnalyticsService.summarizeExecutions(periodExecs)
+            );
 
             // Determine task count for this period: count tasks that actually have
             // at least one execution in the snapshot (i.e. "abgehakte" tasks)
-            let taskCount = 0;
-            try {
-              if (Array.isArray(periodExecs) && periodExecs.length > 0) {
-                taskCount = Array.from(new Set((periodExecs || []).map((ex: any) => ex.taskId))).filter(Boolean).length;
-              } else if (p && (p as any).savedState && Array.isArray((p as any).savedState.tasks)) {
-                // Fallback: if there are no executions, fall back to counting tasks in snapshot
-                taskCount = (p as any).savedState.tasks.filter((t: any) => !t.wgId || t.wgId === currentWG.id).length;
-              } else {
-                taskCount = 0;
-              }
-            } catch (err) {
-              taskCount = Array.from(new Set((periodExecs || []).map((ex: any) => ex.taskId))).filter(Boolean).length;
+            let taskCount = summary.taskCount;
+            if (periodExecs.length === 0 && p && (p as any).savedState && Array.isArray((p as any).savedState.tasks)) {
+              // Fallback: if there are no executions, fall back to counting tasks in snapshot
+              taskCount = (p as any).savedState.tasks.filter((t: any) => !t.wgId || t.wgId === currentWG.id).length;
             }
 
             histItems.push({
               id: p.id,
               key: `period-${p.id}`,
-              month: label,
+              month: formatShortLabel({ startDate: start.toISOString(), endDate: end.toISOString() } as any) || p.name,
               startDate: start.toISOString(),
               endDate: end.toISOString(),
               year: start.getFullYear(),
               monthIndex: start.getMonth(),
-              totalPoints,
-              completedTasks,
+              ...summary,
               taskCount,
               executions: periodExecs,
               isHistorical: true
@@ -288,18 +217,6 @@ export const CompactAnalytics: React.FC<CompactAnalyticsProps> = ({ onBack }) =>
       console.warn('[CompactAnalytics] getHistoricalPeriods failed', err);
     }
 
-    // For regular months (not historical periods) compute taskCount = unique tasks referenced by executions
-    combined = combined.map((m: any) => {
-      try {
-        if (!m.isHistorical) {
-          m.taskCount = Array.from(new Set((m.executions || []).map((e: any) => e.taskId))).filter(Boolean).length;
-        }
-      } catch (err) {
-        m.taskCount = m.taskCount || 0;
-      }
-      return m;
-    });
-
     // Deduplicate by start/end date (prefer live/active periods)
     try {
       combined = dedupeByDate(combined as any) as any[];
@@ -307,10 +224,8 @@ export const CompactAnalytics: React.FC<CompactAnalyticsProps> = ({ onBack }) =>
       console.warn('[CompactAnalytics] dedupe failed', err);
     }
 
-    console.log(`📊 [AvailableMonths] Generated ${combined.length} months:`, combined.map(m => `${m.month}: ${m.totalPoints}P`));
-
     return combined;
-  }, [state, currentWG, expandedMonth]);
+  }, [state, currentWG, displayPeriodExecutions]);
 
   // Ensure we don't set state inside useMemo; set initial expanded month here when availableMonths changes
   React.useEffect(() => {
@@ -337,25 +252,9 @@ export const CompactAnalytics: React.FC<CompactAnalyticsProps> = ({ onBack }) =>
     
     // Calculate user stats for the month
     const userStats = users.map((user: any) => {
-      const userExecutions = monthData.executions.filter((e: any) => e.executedBy === user.id);
-      
-      // Debug: Log execution details
-      console.log(`📊 [CompactAnalytics] User ${user.name} executions:`, userExecutions.map(e => ({
-        id: e.id,
-        taskId: e.taskId,
-        pointsAwarded: e.pointsAwarded,
-        points: e.points,
-        executedAt: e.executedAt,
-        date: e.date
-      })));
-      
-      const totalPoints = userExecutions.reduce((sum: number, e: any) => sum + (e.pointsAwarded || 0), 0);
-      const completedTasks = userExecutions.length;
+      const { totalPoints = 0, completedTasks = 0 } = monthData.users[user.id] || {};
       const averagePoints = completedTasks > 0 ? totalPoints / completedTasks : 0;
 
-      // Debug logging for user names
-      console.log(`📊 [CompactAnalytics] User: ${user.name || 'UNNAMED'} (id: ${user.id}), Points: ${totalPoints}, Tasks: ${completedTasks}`);
-
       return {
         userId: user.id,
         username: user.name || user.username || `User ${user.id}`, // Fallback for missing names
@@ -449,13 +348,8 @@ export const CompactAnalytics: React.FC<CompactAnalyticsProps> = ({ onBack }) =>
   const timelineData = useMemo(() => {
     if (!expandedAnalytics || !expandedMonthData) return [];
     
-    console.log('🔍 [TimelineData] Starting timeline generation...');
-    console.log('🔍 [TimelineData] Month data:', expandedMonthData);
-    console.log('🔍 [TimelineData] User stats:', expandedAnalytics.userStats);
-    
-    const executions = expandedMonthData.executions;
-    console.log('🔍 [TimelineData] Raw executions:', executions.length);
-    
+    const executions = monthExecutions(expandedMonthData);
+
     // Filter and validate executions
     const validExecutions = executions.filter((execution: any) => {
       const hasValidDate = execution.executedAt || execution.date;
@@ -475,8 +369,6 @@ export const CompactAnalytics: React.FC<CompactAnalyticsProps> = ({ onBack }) =>
       return true;
     });
     
-    console.log('🔍 [TimelineData] Valid executions:', validExecutions.length);
-    
     const timelineMap = new Map();
     
     // Initialize timeline for the month
@@ -485,13 +377,6 @@ export const CompactAnalytics: React.FC<CompactAnalyticsProps> = ({ onBack }) =>
     const today = new Date();
     const actualEndDate = endDate > today ? today : endDate;
     
-    console.log('🔍 [TimelineData] Date range:', {
-      start: startDate.toISOString().split('T')[0],
-      end: actualEndDate.toISOString().split('T')[0],
-      monthIndex: expandedMonthData.monthIndex,
-      year: expandedMonthData.year
-    });
-    
     // Create timeline points for each day
     for (let d = new Date(startDate); d <= actualEndDate; d.setDate(d.getDate() + 1)) {
       const dateStr = `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, '0')}-${String(d.getDate()).padStart(2, '0')}`;
@@ -508,8 +393,6 @@ export const CompactAnalytics: React.FC<CompactAnalyticsProps> = ({ onBack }) =>
       timelineMap.set(dateStr, dataPoint);
     }
     
-    console.log('🔍 [TimelineData] Timeline days created:', timelineMap.size);
-    
     // Process executions and add to timeline
     validExecutions.forEach((execution: any) => {
       const execDate = new Date(execution.executedAt || execution.date);
@@ -537,8 +420,6 @@ export const CompactAnalytics: React.FC<CompactAnalyticsProps> = ({ onBack }) =>
       const points = execution.pointsAwarded || 0;
       const existingPoints = dataPoint[userStat.username] || 0;
       dataPoint[userStat.username] = existingPoints + points;
-      
-      console.log(`📊 [TimelineData] Added ${points}P for ${userStat.username} on ${dateStr} (daily total: ${dataPoint[userStat.username]})`);
     });    // Convert to cumulative points
     const timeline = Array.from(timelineMap.values()).sort((a, b) => 
       new Date(a.originalDate).getTime() - new Date(b.originalDate).getTime()
@@ -559,21 +440,11 @@ export const CompactAnalytics: React.FC<CompactAnalyticsProps> = ({ onBack }) =>
         const dailyPoints = day[userStat.username] || 0;
         userCumulative[userStat.username] += dailyPoints;
         result[userStat.username] = userCumulative[userStat.username];
-        
-        if (dailyPoints > 0) {
-          console.log(`📊 [TimelineData] Day ${day.date}: ${userStat.username} +${dailyPoints}P, cumulative = ${result[userStat.username]}P`);
-        }
       });
       
       return result;
     });
     
-    console.log('🔍 [TimelineData] Final timeline length:', cumulativeTimeline.length);
-    console.log('🔍 [TimelineData] Final user totals:', userCumulative);
-    if (cumulativeTimeline.length > 0) {
-      console.log('🔍 [TimelineData] Last timeline entry:', cumulativeTimeline[cumulativeTimeline.length - 1]);
-    }
-    
     return cumulativeTimeline;
   }, [expandedAnalytics, expandedMonthData, state.users]);
 
@@ -583,7 +454,7 @@ export const CompactAnalytics: React.FC<CompactAnalyticsProps> = ({ onBack }) =>
 
     // Build user list from WG members plus any user IDs referenced in executions
     const memberIds = Array.isArray(currentWG.memberIds) ? [...currentWG.memberIds] : [];
-    const execUserIds = Array.from(new Set((monthData.executions || []).map((e: any) => e.executedBy).filter(Boolean)));
+    const execUserIds = Object.keys(monthData.users || {}).filter(id => id && id !== 'undefined');
     const allUserIds = Array.from(new Set([...memberIds, ...execUserIds]));
 
     const users = allUserIds.map((id: string) => {
@@ -594,9 +465,7 @@ export const CompactAnalytics: React.FC<CompactAnalyticsProps> = ({ onBack }) =>
     }).filter(Boolean) || [];
 
     const userStats = users.map((user: any) => {
-      const userExecutions = (monthData.executions || []).filter((e: any) => e.executedBy === user.id);
-      const totalPoints = userExecutions.reduce((sum: number, e: any) => sum + (e.pointsAwarded || 0), 0);
-      const completedTasks = userExecutions.length;
+      const { totalPoints = 0, completedTasks = 0 } = (monthData.users || {})[user.id] || {};
       const averagePoints = completedTasks > 0 ? totalPoints / completedTasks : 0;
       return {
         userId: user.id,
@@ -614,7 +483,7 @@ export const CompactAnalytics: React.FC<CompactAnalyticsProps> = ({ onBack }) =>
     };
 
     // Build timeline similar to timelineData useMemo
-    const executions = monthData.executions || [];
+    const executions = monthExecutions(monthData);
     const validExecutions = executions.filter((execution: any) => {
       const hasValidDate = execution.executedAt || execution.date;
       const hasValidUser = execution.executedBy || execution.userId;
@@ -667,17 +536,9 @@ export const CompactAnalytics: React.FC<CompactAnalyticsProps> = ({ onBack }) =>
   const taskProgressData = useMemo(() => {
     if (!expandedAnalytics || !expandedMonthData || !state.tasks) return [];
     
-    const executions = expandedMonthData.executions;
-    const taskCounts = new Map();
-    
-    // Count executions per task
-    executions.forEach((execution: any) => {
-      const task = state.tasks[execution.taskId];
-      if (task) {
-        taskCounts.set(task.id, (taskCounts.get(task.id) || 0) + 1);
-      }
-    });
-    
+    // Executions per task, from the month's summary
+    const taskCounts = new Map(Object.entries(expandedMonthData.taskCounts || {}));
+
     // Create data for each task
     const taskData = Object.values(state.tasks)
       .filter((task: any) => task.wgId === state.currentWG?.id)
@@ -715,9 +576,6 @@ export const CompactAnalytics: React.FC<CompactAnalyticsProps> = ({ onBack }) =>
     // Sort userStats by totalPoints (descending) for consistent ordering
     const sortedUserStats = [...expandedAnalytics.userStats].sort((a, b) => (b.totalPoints || 0) - (a.totalPoints || 0));
     
-    console.log('🍰 [PIE CHART] Original user stats:', expandedAnalytics.userStats);
-    console.log('🍰 [PIE CHART] Sorted user stats:', sortedUserStats);
-    
     const chartData = {
       labels: sortedUserStats.map((u: any) => u.username),
       datasets: [{
@@ -731,11 +589,6 @@ export const CompactAnalytics: React.FC<CompactAnalyticsProps> = ({ onBack }) =>
       }]
     };
     
-    console.log('🍰 [PIE CHART] Final chart data:', chartData);
-    console.log('🍰 [PIE CHART] Labels-Data mapping:', 
-      chartData.labels.map((label, i) => `${label} → ${chartData.datasets[0].data[i]}P`)
-    );
-    
     return chartData;
   })() : null;
 
@@ -838,12 +691,7 @@ export const CompactAnalytics: React.FC<CompactAnalyticsProps> = ({ onBack }) =>
           const isExpanded = expandedMonth === monthData.key;
           const localView = isExpanded ? computeMonthAnalytics(monthData) : null;
           const localTaskProgressData = isExpanded ? (() => {
-            const executions = monthData.executions || [];
-            const taskCounts = new Map<string, number>();
-            executions.forEach((execution: any) => {
-              const task = state.tasks[execution.taskId];
-              if (task) taskCounts.set(task.id, (taskCounts.get(task.id) || 0) + 1);
-            });
+            const taskCounts = new Map<string, number>(Object.entries(monthData.taskCounts || {}));
             const taskData = Object.values(state.tasks || {})
               .filter((task: any) => task.wgId === state.currentWG?.id)
               .map((task: any) => {
@@ -1021,8 +869,6 @@ export const CompactAnalytics: React.FC<CompactAnalyticsProps> = ({ onBack }) =>
                             {/* Member Lines */}
                             {localView.analytics.userStats.map((userStat: any, index: number) => {
                               const colors = generateColors(localView.analytics.userStats.length);
-                              console.log(`📊 [Chart] Rendering line for ${userStat.username} with dataKey "${userStat.username}"`);
-                              console.log(`📊 [Chart] Sample timeline data for user:`, localView.timeline.slice(0, 3).map((d: any) => ({ date: d.date, [userStat.username]: d[userStat.username] })));
                               return (
                                 <Line
                                   key={userStat.userId}
@@ -1128,42 +974,23 @@ export const CompactAnalytics: React.FC<CompactAnalyticsProps> = ({ onBack }) =>
                                     generateLabels: (chart: any) => {
                                       const original = ChartJS.defaults.plugins.legend.labels.generateLabels;
                                       const labels = original.call(this, chart);
-                                      
-                                      console.log('🏷️ [Legend] Chart object:', chart);
-                                      console.log('🏷️ [Legend] Original labels from Chart.js:', labels);
-                                      
+
                                       // FIXED: Verwende die echten Chart-Labels und -Daten direkte von Chart.js
                                       // anstatt unsere userStatsRef, da Chart.js möglicherweise eine andere Reihenfolge verwendet
                                       if (labels && chart?.data?.labels && chart?.data?.datasets?.[0]?.data) {
                                         const chartLabels = chart.data.labels;
                                         const chartData = chart.data.datasets[0].data;
-                                        const userStatsRef = chart.data.datasets[0].userStatsRef;
-                                        
-                                        console.log('🏷️ [Legend] Chart labels:', chartLabels);
-                                        console.log('🏷️ [Legend] Chart data:', chartData);
-                                        
+
                                         labels.forEach((label: any, i: number) => {
                                           if (i < chartLabels.length) {
                                             const username = chartLabels[i];
                                             const points = chartData[i];
-                                            
-                                            // Finde den echten Benutzer anhand des Namens für zusätzliche Daten
-                                            const userStat = userStatsRef?.find((u: any) => u.username === username);
-                                            
+
                                             const shortName = username.length > 12 ? 
                                               username.substring(0, 10) + '...' : 
                                               username;
                                             
                                             label.text = `${shortName} (${points}P)`;
-                                            
-                                            // Debug logging to verify correct mapping
-                                            console.log(`🏷️ [Legend] Index ${i}: ${shortName} → ${points}P (Chart: ${username})`, {
-                                              originalLabel: label.text,
-                                              chartLabel: username,
-                                              chartData: points,
-                                              userStat,
-                                              dataIndex: i
-                                            });
                                           }
                                         });
                                       }
@@ -1193,15 +1020,7 @@ export const CompactAnalytics: React.FC<CompactAnalyticsProps> = ({ onBack }) =>
                                     if (chartLabels && chartDataValues && context.dataIndex < chartLabels.length) {
                                       const userName = chartLabels[context.dataIndex];
                                       const shortName = userName.length > 8 ? userName.substring(0, 6) + '...' : userName;
-                                      
-                                      // Debug logging for data labels
-                                      console.log(`🏷️ [DataLabel] Index ${context.dataIndex}: ${shortName} → ${value}P (${percentage}%) [Chart: ${userName}]`, {
-                                        userName,
-                                        totalValue: value,
-                                        percentage,
-                                        chartData: chartDataValues[context.dataIndex]
-                                      });
-                                      
+
                                       return `${shortName}\n${value}P\n(${percentage}%)`;
                                     }
                                     
@@ -16,17 +16,7 @@ export const UserAnalyticsPage: React.FC<UserAnalyticsPageProps> = ({ userId, on
   const userAnalytics = useMemo(() => {
     if (!currentWG || !userId) return null;
 
-    const user = state.users[userId];
-    if (!user) return null;
-
-    const executions = Object.values(state.executions || {}).filter((e: any) => {
-      const task = state.tasks[e.taskId];
-      return task && task.wgId === currentWG.id && e.executedBy === userId;
-    });
-
-    const tasks = Object.values(state.tasks || {}).filter((t: any) => t.wgId === currentWG.id);
-
-    return AnalyticsService.calculateUserAnalytics(userId, user, executions as any, tasks as any);
+    return AnalyticsService.getUserAnalytics(state, currentWG.id, userId);
   }, [state, currentWG, userId]);
 
   if (!userAnalytics) {
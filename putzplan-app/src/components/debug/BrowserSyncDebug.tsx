@@ -37,11 +37,17 @@ export const BrowserSyncDebug: React.FC<BrowserSyncDebugProps> = ({ onClose }) =
     try {
       const mainData = localStorage.getItem('putzplan-data');
       const syncData = localStorage.getItem('putzplan-sync');
+      // Entity collections and period snapshots live in "putzplan-data:*" keys
+      let mainDataLength = mainData ? mainData.length : 0;
+      for (let i = 0; i < localStorage.length; i++) {
+        const key = localStorage.key(i);
+        if (key && key.startsWith('putzplan-data:')) mainDataLength += (localStorage.getItem(key) || '').length;
+      }
       
       return {
         hasMainData: !!mainData,
         hasSyncData: !!syncData,
-        mainDataSize: mainData ? Math.round(mainData.length / 1024) : 0,
+        mainDataSize: Math.round(mainDataLength / 1024),
         syncDataSize: syncData ? Math.round(syncData.length / 1024) : 0
       };
     } catch {
@@ -84,27 +84,21 @@ export const UrgentTaskProvider = ({ children }: UrgentTaskProviderProps) => {
       
       dataManager.updateTask(taskId, { isAlarmed: newIsAlarmed } as any);
       
-      // Wenn Task als HOT markiert wird, sende WhatsApp-Benachrichtigung
+      // Wenn Task als HOT markiert wird, WhatsApp-Benachrichtigung einreihen
+      // (nicht abwarten: der Server sendet asynchron)
       if (newIsAlarmed && current) {
-        console.log('🔥 Task als HOT markiert, sende WhatsApp-Benachrichtigung...');
+        console.log('🔥 Task als HOT markiert, reihe WhatsApp-Benachrichtigung ein...');
         
-        try {
-          const result = await whatsappService.handleHotTaskCreated(
-            current.title || `Task ${taskId}`,
-            current.description || ''
-          );
-          
+        whatsappService.queueHotTaskNotification(
+          current.title || `Task ${taskId}`,
+          current.description || ''
+        ).then(result => {
           if (result.success) {
-            console.log('✅ WhatsApp-Benachrichtigung gesendet:', result.message);
-            // Optional: Zeige Erfolgs-Notification (falls Toast-System existiert)
+            console.log('✅ WhatsApp-Benachrichtigung eingereiht:', result.message);
           } else {
             console.warn('⚠️ WhatsApp-Benachrichtigung fehlgeschlagen:', result.message);
-            // Optional: Zeige Warn-Notification
           }
-        } catch (error: any) {
-          console.error('❌ Fehler bei WhatsApp-Benachrichtigung:', error);
-          // Optional: Zeige Fehler-Notification
-        }
+        });
       }
     } catch (e) {
       // Fallback to local toggle if dataManager fails
@@ -152,7 +152,8 @@ function runCompleteDemo() {
     console.log(`✅ [DEMO] Data size: ${(stored.length / 1024).toFixed(2)}KB`);
     
     // Verify WG periods
-    const wgData = parsed.state.wgs?.[wg.id];
+    const wgs = JSON.parse(localStorage.getItem('putzplan-data:wgs') || '{}');
+    const wgData = wgs[wg.id];
     if (wgData?.periods) {
       console.log(`✅ [DEMO] Analytics periods persisted: ${wgData.periods.length}`);
     }
@@ -0,0 +1,393 @@
+import { AppState, Task, TaskExecution } from '../types';
+import { executionTime } from './stateIndex';
+
+// ========================================
+// INKREMENTELLER ANALYTICS-CACHE
+// ========================================
+
+/** Scope covering every execution of a WG. */
+export const ALL_PERIODS = 'all';
+
+/** Scope of a calendar month (by `date || executedAt`, local time). */
+export const monthScope = (date: Date): string => `month:${date.getFullYear()}-${date.getMonth()}`;
+
+/** Scope of executions explicitly tagged with `periodId`. */
+export const periodScope = (periodId: string): string => `period:${periodId}`;
+
+/**
+ * Laufende Summen über die Executions eines Users. Jede Execution wird in
+ * O(1) hinzugefügt bzw. entfernt (siehe `applyExecution`); alle Kennzahlen
+ * von UserAnalytics lassen sich daraus ohne erneuten Durchlauf über die
+ * Executions ableiten.
+ */
+export interface UserAggregate {
+  totalPoints: number;
+  totalTasks: number;
+  taskCounts: Map<string, number>;
+  taskPoints: Map<string, number>;
+  /** taskId -> pointsAwarded -> Anzahl (für Hot-Task-Erkennung gegen aktuelle Task-Punkte) */
+  taskPointValues: Map<string, Map<number, number>>;
+  weeks: Map<number, { points: number; tasks: number }>;
+  hours: number[];
+  /** lokale Mitternacht (ms) -> Anzahl Executions an diesem Tag */
+  days: Map<number, number>;
+}
+
+const bump = <K>(map: Map<K, number>, key: K, delta: number) => {
+  const next = (map.get(key) || 0) + delta;
+  if (next === 0) map.delete(key); else map.set(key, next);
+};
+
+export const getWeekOfYear = (date: Date): number => {
+  const firstDayOfYear = new Date(date.getFullYear(), 0, 1);
+  const pastDaysOfYear = (date.getTime() - firstDayOfYear.getTime()) / 86400000;
+  return Math.ceil((pastDaysOfYear + firstDayOfYear.getDay() + 1) / 7);
+};
+
+export const createUserAggregate = (): UserAggregate => ({
+  totalPoints: 0,
+  totalTasks: 0,
+  taskCounts: new Map(),
+  taskPoints: new Map(),
+  taskPointValues: new Map(),
+  weeks: new Map(),
+  hours: new Array(24).fill(0),
+  days: new Map()
+});
+
+/** Adds (`sign = 1`) or removes (`sign = -1`) one execution from `agg`. */
+export const applyExecution = (agg: UserAggregate, exec: TaskExecution, sign: 1 | -1): void => {
+  const points = exec.pointsAwarded || 0;
+  agg.totalPoints += sign * points;
+  agg.totalTasks += sign;
+
+  bump(agg.taskCounts, exec.taskId, sign);
+  bump(agg.taskPoints, exec.taskId, sign * points);
+  if (!agg.taskCounts.has(exec.taskId)) agg.taskPoints.delete(exec.taskId);
+  let values = agg.taskPointValues.get(exec.taskId);
+  if (!values) { values = new Map(); agg.taskPointValues.set(exec.taskId, values); }
+  bump(values, points, sign);
+  if (values.size === 0) agg.taskPointValues.delete(exec.taskId);
+
+  const date = new Date(exec.executedAt);
+  if (isNaN(date.getTime())) return;
+  const week = getWeekOfYear(date);
+  const weekly = agg.weeks.get(week) || { points: 0, tasks: 0 };
+  weekly.points += sign * points;
+  weekly.tasks += sign;
+  if (weekly.tasks === 0) agg.weeks.delete(week); else agg.weeks.set(week, weekly);
+  agg.hours[date.getHours()] += sign;
+  bump(agg.days, new Date(date.getFullYear(), date.getMonth(), date.getDate()).getTime(), sign);
+};
+
+/** Builds one aggregate per executing user in a single pass. */
+export const aggregateByUser = (executions: TaskExecution[]): Map<string, UserAggregate> => {
+  const byUser = new Map<string, UserAggregate>();
+  executions.forEach(exec => {
+    let agg = byUser.get(exec.executedBy);
+    if (!agg) { agg = createUserAggregate(); byUser.set(exec.executedBy, agg); }
+    applyExecution(agg, exec, 1);
+  });
+  return byUser;
+};
+
+export interface ScopeAggregate {
+  /** Bumped on every change so memoized results know when to recompute. */
+  version: number;
+  users: Map<string, UserAggregate>;
+}
+
+interface Recorded {
+  id: string;
+  execution: TaskExecution;
+  wgId: string;
+  scopes: string[];
+}
+
+interface DayBucket {
+  version: number;
+  executions: Map<string, TaskExecution>;
+}
+
+interface Memo<T> {
+  stamp: unknown[];
+  value: T;
+}
+
+/** Above this many changed executions a full rebuild is cheaper than patching. */
+const REBUILD_THRESHOLD = 2048;
+
+const DAY_MS = 86400000;
+const utcDay = (time: number) => Math.floor(time / DAY_MS) * DAY_MS;
+
+/**
+ * Analytics aggregates per (wgId, scope, user), kept up to date incrementally.
+ *
+ * `sync()` diffs the `executions` / `tasks` collections against the ones seen
+ * last (DataManager replaces them immutably on every write) and applies only
+ * the changed executions to the running totals; executeTask / addExecution
+ * skip even the diff via `noteExecutionsChanged()`. Derived results are
+ * memoized with `remember()` under a stamp from `scopeStamp()`: open scopes
+ * recompute when their aggregate, the tasks, the users or the current day
+ * change, closed scopes (past months, periods other than the current one) are
+ * frozen and only recompute when one of their own executions changes.
+ */
+export class AnalyticsCache {
+  private executionsRef: Record<string, TaskExecution> | null = null;
+  private tasksRef: Record<string, Task> | null = null;
+
+  private recorded = new Map<string, Recorded>();
+  private executionsByTask = new Map<string, Set<string>>();
+  private scopes = new Map<string, Map<string, ScopeAggregate>>(); // wgId -> scope -> aggregate
+  private days = new Map<string, Map<number, DayBucket>>(); // wgId -> UTC day -> bucket
+
+  private memo = new Map<string, Memo<unknown>>();
+  // Monotonic counter for scope/daily versions; never reset so memoized stamps stay unique
+  private clock = 0;
+
+  /** Brings the aggregates up to date with `state`; returns `this` for chaining. */
+  sync(state: Pick<AppState, 'executions' | 'tasks'>): this {
+    const tasks = state.tasks || {};
+    const executions = state.executions || {};
+    if (executions === this.executionsRef && tasks === this.tasksRef) return this;
+
+    const prevTasks = this.tasksRef;
+    const prevExecutions = this.executionsRef;
+    this.tasksRef = tasks;
+    this.executionsRef = executions;
+
+    if (!prevExecutions || !prevTasks || !this.patchExecutions(prevExecutions, executions)) {
+      this.rebuild(executions);
+      return this;
+    }
+    if (tasks !== prevTasks) this.rerouteTasks(prevTasks, tasks);
+    return this;
+  }
+
+  /** Drops all aggregates and memoized results. */
+  clear(): void {
+    this.executionsRef = null;
+    this.tasksRef = null;
+    this.reset();
+    this.memo.clear();
+  }
+
+  // ----------------------------------------
+  // Queries (call sync() first)
+  // ----------------------------------------
+
+  /** Running totals of a WG for a scope (`ALL_PERIODS`, `monthScope()`, `periodScope()`). */
+  scopeAggregate(wgId: string, scope: string): ScopeAggregate {
+    let byScope = this.scopes.get(wgId);
+    if (!byScope) { byScope = new Map(); this.scopes.set(wgId, byScope); }
+    let aggregate = byScope.get(scope);
+    if (!aggregate) { aggregate = { version: ++this.clock, users: new Map() }; byScope.set(scope, aggregate); }
+    return aggregate;
+  }
+
+  /** `monthScope()` keys of the months in which the WG has executions. */
+  monthScopes(wgId: string): string[] {
+    const scopes: string[] = [];
+    this.scopes.get(wgId)?.forEach((aggregate, scope) => {
+      if (scope.startsWith('month:') && aggregate.users.size > 0) scopes.push(scope);
+    });
+    return scopes;
+  }
+
+  /**
+   * Memo stamp for a result derived from `scopeAggregate(wgId, scope)` and
+   * `extra`. Closed scopes ignore task, user and date changes.
+   */
+  scopeStamp(state: Pick<AppState, 'users' | 'currentPeriod'>, wgId: string, scope: string, extra: unknown[] = []): unknown[] {
+    const stamp = [this.scopeAggregate(wgId, scope).version, ...extra];
+    if (this.isClosed(state, scope)) return stamp;
+    const today = new Date();
+    today.setHours(0, 0, 0, 0);
+    return [...stamp, this.tasksRef, state.users, today.getTime()];
+  }
+
+  /**
+   * The WG's executions whose `date || executedAt` lies in [start, end], read
+   * from the per-day buckets: cost depends on the days in the range and their
+   * executions, not on the size of the history. Only the two boundary days
+   * are checked execution by execution.
+   */
+  executionsBetween(wgId: string, start: number, end: number): TaskExecution[] {
+    const out: TaskExecution[] = [];
+    const buckets = this.days.get(wgId);
+    if (!buckets || !(start <= end)) return out;
+    for (let day = utcDay(start); day <= end; day += DAY_MS) {
+      const bucket = buckets.get(day);
+      if (!bucket) continue;
+      const whole = day >= start && day + DAY_MS - 1 <= end;
+      bucket.executions.forEach(execution => {
+        if (whole) { out.push(execution); return; }
+        const time = executionTime(execution);
+        if (time >= start && time <= end) out.push(execution);
+      });
+    }
+    return out;
+  }
+
+  /** Changes whenever `executionsBetween(wgId, start, end)` may have changed; for memoizing derived views. */
+  rangeVersion(wgId: string, start: number, end: number): number {
+    const buckets = this.days.get(wgId);
+    let version = 0;
+    if (!buckets || !(start <= end)) return version;
+    for (let day = utcDay(start); day <= end; day += DAY_MS) {
+      const bucket = buckets.get(day);
+      if (bucket && bucket.version > version) version = bucket.version;
+    }
+    return version;
+  }
+
+  /**
+   * Fast path for writers that know exactly which executions changed between
+   * two collection objects (e.g. DataManager.executeTask / addExecution).
+   * Falls back to the regular diff in `sync()` if `prev` is not what the cache
+   * last saw.
+   */
+  noteExecutionsChanged(prev: Record<string, TaskExecution>, next: Record<string, TaskExecution>, ids: string[]): void {
+    if (this.executionsRef !== prev || prev === next) return;
+    this.executionsRef = next;
+    ids.forEach(id => {
+      if (prev[id] === next[id]) return;
+      if (prev[id] !== undefined) this.track(id, prev[id], -1);
+      if (next[id] !== undefined) this.track(id, next[id], 1);
+    });
+  }
+
+  /**
+   * Memoizes `compute()` under `key` until `stamp` changes (compared element
+   * by element with ===).
+   */
+  remember<T>(key: string, stamp: unknown[], compute: () => T): T {
+    const hit = this.memo.get(key) as Memo<T> | undefined;
+    if (hit && hit.stamp.length === stamp.length && hit.stamp.every((v, i) => v === stamp[i])) return hit.value;
+    const value = compute();
+    this.memo.set(key, { stamp, value });
+    return value;
+  }
+
+  // ----------------------------------------
+  // Maintenance
+  // ----------------------------------------
+
+  private isClosed(state: Pick<AppState, 'currentPeriod'>, scope: string): boolean {
+    if (scope.startsWith('period:')) {
+      return !!state.currentPeriod && scope !== periodScope(state.currentPeriod.id);
+    }
+    if (scope.startsWith('month:')) {
+      const [year, month] = scope.slice('month:'.length).split('-').map(Number);
+      const now = new Date();
+      return year < now.getFullYear() || (year === now.getFullYear() && month < now.getMonth());
+    }
+    return false;
+  }
+
+  private scopesFor(execution: TaskExecution): string[] {
+    const scopes = [ALL_PERIODS];
+    const time = executionTime(execution);
+    if (!Number.isNaN(time)) scopes.push(monthScope(new Date(time)));
+    const periodId = (execution as any).periodId;
+    if (periodId !== undefined && periodId !== null) scopes.push(periodScope(periodId));
+    return scopes;
+  }
+
+  private reset(): void {
+    this.recorded.clear();
+    this.executionsByTask.clear();
+    this.scopes.clear();
+    this.days.clear();
+  }
+
+  private rebuild(executions: Record<string, TaskExecution>): void {
+    this.reset();
+    for (const id in executions) this.track(id, executions[id], 1);
+  }
+
+  private patchExecutions(prev: Record<string, TaskExecution>, next: Record<string, TaskExecution>): boolean {
+    if (prev === next) return true;
+    const changes: Array<[string, TaskExecution | undefined, TaskExecution | undefined]> = [];
+    for (const id in prev) {
+      if (!(id in next)) {
+        changes.push([id, prev[id], undefined]);
+        if (changes.length > REBUILD_THRESHOLD) return false;
+      }
+    }
+    for (const id in next) {
+      if (prev[id] !== next[id]) {
+        changes.push([id, prev[id], next[id]]);
+        if (changes.length > REBUILD_THRESHOLD) return false;
+      }
+    }
+    changes.forEach(([id, before, after]) => {
+      if (before !== undefined) this.track(id, before, -1);
+      if (after !== undefined) this.track(id, after, 1);
+    });
+    return true;
+  }
+
+  /** Re-files executions of tasks that were added, removed or moved to another WG. */
+  private rerouteTasks(prev: Record<string, Task>, next: Record<string, Task>): void {
+    const moved: string[] = [];
+    for (const id in prev) if (!(id in next)) moved.push(id);
+    for (const id in next) {
+      if (prev[id] !== next[id] && prev[id]?.wgId !== next[id]?.wgId) moved.push(id);
+    }
+    moved.forEach(taskId => {
+      Array.from(this.executionsByTask.get(taskId) || []).forEach(id => {
+        const execution = this.executionsRef![id];
+        if (!execution) return;
+        this.track(id, execution, -1);
+        this.track(id, execution, 1);
+      });
+    });
+  }
+
+  private track(id: string, execution: TaskExecution, sign: 1 | -1): void {
+    if (sign === 1) {
+      let ids = this.executionsByTask.get(execution.taskId);
+      if (!ids) { ids = new Set(); this.executionsByTask.set(execution.taskId, ids); }
+      ids.add(id);
+      const wgId = this.tasksRef?.[execution.taskId]?.wgId;
+      if (!wgId) return;
+      const record: Recorded = { id, execution, wgId, scopes: this.scopesFor(execution) };
+      this.recorded.set(id, record);
+      this.apply(record, 1);
+    } else {
+      const ids = this.executionsByTask.get(execution.taskId);
+      ids?.delete(id);
+      if (ids && ids.size === 0) this.executionsByTask.delete(execution.taskId);
+      const record = this.recorded.get(id);
+      if (!record) return;
+      this.recorded.delete(id);
+      this.apply(record, -1);
+    }
+  }
+
+  private apply(record: Recorded, sign: 1 | -1): void {
+    const { id, execution, wgId } = record;
+    record.scopes.forEach(scope => {
+      const aggregate = this.scopeAggregate(wgId, scope);
+      let user = aggregate.users.get(execution.executedBy);
+      if (!user) { user = createUserAggregate(); aggregate.users.set(execution.executedBy, user); }
+      applyExecution(user, execution, sign);
+      if (user.totalTasks === 0) aggregate.users.delete(execution.executedBy);
+      aggregate.version = ++this.clock;
+    });
+
+    const time = executionTime(execution);
+    if (Number.isNaN(time)) return;
+    let buckets = this.days.get(wgId);
+    if (!buckets) { buckets = new Map(); this.days.set(wgId, buckets); }
+    const day = utcDay(time);
+    let bucket = buckets.get(day);
+    if (!bucket) { bucket = { version: 0, executions: new Map() }; buckets.set(day, bucket); }
+    if (sign === 1) bucket.executions.set(id, execution); else bucket.executions.delete(id);
+    bucket.version = ++this.clock;
+  }
+}
+
+/** Shared cache used by AnalyticsService / PeriodAnalyticsService consumers. */
+export const analyticsCache = new AnalyticsCache();
@@ -1,4 +1,5 @@
-import { TaskExecution, Task, User } from '../types';
+import { AppState, TaskExecution, Task, User, WG } from '../types';
+import { analyticsCache, aggregateByUser, createUserAggregate, ALL_PERIODS, UserAggregate } from './analyticsCache';
 
 export interface UserAnalytics {
   userId: string;
@@ -59,6 +60,22 @@ export interface OverallAnalytics {
   teamAchievements: Achievement[];
 }
 
+/** Totals of a set of executions, per WG member and per task. */
+export interface ExecutionSummary {
+  totalPoints: number;
+  completedTasks: number;
+  /** Tasks executed at least once */
+  taskCount: number;
+  taskCounts: Record<string, number>;
+  users: Record<string, { totalPoints: number; completedTasks: number }>;
+}
+
+export interface MonthSummary extends ExecutionSummary {
+  scope: string;
+  year: number;
+  monthIndex: number;
+}
+
 export class AnalyticsService {
   static calculateUserAnalytics(
     userId: string,
@@ -66,39 +83,98 @@ export class AnalyticsService {
     executions: TaskExecution[],
     tasks: Task[]
   ): UserAnalytics {
-    const userExecutions = executions.filter(e => e.executedBy === userId);
-    const taskMap = new Map(tasks.map(t => [t.id, t]));
+    const aggregate = aggregateByUser(executions.filter(e => e.executedBy === userId)).get(userId);
+    return this.userAnalyticsFromAggregate(userId, user, aggregate || createUserAggregate(), tasks, new Map(tasks.map(t => [t.id, t])));
+  }
+
+  /**
+   * Cached analytics of one user within a WG scope (`ALL_PERIODS`,
+   * `monthScope()`, `periodScope()`), maintained incrementally by the
+   * AnalyticsCache instead of rescanning all executions.
+   */
+  static getUserAnalytics(state: AppState, wgId: string, userId: string, scope: string = ALL_PERIODS): UserAnalytics | null {
+    const user = state.users[userId];
+    if (!user) return null;
+    const cache = analyticsCache.sync(state);
+    return cache.remember(`user|${wgId}|${scope}|${userId}`, cache.scopeStamp(state, wgId, scope), () => {
+      const tasks = Object.values(state.tasks || {}).filter(t => t.wgId === wgId);
+      const aggregate = cache.scopeAggregate(wgId, scope).users.get(userId) || createUserAggregate();
+      return this.userAnalyticsFromAggregate(userId, user, aggregate, tasks, new Map(tasks.map(t => [t.id, t])));
+    });
+  }
 
-    // Debug logging für Analytics-Debugging
-    console.log(`🔍 [Analytics] User ${user.name}: ${userExecutions.length} executions`);
-    userExecutions.forEach(e => {
-      const task = taskMap.get(e.taskId);
-      console.log(`  📊 ${task?.title || e.taskId}: ${e.pointsAwarded}P (${new Date(e.executedAt).toLocaleDateString()})`);
+  /** Cached counterpart of calculateOverallAnalytics for a WG scope; see getUserAnalytics. */
+  static getOverallAnalytics(
+    state: AppState,
+    wg: Pick<WG, 'id' | 'memberIds'>,
+    scope: string = ALL_PERIODS,
+    options: { activeTasksOnly?: boolean } = {}
+  ): OverallAnalytics {
+    const cache = analyticsCache.sync(state);
+    const activeOnly = !!options.activeTasksOnly;
+    const stamp = cache.scopeStamp(state, wg.id, scope, [wg.memberIds.join(',')]);
+    return cache.remember(`overall|${wg.id}|${scope}|${activeOnly}`, stamp, () => {
+      const tasks = Object.values(state.tasks || {}).filter(t => t.wgId === wg.id && (!activeOnly || t.isActive));
+      const users = wg.memberIds.map(id => state.users[id]).filter(Boolean);
+      return this.overallAnalyticsFromAggregates(cache.scopeAggregate(wg.id, scope).users, tasks, users);
     });
+  }
 
+  /**
+   * Totals of every month in which the WG has executions (by `date ||
+   * executedAt`), read from the cached month aggregates. Each month is
+   * memoized until one of its own executions changes.
+   */
+  static getMonthSummaries(state: Pick<AppState, 'executions' | 'tasks'>, wgId: string): MonthSummary[] {
+    const cache = analyticsCache.sync(state);
+    return cache.monthScopes(wgId).map(scope => {
+      const aggregate = cache.scopeAggregate(wgId, scope);
+      return cache.remember(`month|${wgId}|${scope}`, [aggregate.version], () => {
+        const [year, monthIndex] = scope.slice('month:'.length).split('-').map(Number);
+        return { scope, year, monthIndex, ...this.summaryFromAggregates(aggregate.users) };
+      });
+    });
+  }
+
+  /** ExecutionSummary of a list of executions, in one pass. */
+  static summarizeExecutions(executions: TaskExecution[]): ExecutionSummary {
+    return this.summaryFromAggregates(aggregateByUser(executions));
+  }
+
+  private static summaryFromAggregates(byUser: Map<string, UserAggregate>): ExecutionSummary {
+    const summary: ExecutionSummary = { totalPoints: 0, completedTasks: 0, taskCount: 0, taskCounts: {}, users: {} };
+    byUser.forEach((agg, userId) => {
+      summary.totalPoints += agg.totalPoints;
+      summary.completedTasks += agg.totalTasks;
+      summary.users[userId] = { totalPoints: agg.totalPoints, completedTasks: agg.totalTasks };
+      agg.taskCounts.forEach((count, taskId) => {
+        summary.taskCounts[taskId] = (summary.taskCounts[taskId] || 0) + count;
+      });
+    });
+    summary.taskCount = Object.keys(summary.taskCounts).filter(Boolean).length;
+    return summary;
+  }
+
+  /** Analytics for one user from their running totals. */
+  static userAnalyticsFromAggregate(
+    userId: string,
+    user: User,
+    agg: UserAggregate,
+    tasks: Task[],
+    taskMap: Map<string, Task>
+  ): UserAnalytics {
     // Basis-Statistiken
-    const totalPoints = userExecutions.reduce((sum, e) => sum + (e.pointsAwarded || 0), 0);
-    const totalTasks = userExecutions.length;
+    const { totalPoints, totalTasks, taskCounts } = agg;
     const averagePointsPerTask = totalTasks > 0 ? Math.round(totalPoints / totalTasks) : 0;
-    
-    console.log(`  💰 Total: ${totalPoints}P from ${totalTasks} tasks (avg: ${averagePointsPerTask}P/task)`);
 
     // Task-Verteilung berechnen
-    const taskCounts = new Map<string, number>();
-    const taskPoints = new Map<string, number>();
-    
-    userExecutions.forEach(exec => {
-      taskCounts.set(exec.taskId, (taskCounts.get(exec.taskId) || 0) + 1);
-      taskPoints.set(exec.taskId, (taskPoints.get(exec.taskId) || 0) + exec.pointsAwarded);
-    });
-
     const taskDistribution: TaskDistribution[] = Array.from(taskCounts.entries())
       .map(([taskId, count]) => ({
         taskId,
         task: taskMap.get(taskId)!,
         count,
         percentage: Math.round((count / totalTasks) * 100),
-        totalPoints: taskPoints.get(taskId) || 0
+        totalPoints: agg.taskPoints.get(taskId) || 0
       }))
       .filter(td => td.task)
       .sort((a, b) => b.count - a.count);
@@ -112,25 +188,11 @@ export class AnalyticsService {
     const avoidedTask = avoidedTasks.length > 0 ? avoidedTasks[0] : null;
 
     // Hot Task Statistiken
-    const hotTaskExecutions = userExecutions.filter(e => {
-      const task = taskMap.get(e.taskId);
-      return task?.isAlarmed || e.pointsAwarded > (task?.pointsPerExecution || 0);
-    });
-    const hotTaskCount = hotTaskExecutions.length;
-    const hotTaskPoints = hotTaskExecutions.reduce((sum, e) => sum + e.pointsAwarded, 0);
-    const regularPoints = totalPoints - hotTaskPoints;
+    const hot = this.calculateHotTasks([agg], taskMap);
+    const regularPoints = totalPoints - hot.points;
 
     // Streak berechnen
-    const streak = this.calculateStreak(userExecutions);
-
-    // Achievements
-    const achievements = this.calculateAchievements(userExecutions, tasks, user);
-
-    // Wöchentlicher Fortschritt
-    const weeklyProgress = this.calculateWeeklyProgress(userExecutions);
-
-    // Tageszeit-Statistiken
-    const timeOfDayStats = this.calculateTimeOfDayStats(userExecutions);
+    const streak = this.calculateStreak(agg.days);
 
     return {
       userId,
@@ -140,15 +202,15 @@ export class AnalyticsService {
       averagePointsPerTask,
       favoriteTask: favoriteTask ? { task: favoriteTask.task, count: favoriteTask.count } : null,
       avoidedTask,
-      hotTaskCount,
-      hotTaskPoints,
+      hotTaskCount: hot.count,
+      hotTaskPoints: hot.points,
       regularPoints,
       bonusPoints: 0, // TODO: Implement bonus calculation
       streak,
-      achievements,
+      achievements: this.calculateAchievements(agg, hot.count, streak),
       taskDistribution,
-      weeklyProgress,
-      timeOfDayStats
+      weeklyProgress: this.calculateWeeklyProgress(agg),
+      timeOfDayStats: this.calculateTimeOfDayStats(agg)
     };
   }
 
@@ -157,33 +219,36 @@ export class AnalyticsService {
     tasks: Task[],
     users: User[]
   ): OverallAnalytics {
-    // Debug logging für Overall Analytics
     console.log(`🌍 [Analytics] Overall: ${executions.length} executions, ${tasks.length} tasks, ${users.length} users`);
-    
-    const totalPoints = executions.reduce((sum, e) => sum + (e.pointsAwarded || 0), 0);
-    const totalTasks = executions.length;
+    return this.overallAnalyticsFromAggregates(aggregateByUser(executions), tasks, users);
+  }
+
+  /**
+   * Overall analytics from per-user aggregates. Aggregates of executors that
+   * are not in `users` still count towards the team totals.
+   */
+  static overallAnalyticsFromAggregates(
+    byUser: Map<string, UserAggregate>,
+    tasks: Task[],
+    users: User[]
+  ): OverallAnalytics {
+    const taskMap = new Map(tasks.map(t => [t.id, t]));
+    const aggregates = Array.from(byUser.values());
+    const totalPoints = aggregates.reduce((sum, agg) => sum + agg.totalPoints, 0);
+    const totalTasks = aggregates.reduce((sum, agg) => sum + agg.totalTasks, 0);
     const totalUsers = users.length;
-    
-    console.log(`  💰 Overall Total: ${totalPoints}P from ${totalTasks} executions`);
 
     // Leaderboard erstellen
     const leaderboard = users
-      .map(user => this.calculateUserAnalytics(user.id, user, executions, tasks))
+      .map(user => this.userAnalyticsFromAggregate(user.id, user, byUser.get(user.id) || createUserAggregate(), tasks, taskMap))
       .sort((a, b) => b.totalPoints - a.totalPoints);
-      
-    // Debug: Leaderboard-Summe prüfen
-    const leaderboardSum = leaderboard.reduce((sum, user) => sum + user.totalPoints, 0);
-    console.log(`  🏆 Leaderboard Sum: ${leaderboardSum}P (should equal ${totalPoints}P)`);
-    if (leaderboardSum !== totalPoints) {
-      console.warn(`⚠️ Leaderboard sum mismatch! Expected ${totalPoints}P, got ${leaderboardSum}P`);
-    }
 
     // Top Tasks
     const taskCounts = new Map<string, number>();
-    const taskMap = new Map(tasks.map(t => [t.id, t]));
-    
-    executions.forEach(exec => {
-      taskCounts.set(exec.taskId, (taskCounts.get(exec.taskId) || 0) + 1);
+    const taskPoints = new Map<string, number>();
+    aggregates.forEach(agg => {
+      agg.taskCounts.forEach((count, taskId) => taskCounts.set(taskId, (taskCounts.get(taskId) || 0) + count));
+      agg.taskPoints.forEach((points, taskId) => taskPoints.set(taskId, (taskPoints.get(taskId) || 0) + points));
     });
 
     const topTasks: TaskDistribution[] = Array.from(taskCounts.entries())
@@ -192,22 +257,17 @@ export class AnalyticsService {
         task: taskMap.get(taskId)!,
         count,
         percentage: Math.round((count / totalTasks) * 100),
-        totalPoints: executions
-          .filter(e => e.taskId === taskId)
-          .reduce((sum, e) => sum + e.pointsAwarded, 0)
+        totalPoints: taskPoints.get(taskId) || 0
       }))
       .filter(td => td.task)
       .sort((a, b) => b.count - a.count)
       .slice(0, 5);
 
     // Hot Tasks zählen
-    const totalHotTasks = executions.filter(e => {
-      const task = taskMap.get(e.taskId);
-      return task?.isAlarmed || e.pointsAwarded > (task?.pointsPerExecution || 0);
-    }).length;
+    const totalHotTasks = this.calculateHotTasks(aggregates, taskMap).count;
 
     // Team Achievements
-    const teamAchievements = this.calculateTeamAchievements(executions, tasks, users);
+    const teamAchievements = this.calculateTeamAchievements(totalTasks, totalPoints);
 
     return {
       totalPoints,
@@ -220,21 +280,35 @@ export class AnalyticsService {
     };
   }
 
-  private static calculateStreak(executions: TaskExecution[]): number {
-    if (executions.length === 0) return 0;
+  /** Hot = Task ist alarmiert oder es gab mehr Punkte als die aktuellen Task-Punkte. */
+  private static calculateHotTasks(aggregates: UserAggregate[], taskMap: Map<string, Task>): { count: number; points: number } {
+    let count = 0;
+    let points = 0;
+    aggregates.forEach(agg => {
+      agg.taskPointValues.forEach((values, taskId) => {
+        const task = taskMap.get(taskId);
+        values.forEach((n, awarded) => {
+          if (task?.isAlarmed || awarded > (task?.pointsPerExecution || 0)) {
+            count += n;
+            points += n * awarded;
+          }
+        });
+      });
+    });
+    return { count, points };
+  }
+
+  private static calculateStreak(days: Map<number, number>): number {
+    if (days.size === 0) return 0;
 
-    const sortedExecs = executions
-      .sort((a, b) => new Date(b.executedAt).getTime() - new Date(a.executedAt).getTime());
+    const sortedDays = Array.from(days.keys()).sort((a, b) => b - a);
 
     let streak = 0;
     let currentDate = new Date();
     currentDate.setHours(0, 0, 0, 0);
 
-    for (const exec of sortedExecs) {
-      const execDate = new Date(exec.executedAt);
-      execDate.setHours(0, 0, 0, 0);
-
-      const daysDiff = Math.floor((currentDate.getTime() - execDate.getTime()) / (1000 * 60 * 60 * 24));
+    for (const day of sortedDays) {
+      const daysDiff = Math.floor((currentDate.getTime() - day) / (1000 * 60 * 60 * 24));
 
       if (daysDiff === streak) {
         streak++;
@@ -247,14 +321,14 @@ export class AnalyticsService {
   }
 
   private static calculateAchievements(
-    executions: TaskExecution[],
-    tasks: Task[],
-    user: User
+    agg: UserAggregate,
+    hotTaskCount: number,
+    streak: number
   ): Achievement[] {
     const achievements: Achievement[] = [];
 
     // Task-Zähler
-    const taskCount = executions.length;
+    const taskCount = agg.totalTasks;
     
     // Erste Schritte
     achievements.push({
@@ -288,7 +362,6 @@ export class AnalyticsService {
     });
 
     // Streak Achievements
-    const streak = this.calculateStreak(executions);
     achievements.push({
       id: 'week-streak',
       title: 'Wochenserie',
@@ -300,23 +373,18 @@ export class AnalyticsService {
     });
 
     // Hot Task Champion
-    const hotTasks = executions.filter(e => {
-      const task = tasks.find(t => t.id === e.taskId);
-      return task?.isAlarmed || e.pointsAwarded > (task?.pointsPerExecution || 0);
-    });
-    
     achievements.push({
       id: 'hot-task-champion',
       title: 'Hot Task Champion',
       emoji: '🌶️',
       description: '5 Hot Tasks erledigt',
-      unlocked: hotTasks.length >= 5,
-      progress: Math.min(hotTasks.length, 5),
+      unlocked: hotTaskCount >= 5,
+      progress: Math.min(hotTaskCount, 5),
       target: 5
     });
 
     // Punkte-Sammler
-    const totalPoints = executions.reduce((sum, e) => sum + e.pointsAwarded, 0);
+    const totalPoints = agg.totalPoints;
     achievements.push({
       id: 'point-collector',
       title: 'Punkte-Sammler',
@@ -330,52 +398,26 @@ export class AnalyticsService {
     return achievements;
   }
 
-  private static calculateWeeklyProgress(executions: TaskExecution[]): WeeklyProgress[] {
-    const weeklyData = new Map<number, { points: number; tasks: number }>();
-    
-    executions.forEach(exec => {
-      const date = new Date(exec.executedAt);
-      const weekOfYear = this.getWeekOfYear(date);
-      
-      const current = weeklyData.get(weekOfYear) || { points: 0, tasks: 0 };
-      current.points += exec.pointsAwarded;
-      current.tasks += 1;
-      weeklyData.set(weekOfYear, current);
-    });
-
-    return Array.from(weeklyData.entries())
+  private static calculateWeeklyProgress(agg: UserAggregate): WeeklyProgress[] {
+    return Array.from(agg.weeks.entries())
       .map(([week, data]) => ({ week, ...data }))
       .sort((a, b) => a.week - b.week)
       .slice(-8); // Letzte 8 Wochen
   }
 
-  private static calculateTimeOfDayStats(executions: TaskExecution[]): TimeStats[] {
-    const hourCounts = new Array(24).fill(0);
-    
-    executions.forEach(exec => {
-      const hour = new Date(exec.executedAt).getHours();
-      hourCounts[hour]++;
-    });
-
-    const total = executions.length;
+  private static calculateTimeOfDayStats(agg: UserAggregate): TimeStats[] {
+    const total = agg.totalTasks;
     
-    return hourCounts.map((count, hour) => ({
+    return agg.hours.map((count, hour) => ({
       hour,
       count,
       percentage: total > 0 ? Math.round((count / total) * 100) : 0
     }));
   }
 
-  private static calculateTeamAchievements(
-    executions: TaskExecution[],
-    tasks: Task[],
-    users: User[]
-  ): Achievement[] {
+  private static calculateTeamAchievements(totalTasks: number, totalPoints: number): Achievement[] {
     const achievements: Achievement[] = [];
 
-    const totalTasks = executions.length;
-    const totalPoints = executions.reduce((sum, e) => sum + e.pointsAwarded, 0);
-
     // Team-Leistung
     achievements.push({
       id: 'team-effort',
@@ -400,15 +442,9 @@ export class AnalyticsService {
 
     return achievements;
   }
-
-  private static getWeekOfYear(date: Date): number {
-    const firstDayOfYear = new Date(date.getFullYear(), 0, 1);
-    const pastDaysOfYear = (date.getTime() - firstDayOfYear.getTime()) / 86400000;
-    return Math.ceil((pastDaysOfYear + firstDayOfYear.getDay() + 1) / 7);
-  }
 }
 
 // Global export für Debug-Zwecke in Development
 if (typeof window !== 'undefined') {
   (window as any).AnalyticsService = AnalyticsService;
-}
\ No newline at end of file
+}
@@ -1,6 +1,10 @@
 /**
  * Cross-Browser Synchronization Service
  * Ensures data consistency between Simple Browser and regular browsers
+ *
+ * @deprecated Polls localStorage and can only reach tabs of the same browser.
+ * Server mode pushes changes to every device via syncChannel.ts
+ * (GET /api/sync/events); this service is no longer initialised.
  */
 
 import { AppState } from '../types';
@@ -4,6 +4,10 @@ import { generateId } from '../utils/taskUtils';
 import { eventSourcingManager } from './eventSourcingManager.disabled';
 import { stateBackupManager } from './stateBackupManager';
 import { settingsManager } from './settingsManager';
+import { StatePersistence } from './statePersistence';
+import { StateIndex } from './stateIndex';
+import { analyticsCache } from './analyticsCache';
+import { ServerSync, ServerSyncOptions } from './serverSync';
 // DISABLED: import { crossBrowserSync } from './crossBrowserSync';
 
 // Minimal localStorage polyfill for non-browser / early import contexts (e.g. Vitest module eval order)
@@ -30,6 +34,15 @@ const getLocalStorage = (): Storage => {
 const STORAGE_KEY = 'putzplan-data';
 const STORAGE_VERSION = '1.0';
 
+// Chosen per device, never taken over from other clients
+const LOCAL_KEYS = ['currentUser', 'currentWG'];
+
+// Entity collections checked for local-only records when connecting to the server
+const ENTITY_KEYS = ['wgs', 'users', 'tasks', 'executions', 'ratings', 'postExecutionRatings', 'notifications', 'absences', 'temporaryResidents'];
+
+// Set once this device's state has been merged into the server's
+const SERVER_SYNCED_KEY = 'putzplan-server-synced';
+
 /**
  * Initialer App-Zustand
  */
@@ -66,10 +79,14 @@ export class DataManager {
   private listeners: Set<(state: AppState) => void> = new Set();
   private saveTimeout: NodeJS.Timeout | null = null;
   private localStorage: Storage;
+  private persistence: StatePersistence;
+  private index = new StateIndex();
   private selectedPeriodForDisplay: string | null = null; // For historical period viewing
+  private serverSync: ServerSync | null = null;
 
   constructor() {
     this.localStorage = getLocalStorage();
+    this.persistence = new StatePersistence(this.localStorage, STORAGE_KEY);
     
     // DISABLED: Initialize cross-browser synchronization - potential cause of period loss
     // crossBrowserSync.init();
@@ -128,6 +145,11 @@ export class DataManager {
     return { ...this.state };
   }
 
+  /** Secondary indexes (by WG, task, user, period, time) synced to the current state. */
+  private getIndex(): StateIndex {
+    return this.index.sync(this.state);
+  }
+
   /**
    * Replaces the entire state (used for restoration from snapshots)
    * WARNING: This completely overwrites the current state!
@@ -141,7 +163,7 @@ export class DataManager {
     
     // KRITISCH: Bei setState müssen wir auch an den Server senden!
     // Sonst wird die Änderung beim nächsten reload vom Server überschrieben
-    this.saveToServer().catch(error => {
+    (this.serverSync ? this.serverSync.save() : this.saveToServer()).catch(error => {
       console.error('[DataManager] Failed to save restored state to server:', error);
     });
     
@@ -186,6 +208,7 @@ export class DataManager {
   _TEST_setLocalStorage(mockStorage: Storage): void {
     if (process.env.NODE_ENV !== 'test') return;
     this.localStorage = mockStorage;
+    this.persistence = new StatePersistence(mockStorage, STORAGE_KEY);
   }
 
   subscribe(listener: (state: AppState) => void): () => void {
@@ -225,6 +248,17 @@ export class DataManager {
     this.notifyListeners();
   }
 
+  /**
+   * Stores a single execution. Tells the analytics cache which record changed
+   * before listeners re-render, so it does not have to diff the collection.
+   */
+  private putExecution(execution: TaskExecution): void {
+    const prev = this.state.executions;
+    const next = { ...prev, [execution.id]: execution };
+    analyticsCache.noteExecutionsChanged(prev, next, [execution.id]);
+    this.updateState({ executions: next });
+  }
+
   private notifyListeners(): void {
     this.listeners.forEach(listener => listener(this.state));
   }
@@ -246,20 +280,19 @@ export class DataManager {
       //   return { ...initialState, ...state } as AppState;
       // }
       
-      // Use regular localStorage directly
-      let stored = this.localStorage.getItem(STORAGE_KEY);
-      console.log(`[DataManager] localStorage.getItem(${STORAGE_KEY}) result @ ${new Date().toISOString()}:`, stored ? 'data found' : 'no data');
+      // Main record plus per-entity keys (legacy single-key data is read as well)
+      const data = this.persistence.read();
+      console.log(`[DataManager] localStorage.getItem(${STORAGE_KEY}) result @ ${new Date().toISOString()}:`, data ? 'data found' : 'no data');
       
       // REMOVED: Event Sourcing snapshot logic to prevent storage conflicts
       // The original Event Sourcing check caused different data in different browsers
       
-      if (!stored) {
+      if (!data) {
         console.log('[DataManager] No stored data found, returning initial state');
         return { ...initialState };
       }
 
-      const data = JSON.parse(stored);
-      console.log('[DataManager] Parsed storage data, version:', data.version);
+      console.log('[DataManager] Parsed storage data, version:', data.version, 'layout:', data.layout || 'single');
       
       // Version check
       if (data.version !== STORAGE_VERSION) {
@@ -269,6 +302,8 @@ export class DataManager {
 
       // Datum-Strings zu Date-Objekten konvertieren
       const state = this.deserializeDates(data.state);
+      // Resolve references and defer parsing of period snapshots until first access
+      this.persistence.attach(state, data.layout, raw => this.deserializeDates(raw));
       const merged = { ...initialState, ...state } as AppState;
       console.log('[DataManager] Successfully loaded state with users:', Object.keys(merged.users).length);
       console.log('[DataManager] Successfully loaded state with users:', Object.keys(merged.users).length);
@@ -302,12 +337,16 @@ export class DataManager {
     }
   }
 
+  /**
+   * Persists the state. Only collections whose reference changed since the
+   * last write are re-serialized (see StatePersistence); the main record under
+   * STORAGE_KEY holds the remaining small fields.
+   */
   private saveToStorage(): void {
     console.log(`[DataManager] saveToStorage called @ ${new Date().toISOString()}`);
     try {
-      const data = {
+      const record = {
         version: STORAGE_VERSION,
-        state: this.state,
         // Compatibility alias for tests that read currentPeriod at top level
         currentPeriod: this.state.currentPeriod,
         savedAt: new Date().toISOString()
@@ -315,8 +354,10 @@ export class DataManager {
       
       // DISABLED: Use direct localStorage instead of crossBrowserSync to prevent conflicts
       // crossBrowserSync.saveWithSync(data);
-      this.localStorage.setItem(STORAGE_KEY, JSON.stringify(data));
-      console.log(`[DataManager] Successfully saved to localStorage @ ${new Date().toISOString()} (crossBrowserSync disabled)`);
+      const writtenKeys = this.persistence.save(this.state, record);
+      console.log(`[DataManager] Successfully saved ${writtenKeys.length} key(s) to localStorage @ ${new Date().toISOString()} (crossBrowserSync disabled)`);
+      // Everything persisted locally also goes to the server (as a delta)
+      this.serverSync?.scheduleSave();
     } catch (error) {
       console.error('[DataManager] Error saving to storage:', error);
     }
@@ -987,9 +1028,7 @@ export class DataManager {
       });
     }
 
-    this.updateState({
-      executions: { ...this.state.executions, [execution.id]: execution }
-    });
+    this.putExecution(execution);
 
     // Log event für Event-Sourcing System MIT previousState
     eventSourcingManager.logAction(
@@ -1084,7 +1123,7 @@ export class DataManager {
       });
     }
 
-    this.updateState({ executions: { ...this.state.executions, [execution.id]: execution } });
+    this.putExecution(execution);
     
     // Log event für Event-Sourcing System MIT previousState
     eventSourcingManager.logAction(
@@ -1128,9 +1167,7 @@ export class DataManager {
       });
     }
 
-    this.updateState({
-      executions: { ...this.state.executions, [executionId]: updatedExecution }
-    });
+    this.putExecution(updatedExecution);
 
     // Log event für Event-Sourcing System
     const task = this.state.tasks[execution.taskId];
@@ -1176,7 +1213,7 @@ export class DataManager {
       currentMonthPoints: user.currentMonthPoints + execution.pointsAwarded,
       totalCompletedTasks: user.totalCompletedTasks + 1
     });
-    this.updateState({ executions: { ...this.state.executions, [execution.id]: execution } });
+    this.putExecution(execution);
     return execution;
   }
 
@@ -1250,11 +1287,12 @@ export class DataManager {
   }
 
   getRatingsForUser(userId: string): TaskRating[] {
-    return Object.values(this.state.ratings).filter(r => r.userId === userId);
+    return this.getIndex().ratingsForUser(userId);
   }
 
   isUserRatingsComplete(userId: string): boolean {
-    const tasks = Object.values(this.state.tasks).filter(t => t.wgId === this.state.currentWG?.id);
+    const wgId = this.state.currentWG?.id;
+    const tasks = wgId ? this.getIndex().tasksForWg(wgId) : [];
     if (tasks.length === 0) return false;
     const userTaskIds = new Set(this.getRatingsForUser(userId).map(r => r.taskId));
     return tasks.every(t => userTaskIds.has(t.id));
@@ -1267,12 +1305,13 @@ export class DataManager {
   recalculateTaskPoints(): void {
     if (!this.state.currentWG) return;
 
-    const wgTasks = Object.values(this.state.tasks).filter(t => t.wgId === this.state.currentWG!.id);
+    const index = this.getIndex();
+    const wgTasks = index.tasksForWg(this.state.currentWG.id);
     const updatedTasks = { ...this.state.tasks };
 
     wgTasks.forEach(task => {
       // Hole alle Bewertungen für diesen Task
-      const taskRatings = Object.values(this.state.ratings).filter(r => r.taskId === task.id);
+      const taskRatings = index.ratingsForTask(task.id);
       
       if (taskRatings.length > 0) {
         // Berechne Durchschnittswerte aus allen Bewertungen
@@ -1321,25 +1360,33 @@ export class DataManager {
       }
     });
 
-    // Additionally: update existing executions' pointsAwarded to reflect new task valuations
+    // Additionally: update existing executions' pointsAwarded to reflect new task valuations.
+    // Only executions of this WG's tasks can be affected, so look them up via the index.
     const updatedExecutions = { ...this.state.executions } as Record<string, TaskExecution>;
-    Object.values(updatedExecutions).forEach((exec: any) => {
-      const t = updatedTasks[exec.taskId] || this.state.tasks[exec.taskId];
-      if (t && exec.isVerified) {
-        const newPts = typeof t.pointsPerExecution === 'number' ? Math.round(t.pointsPerExecution) : exec.pointsAwarded;
-        exec.pointsAwarded = newPts;
-      }
+    const affectedUsers = new Set<string>(this.state.currentWG.memberIds || []);
+    wgTasks.forEach(task => {
+      const t = updatedTasks[task.id];
+      index.executionsForTask(task.id).forEach((exec: any) => {
+        affectedUsers.add(exec.executedBy);
+        if (t && exec.isVerified) {
+          const newPts = typeof t.pointsPerExecution === 'number' ? Math.round(t.pointsPerExecution) : exec.pointsAwarded;
+          // Copy instead of mutating so reference-based caches see the change
+          if (newPts !== exec.pointsAwarded) updatedExecutions[exec.id] = { ...exec, pointsAwarded: newPts };
+        }
+      });
     });
 
-    // Recompute users' currentMonthPoints from executions
+    // Recompute affected users' currentMonthPoints from their executions
     const updatedUsers = { ...this.state.users } as Record<string, any>;
-    // Reset currentMonthPoints
-    Object.keys(updatedUsers).forEach(uid => { if (updatedUsers[uid]) updatedUsers[uid].currentMonthPoints = 0; });
-    Object.values(updatedExecutions).forEach((exec: any) => {
-      if (!exec.isVerified) return;
-      const u = updatedUsers[exec.executedBy];
+    affectedUsers.forEach(uid => {
+      const u = updatedUsers[uid];
       if (!u) return;
-      u.currentMonthPoints = (u.currentMonthPoints || 0) + (exec.pointsAwarded || 0);
+      const currentMonthPoints = index.executionsForUser(uid)
+        .reduce((sum, exec: any) => {
+          const current: any = updatedExecutions[exec.id] || exec;
+          return current.isVerified ? sum + (current.pointsAwarded || 0) : sum;
+        }, 0);
+      updatedUsers[uid] = { ...u, currentMonthPoints };
     });
 
     this.updateState({ tasks: updatedTasks, executions: updatedExecutions, users: updatedUsers });
@@ -1577,19 +1624,9 @@ export class DataManager {
       // normalize end to end-of-day
       endDate.setHours(23,59,59,999);
       const filtered: Record<string, any> = {};
-      Object.entries(this.state.executions).forEach(([id, execution]) => {
-        try {
-          const execPeriodId = (execution as any).periodId;
-          if (execPeriodId !== undefined && execPeriodId !== null) {
-            if (execPeriodId === currentPeriod.id) filtered[id] = execution;
-            return;
-          }
-          const execDate = new Date((execution as any).date || (execution as any).executedAt);
-          if (execDate >= startDate && execDate <= endDate) filtered[id] = execution;
-        } catch (err) {
-          // ignore malformed execution entries
-        }
-      });
+      this.getIndex()
+        .executionsInPeriod(currentPeriod.id, startDate.getTime(), endDate.getTime())
+        .forEach(execution => { filtered[execution.id] = execution; });
       console.log(`📊 [DataManager] Returning ${Object.keys(filtered).length} current-period executions (filtered)`);
       return filtered;
     }
@@ -1634,23 +1671,12 @@ export class DataManager {
     const startDate = new Date(period.startDate);
     const endDate = new Date(period.endDate);
     
+    // Executions with an explicit periodId are matched by id; the rest fall back
+    // to their executedAt/date lying inside the period.
     const filteredExecutions: Record<string, any> = {};
-    Object.entries(this.state.executions).forEach(([id, execution]) => {
-      // If execution has an explicit periodId, prefer that for filtering
-      const execPeriodId = (execution as any).periodId;
-      if (execPeriodId !== undefined && execPeriodId !== null) {
-        if (execPeriodId === this.selectedPeriodForDisplay) {
-          filteredExecutions[id] = execution;
-        }
-        return; // skip date-based fallback if periodId present
-      }
-
-      // Fallback: filter by executedAt/date if no explicit periodId available
-      const execDate = new Date((execution as any).date || (execution as any).executedAt);
-      if (execDate >= startDate && execDate <= endDate) {
-        filteredExecutions[id] = execution;
-      }
-    });
+    this.getIndex()
+      .executionsInPeriod(this.selectedPeriodForDisplay, startDate.getTime(), endDate.getTime())
+      .forEach(execution => { filteredExecutions[execution.id] = execution; });
     
     console.log(`📊 [DataManager] Filtered ${Object.keys(filteredExecutions).length} executions for period ${this.selectedPeriodForDisplay}`);
     return filteredExecutions;
@@ -2421,11 +2447,9 @@ export class DataManager {
     if (!currentWG) throw new Error('No current WG to save period state');
 
     // Gather WG-scoped tasks
-    const tasks = Object.values(this.state.tasks || {}).filter((t: any) => t.wgId === currentWG.id);
-    const executions = Object.values(this.state.executions || {}).filter((e: any) => {
-      const task = this.state.tasks[e.taskId];
-      return task && task.wgId === currentWG.id;
-    });
+    const index = this.getIndex();
+    const tasks = index.tasksForWg(currentWG.id);
+    const executions = index.executionsForWg(currentWG.id);
 
     // Find period in periods or historicalPeriods
     const periods = currentWG.periods || [];
@@ -2770,7 +2794,7 @@ export class DataManager {
    * Gibt 0 zurück falls keine Ratings vorhanden.
    */
   computeTaskBasePoints(taskId: string): number {
-    const ratings = Object.values(this.state.ratings).filter(r => r.taskId === taskId);
+    const ratings = this.getIndex().ratingsForTask(taskId);
     if (ratings.length === 0) return 0;
     const avg = (sel: (r: TaskRating)=>number) => ratings.reduce((s,r)=>s+sel(r),0)/ratings.length;
     const avgMinutes = avg(r=> r.estimatedMinutes || 0);
@@ -2798,7 +2822,8 @@ export class DataManager {
       return { totalPoints: 0, perMemberTarget: 0, periodRatio: 0, memberCount: this.state.currentWG?.memberIds.length || 0, consideredTasks: 0 };
     }
     const periodRatio = period.days / 30; // flexible Zeitraum Anpassung
-    const tasks = Object.values(this.state.tasks).filter(t => t.wgId === wgId);
+    const index = this.getIndex();
+    const tasks = index.tasksForWg(wgId);
     const memberCount = this.state.currentWG?.memberIds.length || 0;
     if (memberCount === 0) return { totalPoints: 0, perMemberTarget: 0, periodRatio, memberCount: 0, consideredTasks: 0 };
     let total = 0;
@@ -2806,7 +2831,7 @@ export class DataManager {
     for (const task of tasks) {
       const base = this.computeTaskBasePoints(task.id);
       if (base === 0) continue; // keine Ratings -> ignorieren
-      const ratings = Object.values(this.state.ratings).filter(r => r.taskId === task.id);
+      const ratings = index.ratingsForTask(task.id);
       const avgFreq = ratings.reduce((s,r)=> s + (r.suggestedFrequency || 0), 0) / ratings.length;
       const taskPeriodPoints = base * avgFreq * periodRatio; // kein Runden pro Task
       total += taskPeriodPoints;
@@ -2871,7 +2896,7 @@ export class DataManager {
       }
     } else {
       // In production: completely clear everything including localStorage
-      this.localStorage.removeItem(STORAGE_KEY);
+      this.persistence.clear();
       this.state = { ...initialState };
       console.log('🗑️ [DataManager] Cleared localStorage in production');
     }
@@ -2993,6 +3018,94 @@ export class DataManager {
     }
   }
 
+  // ========================================
+  // SERVER-SYNC
+  // ========================================
+
+  /**
+   * Verbindet mit dem Server (server/syncHub.js): lokale Änderungen gehen als
+   * Deltas hinaus, Änderungen anderer Clients kommen per Push herein. Hat der
+   * Server noch nie gespeichert (seq 0), wird der lokale Stand hochgeladen.
+   * Sonst gilt der Server-Stand, bis auf currentUser/currentWG; beim ersten
+   * Verbinden eines Geräts bleiben aber Einträge, die der Server nicht oder
+   * nur in älterer Fassung kennt, erhalten und werden hochgeladen. Gehen
+   * lokale Einträge verloren, wird der lokale Stand vorher gesichert.
+   */
+  async connectServer(options: Pick<ServerSyncOptions, 'baseUrl' | 'clientId' | 'fetch' | 'createEventSource'> = {}): Promise<void> {
+    this.serverSync?.close();
+    this.serverSync = null;
+    const sync = new ServerSync({
+      ...options,
+      localKeys: LOCAL_KEYS,
+      deserialize: value => this.deserializeDates(value),
+      getState: () => this.state,
+      onRemoteState: state => this.applyServerState(state)
+    });
+    const { state, seq } = await sync.load();
+    this.serverSync = sync;
+    const firstConnect = !this.localStorage.getItem(SERVER_SYNCED_KEY);
+    if (seq > 0) {
+      LOCAL_KEYS.forEach(key => { state[key] = (this.state as any)[key]; });
+      const local = this.localOnlyEntities(state);
+      if (local.length > 0) {
+        const kept = firstConnect ? 'werden hochgeladen' : 'werden durch den Server-Stand ersetzt';
+        console.warn(`⚠️ [DataManager] ${local.length} lokale Einträge fehlen auf dem Server oder sind neuer und ${kept}`);
+        stateBackupManager.createFullStateBackup('Vor dem ersten Server-Sync', this.state);
+      }
+      sync.attach(state, seq);
+      const merged = { ...this.state, ...state };
+      if (firstConnect) {
+        local.forEach(([key, id]) => {
+          merged[key] = { ...(merged[key] || {}), [id]: (this.state as any)[key][id] };
+        });
+      }
+      this.applyServerState(merged);
+      if (firstConnect && local.length > 0) await sync.save();
+    } else {
+      sync.attach({ ...initialState, ...state }, seq);
+      await sync.save();
+    }
+    this.localStorage.setItem(SERVER_SYNCED_KEY, new Date().toISOString());
+    console.log(`📡 [DataManager] Connected to server sync at seq ${seq}`);
+  }
+
+  /** Sendet ausstehende Änderungen sofort an den Server (ohne Debounce). */
+  async forceSave(): Promise<void> {
+    await this.serverSync?.save();
+  }
+
+  /** Trennt den Server-Sync; der State bleibt lokal erhalten. */
+  disconnectServer(): void {
+    this.serverSync?.close();
+    this.serverSync = null;
+  }
+
+  /**
+   * `[collection, id]` der lokalen Einträge, die auf dem Server fehlen oder
+   * laut `updatedAt` / `createdAt` neuer sind als dessen Fassung.
+   */
+  private localOnlyEntities(serverState: any): Array<[string, string]> {
+    const time = (entity: any) => new Date(entity?.updatedAt || entity?.createdAt || 0).getTime() || 0;
+    const found: Array<[string, string]> = [];
+    ENTITY_KEYS.forEach(key => {
+      const local = (this.state as any)[key] || {};
+      const remote = serverState[key] || {};
+      Object.keys(local).forEach(id => {
+        if (!(id in remote) || time(local[id]) > time(remote[id])) found.push([key, id]);
+      });
+    });
+    return found;
+  }
+
+  private applyServerState(state: AppState): void {
+    const { currentUser, currentWG } = state;
+    this.updateStateImmediate({
+      ...state,
+      currentUser: (currentUser && state.users?.[currentUser.id]) || currentUser,
+      currentWG: (currentWG && state.wgs?.[currentWG.id]) || currentWG
+    });
+  }
+
   /**
    * Force cross-browser synchronization
    * DISABLED: CrossBrowserSync deactivated to fix persistence bug
@@ -3018,4 +3131,11 @@ export const dataManager = new DataManager();
 if (typeof window !== 'undefined') {
   (window as any).dataManager = dataManager;
   console.log('[DataManager] Made available as window.dataManager');
+}
+
+// Push-Sync mit server.js; ohne Server bleibt es beim localStorage
+if (typeof EventSource !== 'undefined' && process.env.NODE_ENV !== 'test') {
+  dataManager.connectServer().catch(error => {
+    console.warn('[DataManager] Server sync unavailable, staying local:', error);
+  });
 }
\ No newline at end of file
@@ -1,8 +1,15 @@
 /**
  * Event-Sourcing Manager (full implementation)
  * This file contains the original full-featured EventSourcingManager.
+ *
+ * Storage: events go into append-only segments (SegmentedLog), snapshot states
+ * and the `previousState` of critical events into a content-addressed
+ * SnapshotStore, so unchanged records are shared between snapshots and the
+ * total size stays within a fixed budget.
  */
 
+import { SegmentedLog, SnapshotManifest, SnapshotStore } from './snapshotStore';
+
 export interface ActionEvent {
   id: string;
   timestamp: number;
@@ -11,6 +18,8 @@ export interface ActionEvent {
   wgId?: string;
   data: any;
   previousState?: any;
+  /** Snapshot-store id holding `previousState` (persisted events carry only this). */
+  previousStateRef?: string;
   metadata: {
     userAgent?: string;
     sessionId?: string;
@@ -27,6 +36,8 @@ export interface StateSnapshot {
     version: string;
     size: number;
     compressed?: boolean;
+    /** Characters this snapshot added to storage; the rest is shared. */
+    storedSize?: number;
   };
 }
 
@@ -42,9 +53,11 @@ export interface RestorePreview {
   riskLevel: 'low' | 'medium' | 'high';
 }
 
-class EventSourcingManager {
-  private events: ActionEvent[] = [];
-  private snapshots: StateSnapshot[] = [];
+export class EventSourcingManager {
+  private log = new SegmentedLog<ActionEvent>({ prefix: 'eventSourcing_events' });
+  private store = new SnapshotStore({ prefix: 'eventSourcing_snapshots', maxBytes: 2_000_000 });
+  // Snapshots from createSnapshotFromEvent: only for previews, never persisted
+  private tempSnapshots: StateSnapshot[] = [];
   private maxEvents = 1000;
   private maxSnapshots = 50;
   private snapshotInterval = 10;
@@ -59,6 +72,8 @@ class EventSourcingManager {
     this.setupPeriodicCleanup();
   }
 
+  private get events(): ActionEvent[] { return this.log.items(); }
+
   logAction(action: string, data: any, userId?: string, wgId?: string, previousState?: any): string {
     const eventId = this.generateId();
     const isCritical = this.criticalActions.includes(action) || action.includes('DELETE') || action.includes('RESET');
@@ -70,11 +85,23 @@ class EventSourcingManager {
       userId,
       wgId,
       data,
-      previousState: isCritical ? previousState : undefined,
       metadata: { userAgent: (typeof navigator !== 'undefined' ? navigator.userAgent : 'node'), sessionId: this.getSessionId(), critical: isCritical }
     };
+    if (isCritical && previousState !== undefined) {
+      if (this.store.put(this.previousStateId(eventId), previousState, { kind: 'event' }, event.timestamp)) {
+        event.previousStateRef = this.previousStateId(eventId);
+      } else {
+        console.warn(`⚠️ [EventSourcing] Previous state for ${action} not stored (storage full)`);
+      }
+    }
 
-    this.events.push(event);
+    try {
+      this.releaseEvents(this.log.append(event));
+    } catch (error) {
+      console.error(`❌ [EventSourcing] Could not persist ${action} (storage full):`, error);
+      this.releaseEvents([event]);
+      return '';
+    }
 
     if (isCritical) {
       this.criticalActionCount++;
@@ -84,28 +111,27 @@ class EventSourcingManager {
     }
 
     this.pruneOldEvents();
-    this.saveToStorage();
 
     return eventId;
   }
 
   private createSnapshot(triggerEvent: string, state: any): string {
     const snapshotId = this.generateId();
-    const stateString = JSON.stringify(state);
-    const snapshot: StateSnapshot = { id: snapshotId, timestamp: Date.now(), triggerEvent, state, metadata: { version: '1.0', size: stateString.length, compressed: false } };
-    this.snapshots.push(snapshot);
+    if (!this.store.put(snapshotId, state, { kind: 'snapshot', triggerEvent, version: '1.0' })) {
+      console.warn(`⚠️ [EventSourcing] Snapshot for ${triggerEvent} not stored (storage full)`);
+      return '';
+    }
     this.pruneOldSnapshots();
-    this.saveToStorage();
     return snapshotId;
   }
 
   getSnapshots(limit?: number): StateSnapshot[] {
-    const sorted = [...this.snapshots].sort((a,b)=>b.timestamp-a.timestamp);
+    const sorted = [...this.storedSnapshots(), ...this.tempSnapshots].sort((a,b)=>b.timestamp-a.timestamp);
     return limit ? sorted.slice(0, limit) : sorted;
   }
 
   getEvents(fromTimestamp?: number, toTimestamp?: number, actionFilter?: string[]): ActionEvent[] {
-    let filtered = [...this.events];
+    let filtered = this.events;
     if (fromTimestamp) filtered = filtered.filter(e => e.timestamp >= fromTimestamp);
     if (toTimestamp) filtered = filtered.filter(e => e.timestamp <= toTimestamp);
     if (actionFilter && actionFilter.length) filtered = filtered.filter(e => actionFilter.includes(e.action));
@@ -113,11 +139,15 @@ class EventSourcingManager {
   }
 
   generateRestorePreview(snapshotId: string): RestorePreview {
-    const snapshot = this.snapshots.find(s => s.id === snapshotId);
+    const snapshot = this.findSnapshot(snapshotId);
     if (!snapshot) throw new Error(`Snapshot ${snapshotId} not found`);
     const currentState = this.getCurrentState();
-    const targetState = snapshot.state;
-    const affectedData = { users: this.countDifferences(currentState.users, targetState.users), tasks: this.countDifferences(currentState.tasks, targetState.tasks), wgs: this.countDifferences(currentState.wgs, targetState.wgs), ratings: this.countDifferences(currentState.ratings, targetState.ratings) };
+    const keys = ['users', 'tasks', 'wgs', 'ratings'];
+    // Stored snapshots are compared by record hash; temporary ones hold their state in memory
+    const counts = this.store.has(snapshotId)
+      ? this.store.diff(currentState, snapshotId, keys)
+      : Object.fromEntries(keys.map(key => [key, this.countDifferences(currentState[key], snapshot.state[key])]));
+    const affectedData = { users: counts.users, tasks: counts.tasks, wgs: counts.wgs, ratings: counts.ratings };
     const lostActions = this.events.filter(e => e.timestamp > snapshot.timestamp);
     let riskLevel: 'low'|'medium'|'high' = 'low';
     const totalChanges = Object.values(affectedData).reduce((sum:any, d:any)=>sum + d.added + d.modified + d.removed, 0);
@@ -128,13 +158,15 @@ class EventSourcingManager {
 
   async restoreFromSnapshot(snapshotId: string, confirmation: string): Promise<boolean> {
     if (!['CONFIRMED','CONFIRM_RESTORE','RESTORE'].includes(confirmation)) throw new Error('Restore must be confirmed');
-    const snapshot = this.snapshots.find(s => s.id === snapshotId);
+    const snapshot = this.findSnapshot(snapshotId);
     if (!snapshot) throw new Error(`Snapshot ${snapshotId} not found`);
+    const targetState = snapshot.state;
     const currentState = this.getCurrentState();
-    this.createSnapshot('PRE_RESTORE_BACKUP', currentState);
+    // Without this backup the restore could not be undone
+    if (!this.createSnapshot('PRE_RESTORE_BACKUP', currentState)) throw new Error('Could not back up the current state before restoring (storage full)');
     try {
       if (typeof window !== 'undefined' && (window as any).dataManager) {
-        (window as any).dataManager.setState(snapshot.state);
+        (window as any).dataManager.setState(targetState);
       }
       this.logAction('RESTORE_FROM_SNAPSHOT', { snapshotId, snapshotTimestamp: snapshot.timestamp, restoreTimestamp: Date.now() }, undefined, undefined, currentState);
       this.cleanupTemporarySnapshots();
@@ -146,32 +178,70 @@ class EventSourcingManager {
   async createSnapshotFromEvent(eventId: string) {
     const targetEvent = this.events.find(e => e.id === eventId);
     if (!targetEvent) return null;
-    let stateToRestore: any;
-    if (targetEvent.previousState) stateToRestore = targetEvent.previousState; else {
-      const snapshotsBefore = this.snapshots.filter(s => s.timestamp <= targetEvent.timestamp).sort((a,b)=>b.timestamp-a.timestamp);
+    let stateToRestore: any = targetEvent.previousStateRef ? this.store.get(targetEvent.previousStateRef) : undefined;
+    if (stateToRestore === undefined) {
+      const snapshotsBefore = this.storedSnapshots().filter(s => s.timestamp <= targetEvent.timestamp).sort((a,b)=>b.timestamp-a.timestamp);
       stateToRestore = snapshotsBefore.length > 0 ? snapshotsBefore[0].state : this.getCurrentState();
     }
     const tempSnapshot: StateSnapshot = { id: `temp_event_${eventId}_${Date.now()}`, timestamp: targetEvent.timestamp, triggerEvent: `Event: ${targetEvent.action}`, state: stateToRestore, metadata: { version: '1.0', size: JSON.stringify(stateToRestore).length, compressed: false } };
-    this.snapshots.push(tempSnapshot);
+    this.tempSnapshots.push(tempSnapshot);
     return tempSnapshot;
   }
 
-  deleteSnapshot(snapshotId: string): boolean { const initial = this.snapshots.length; this.snapshots = this.snapshots.filter(s=>s.id!==snapshotId); return this.snapshots.length < initial; }
-  clearAllData() { this.events = []; this.snapshots = []; this.criticalActionCount = 0; try { localStorage.removeItem('eventSourcing_events'); localStorage.removeItem('eventSourcing_snapshots'); } catch (_){}}
-  generateTestData() { for (let i=0;i<20;i++) this.logAction(['CREATE_TASK','EXECUTE_TASK','RATE_TASK','CREATE_USER'][i%4], {test:i}, `user${i%3}`, 'test_wg'); for (let i=0;i<5;i++) this.snapshots.push({ id: this.generateId(), timestamp: Date.now()-i*1000*60, triggerEvent: `TEST_${i}`, state: { users:{}, tasks:{} }, metadata:{ version:'1.0', size:100 }}); this.saveToStorage(); }
+  deleteSnapshot(snapshotId: string): boolean { const initial = this.tempSnapshots.length; this.tempSnapshots = this.tempSnapshots.filter(s=>s.id!==snapshotId); return this.store.remove(snapshotId) || this.tempSnapshots.length < initial; }
+  clearAllData() { this.log.clear(); this.store.clear(); this.tempSnapshots = []; this.criticalActionCount = 0; }
+  generateTestData() { for (let i=0;i<20;i++) this.logAction(['CREATE_TASK','EXECUTE_TASK','RATE_TASK','CREATE_USER'][i%4], {test:i}, `user${i%3}`, 'test_wg'); for (let i=0;i<5;i++) this.store.put(this.generateId(), { users:{}, tasks:{} }, { kind: 'snapshot', triggerEvent: `TEST_${i}`, version: '1.0' }, Date.now()-i*1000*60); }
 
-  getStats() { const now = Date.now(); const last24h = now - 24*60*60*1000; const last7d = now - 7*24*60*60*1000; return { totalEvents: this.events.length, totalSnapshots: this.snapshots.length, eventsLast24h: this.events.filter(e=>e.timestamp>last24h).length, eventsLast7d: this.events.filter(e=>e.timestamp>last7d).length, criticalEvents: this.events.filter(e=>e.metadata.critical).length, oldestEvent: this.events.length>0? new Date(Math.min(...this.events.map(e=>e.timestamp))) : null, newestEvent: this.events.length>0? new Date(Math.max(...this.events.map(e=>e.timestamp))) : null, averageSnapshotSize: this.snapshots.length>0? this.snapshots.reduce((s,a)=>s+a.metadata.size,0)/this.snapshots.length:0 } }
+  getStats() { const now = Date.now(); const last24h = now - 24*60*60*1000; const last7d = now - 7*24*60*60*1000; const events = this.events; const snapshots = this.storedSnapshots(); return { totalEvents: events.length, totalSnapshots: snapshots.length, eventsLast24h: events.filter(e=>e.timestamp>last24h).length, eventsLast7d: events.filter(e=>e.timestamp>last7d).length, criticalEvents: events.filter(e=>e.metadata.critical).length, oldestEvent: events.length>0? new Date(Math.min(...events.map(e=>e.timestamp))) : null, newestEvent: events.length>0? new Date(Math.max(...events.map(e=>e.timestamp))) : null, averageSnapshotSize: snapshots.length>0? snapshots.reduce((s,a)=>s+a.metadata.size,0)/snapshots.length:0, storageSize: this.store.storedBytes } }
 
   private countDifferences(current:any, target:any) { const currentKeys = Object.keys(current||{}); const targetKeys = Object.keys(target||{}); const added = targetKeys.filter(k=>!currentKeys.includes(k)).length; const removed = currentKeys.filter(k=>!targetKeys.includes(k)).length; const modified = currentKeys.filter(k=> targetKeys.includes(k) && JSON.stringify(current[k]) !== JSON.stringify(target[k])).length; return { added, modified, removed }; }
   private getCurrentState() { if (typeof window !== 'undefined' && (window as any).dataManager) return (window as any).dataManager.getState(); return { users:{}, tasks:{}, wgs:{}, ratings:{}, currentUser: null, currentWG: null }; }
   private generateId() { return `evt_${Date.now()}_${Math.random().toString(36).substr(2,9)}`; }
+  private previousStateId(eventId: string) { return `prev_${eventId}`; }
   private getSessionId() { try { let sessionId = sessionStorage.getItem('eventSourcingSessionId'); if (!sessionId) { sessionId = `sess_${Date.now()}_${Math.random().toString(36).substr(2,9)}`; sessionStorage.setItem('eventSourcingSessionId', sessionId); } return sessionId; } catch(e){ return `sess_${Date.now()}`; } }
-  private pruneOldEvents(){ if (this.events.length>this.maxEvents) this.events = this.events.slice(-Math.floor(this.maxEvents*0.8)); }
-  private pruneOldSnapshots(){ if (this.snapshots.length>this.maxSnapshots){ const keepCount=Math.floor(this.maxSnapshots*0.8); this.snapshots.sort((a,b)=>b.timestamp-a.timestamp); this.snapshots=this.snapshots.slice(0,keepCount); } }
-  private saveToStorage(){ try{ localStorage.setItem('eventSourcing_events', JSON.stringify(this.events)); localStorage.setItem('eventSourcing_snapshots', JSON.stringify(this.snapshots)); }catch(e){} }
-  private loadFromStorage(){ try{ const ev = localStorage.getItem('eventSourcing_events'); if (ev) this.events = JSON.parse(ev); const snaps = localStorage.getItem('eventSourcing_snapshots'); if (snaps) this.snapshots = JSON.parse(snaps); }catch(e){ this.events=[]; this.snapshots=[]; } }
+  private findSnapshot(snapshotId: string) { return this.tempSnapshots.find(s => s.id === snapshotId) || this.storedSnapshots().find(s => s.id === snapshotId); }
+
+  /** Snapshot views on the store; `state` is read back only when accessed. */
+  private storedSnapshots(): StateSnapshot[] {
+    const store = this.store;
+    return store.list().filter(m => m.meta.kind === 'snapshot').map((m: SnapshotManifest) => ({
+      id: m.id,
+      timestamp: m.timestamp,
+      triggerEvent: m.meta.triggerEvent,
+      get state() { return store.get(m.id); },
+      metadata: { version: m.meta.version || '1.0', size: m.size, compressed: false, storedSize: m.added }
+    }));
+  }
+
+  private pruneOldEvents(){ this.releaseEvents(this.log.trim(this.maxEvents)); }
+  private releaseEvents(events: ActionEvent[]){ events.forEach(e => { if (e.previousStateRef) this.store.remove(e.previousStateRef); }); }
+  private pruneOldSnapshots(){ const count = this.store.list().filter(m => m.meta.kind === 'snapshot').length; if (count>this.maxSnapshots) this.store.prune(Math.floor(this.maxSnapshots*0.8), m => m.meta.kind === 'snapshot'); }
+  private loadFromStorage(){
+    // Migrate the former single-key layout (full events + full snapshot states).
+    // The legacy blobs are what filled the quota, so they are read into memory
+    // and removed before anything is written in the new layout.
+    let events: ActionEvent[] = [];
+    let snapshots: StateSnapshot[] = [];
+    try {
+      const ev = localStorage.getItem('eventSourcing_events');
+      const snaps = localStorage.getItem('eventSourcing_snapshots');
+      if (!ev && !snaps) return;
+      if (ev) events = JSON.parse(ev);
+      if (snaps) snapshots = JSON.parse(snaps);
+    } catch(e){ console.warn('⚠️ [EventSourcing] Could not read stored events/snapshots:', e); }
+    try { localStorage.removeItem('eventSourcing_events'); localStorage.removeItem('eventSourcing_snapshots'); } catch (_){}
+    try {
+      if (events.length > 0) {
+        this.releaseEvents(this.log.replace(events.map(({ previousState, ...e }) => {
+          if (previousState === undefined || !this.store.put(this.previousStateId(e.id), previousState, { kind: 'event' }, e.timestamp)) return e;
+          return { ...e, previousStateRef: this.previousStateId(e.id) };
+        })));
+      }
+      snapshots.forEach(s => this.store.put(s.id, s.state, { kind: 'snapshot', triggerEvent: s.triggerEvent, version: s.metadata?.version }, s.timestamp));
+    } catch(e){ console.warn('⚠️ [EventSourcing] Could not migrate stored events/snapshots:', e); }
+  }
   private setupPeriodicCleanup(){ /* no-op or similar to original */ }
-  private cleanupTemporarySnapshots(){ const before=this.snapshots.length; this.snapshots=this.snapshots.filter(s=>!s.id.startsWith('temp_')); if (before!==this.snapshots.length) this.saveToStorage(); }
+  private cleanupTemporarySnapshots(){ this.tempSnapshots = []; }
 }
 
 export const eventSourcingManager = new EventSourcingManager();
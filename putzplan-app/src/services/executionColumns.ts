@@ -0,0 +1,136 @@
+import { TaskExecution } from '../types';
+import { executionTime } from './stateIndex';
+
+// ========================================
+// SPALTENFORMAT FÜR EXECUTIONS
+// ========================================
+
+/**
+ * Executions as parallel typed arrays, sorted by time. Row `i` is one
+ * execution: `times[i]` is its `date || executedAt` in ms, `users[i]` /
+ * `tasks[i]` index into `userIds` / `taskIds`, `points[i]` is pointsAwarded.
+ * Built once per period and then scanned without touching the execution
+ * objects or allocating Dates.
+ */
+export interface ExecutionColumns {
+  length: number;
+  times: Float64Array;
+  users: Int32Array;
+  tasks: Int32Array;
+  points: Float64Array;
+  userIds: string[];
+  taskIds: string[];
+  userIndex: Map<string, number>;
+}
+
+/** Points and execution counts per bucket and user, row-major: `[bucket * users + user]`. */
+export interface BucketedPoints {
+  buckets: number;
+  users: number;
+  points: Float64Array;
+  counts: Int32Array;
+}
+
+const intern = (ids: string[], index: Map<string, number>, id: string): number => {
+  let at = index.get(id);
+  if (at === undefined) { at = ids.length; ids.push(id); index.set(id, at); }
+  return at;
+};
+
+/**
+ * Builds the columns for `executions`. `userIds` are interned first, so a
+ * WG's members occupy indices `0 .. userIds.length - 1` in that order.
+ * Executions without a valid timestamp are skipped.
+ */
+export const buildExecutionColumns = (executions: TaskExecution[], userIds: string[] = []): ExecutionColumns => {
+  const users: string[] = [];
+  const userIndex = new Map<string, number>();
+  userIds.forEach(id => intern(users, userIndex, id));
+  const taskIds: string[] = [];
+  const taskIndex = new Map<string, number>();
+
+  const stamps = new Float64Array(executions.length);
+  const order: number[] = [];
+  executions.forEach((execution, i) => {
+    stamps[i] = executionTime(execution);
+    if (!Number.isNaN(stamps[i])) order.push(i);
+  });
+  order.sort((a, b) => stamps[a] - stamps[b]);
+
+  const length = order.length;
+  const columns: ExecutionColumns = {
+    length,
+    times: new Float64Array(length),
+    users: new Int32Array(length),
+    tasks: new Int32Array(length),
+    points: new Float64Array(length),
+    userIds: users,
+    taskIds,
+    userIndex
+  };
+  for (let row = 0; row < length; row++) {
+    const execution = executions[order[row]];
+    columns.times[row] = stamps[order[row]];
+    columns.users[row] = intern(users, userIndex, execution.executedBy);
+    columns.tasks[row] = intern(taskIds, taskIndex, execution.taskId);
+    columns.points[row] = execution.pointsAwarded || 0;
+  }
+  return columns;
+};
+
+/** First row whose time is >= `time`. */
+export const lowerBoundTime = (columns: ExecutionColumns, time: number): number => {
+  let lo = 0;
+  let hi = columns.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1;
+    if (columns.times[mid] < time) lo = mid + 1; else hi = mid;
+  }
+  return lo;
+};
+
+/** Sum of points per user index for rows with time in [start, end]. */
+export const sumPointsByUser = (columns: ExecutionColumns, start: number, end: number): Float64Array => {
+  const sums = new Float64Array(columns.userIds.length);
+  const { times, users, points } = columns;
+  for (let row = lowerBoundTime(columns, start); row < columns.length && times[row] <= end; row++) {
+    sums[users[row]] += points[row];
+  }
+  return sums;
+};
+
+/**
+ * Buckets points per user between ascending `edges`: bucket `b` holds rows
+ * with `edges[b] <= time < edges[b + 1]`. Works for days, weeks or any other
+ * partition; rows outside `[edges[0], edges[last])` are ignored.
+ */
+export const bucketPoints = (columns: ExecutionColumns, edges: ArrayLike<number>): BucketedPoints => {
+  const buckets = Math.max(0, edges.length - 1);
+  const userCount = columns.userIds.length;
+  const out: BucketedPoints = {
+    buckets,
+    users: userCount,
+    points: new Float64Array(buckets * userCount),
+    counts: new Int32Array(buckets * userCount)
+  };
+  if (buckets === 0) return out;
+
+  const { times, users, points } = columns;
+  const last = edges[buckets];
+  let bucket = 0;
+  for (let row = lowerBoundTime(columns, edges[0]); row < columns.length && times[row] < last; row++) {
+    while (times[row] >= edges[bucket + 1]) bucket++;
+    const cell = bucket * userCount + users[row];
+    out.points[cell] += points[row];
+    out.counts[cell]++;
+  }
+  return out;
+};
+
+/** Evenly spaced edges from `start` in steps of `width` ms, covering `end`. */
+export const bucketEdges = (start: number, end: number, width: number): Float64Array => {
+  const buckets = Math.max(1, Math.floor((end - start) / width) + 1);
+  const edges = new Float64Array(buckets + 1);
+  for (let b = 0; b <= buckets; b++) edges[b] = start + b * width;
+  return edges;
+};
@@ -1,4 +1,18 @@
+import { AppState, WG } from '../types';
 import { dataManager } from './dataManager';
+import { analyticsCache } from './analyticsCache';
+import { ExecutionColumns, BucketedPoints, buildExecutionColumns, bucketPoints, bucketEdges, sumPointsByUser } from './executionColumns';
+
+const DAY_MS = 86400000;
+const utcDay = (time: number) => Math.floor(time / DAY_MS) * DAY_MS;
+const isoDay = (time: number) => new Date(time).toISOString().split('T')[0];
+
+interface PeriodDays {
+  loopDays: string[];
+  first: number;
+  buckets: BucketedPoints;
+  rowOf: (day: string) => number;
+}
 
 export interface PeriodDefinition {
   id: string;
@@ -123,114 +137,140 @@ export class PeriodAnalyticsService {
     
     const startDate = new Date(period.startDate);
     const endDate = new Date(period.endDate);
+    const start = startDate.getTime();
+    const end = endDate.getTime();
     
-    // Filtere Executions für Zeitraum
-    const executions = Object.values(state.executions).filter((e: any) => {
-      const execDate = new Date(e.date);
-      const task = state.tasks[e.taskId];
-      return task && 
-             task.wgId === currentWG.id && 
-             execDate >= startDate && 
-             execDate <= endDate;
-    });
-    
-    // Member Progress berechnen
+    // Abgeschlossene Zeiträume werden nur neu berechnet, wenn sich eine ihrer
+    // Executions ändert (siehe AnalyticsCache).
+    const cache = analyticsCache.sync(state);
     const members = currentWG.memberIds.map(id => state.users[id]).filter(Boolean);
-    const memberProgress = members.map(user => {
-      const userExecutions = executions.filter((e: any) => e.executedBy === user.id);
-      const currentPoints = userExecutions.reduce((sum: number, e: any) => sum + (e.pointsAwarded || 0), 0);
-      const achievement = period.targetPoints > 0 ? Math.round((currentPoints / period.targetPoints) * 100) : 0;
+    const isClosed = end < Date.now();
+    const stamp = [
+      cache.rangeVersion(currentWG.id, start, end), period, currentWG.memberIds.join(','),
+      ...(isClosed ? [] : members)
+    ];
+    
+    return cache.remember(`periodAnalytics|${currentWG.id}|${period.id}`, stamp, () => {
+      // Punkte pro Tag & User in einem Durchlauf über die Spalten
+      const columns = this.periodColumns(state, currentWG, period);
+      const days = this.bucketDays(columns, startDate, endDate);
+      const memberIndex = new Uint8Array(columns.userIds.length);
+      members.forEach(user => { memberIndex[columns.userIndex.get(user.id)!] = 1; });
+      
+      // Member Progress berechnen
+      const memberProgress = members.map(user => {
+        // Daily Progress für Line Chart
+        const dailyProgress = this.calculateDailyProgress(columns.userIndex.get(user.id)!, days);
+        const currentPoints = dailyProgress.length > 0 ? dailyProgress[dailyProgress.length - 1].cumulative : 0;
+        const achievement = period.targetPoints > 0 ? Math.round((currentPoints / period.targetPoints) * 100) : 0;
+        
+        return {
+          userId: user.id,
+          user,
+          currentPoints,
+          targetPoints: period.targetPoints,
+          achievement,
+          isCompleted: currentPoints >= period.targetPoints,
+          dailyProgress
+        };
+      });
       
-      // Daily Progress für Line Chart
-      const dailyProgress = this.calculateDailyProgress(userExecutions, startDate, endDate);
+      // Team Stats
+      const totalPoints = memberProgress.reduce((sum, mp) => sum + mp.currentPoints, 0);
+      const totalTarget = memberProgress.length * period.targetPoints;
+      const completedMembers = memberProgress.filter(mp => mp.isCompleted).length;
+      const averageAchievement = memberProgress.length > 0 
+        ? Math.round(memberProgress.reduce((sum, mp) => sum + mp.achievement, 0) / memberProgress.length)
+        : 0;
+      
+      // Timeline für Chart
+      const timeline = this.calculateTimeline(days, columns.userIds, memberIndex, members);
       
       return {
-        userId: user.id,
-        user,
-        currentPoints,
-        targetPoints: period.targetPoints,
-        achievement,
-        isCompleted: currentPoints >= period.targetPoints,
-        dailyProgress
+        period,
+        memberProgress,
+        teamStats: {
+          totalPoints,
+          totalTarget,
+          averageAchievement,
+          completedMembers,
+          pendingMembers: members.length - completedMembers
+        },
+        timeline
       };
     });
-    
-    // Team Stats
-    const totalPoints = memberProgress.reduce((sum, mp) => sum + mp.currentPoints, 0);
-    const totalTarget = memberProgress.length * period.targetPoints;
-    const completedMembers = memberProgress.filter(mp => mp.isCompleted).length;
-    const averageAchievement = memberProgress.length > 0 
-      ? Math.round(memberProgress.reduce((sum, mp) => sum + mp.achievement, 0) / memberProgress.length)
-      : 0;
-    
-    // Timeline für Chart
-    const timeline = this.calculateTimeline(executions, members, startDate, endDate);
-    
+  }
+  
+  // Spalten (Zeit, User, Task, Punkte) der Executions eines Zeitraums; einmal pro
+  // Zeitraum aufgebaut und wiederverwendet, bis sich eine seiner Executions ändert
+  private static periodColumns(state: AppState, wg: WG, period: PeriodDefinition): ExecutionColumns {
+    const cache = analyticsCache.sync(state);
+    const start = new Date(period.startDate).getTime();
+    const end = new Date(period.endDate).getTime();
+    const stamp = [cache.rangeVersion(wg.id, start, end), start, end, wg.memberIds.join(',')];
+    return cache.remember(`periodColumns|${wg.id}|${period.id}`, stamp,
+      () => buildExecutionColumns(cache.executionsBetween(wg.id, start, end), wg.memberIds));
+  }
+  
+  // Alle Tage des Zeitraums als ISO-Datum
+  private static periodDays(startDate: Date, endDate: Date): string[] {
+    const days: string[] = [];
+    for (let d = new Date(startDate); d <= endDate; d.setDate(d.getDate() + 1)) {
+      days.push(d.toISOString().split('T')[0]);
+    }
+    return days;
+  }
+  
+  // Punkte pro (UTC-)Tag und User; `rowOf` liefert die Zeile eines ISO-Datums
+  private static bucketDays(columns: ExecutionColumns, startDate: Date, endDate: Date): PeriodDays {
+    const loopDays = this.periodDays(startDate, endDate);
+    const first = Math.min(utcDay(startDate.getTime()), ...loopDays.slice(0, 1).map(day => Date.parse(day)));
+    const last = Math.max(utcDay(endDate.getTime()), ...loopDays.slice(-1).map(day => Date.parse(day)));
+    const buckets = bucketPoints(columns, bucketEdges(first, last, DAY_MS));
     return {
-      period,
-      memberProgress,
-      teamStats: {
-        totalPoints,
-        totalTarget,
-        averageAchievement,
-        completedMembers,
-        pendingMembers: members.length - completedMembers
-      },
-      timeline
+      loopDays,
+      first,
+      buckets,
+      rowOf: day => (Date.parse(day) - first) / DAY_MS
     };
   }
   
   // Berechne tägliche Fortschritte für einen User
-  private static calculateDailyProgress(userExecutions: any[], startDate: Date, endDate: Date) {
-    const dailyMap = new Map<string, number>();
-    
-    // Initialisiere alle Tage mit 0
-    for (let d = new Date(startDate); d <= endDate; d.setDate(d.getDate() + 1)) {
-      dailyMap.set(d.toISOString().split('T')[0], 0);
+  private static calculateDailyProgress(userIndex: number, days: PeriodDays) {
+    const { buckets } = days;
+    // Tage mit Executions außerhalb der Tagesschleife (Zeitzonen-Rand) werden angehängt
+    const dates = new Set(days.loopDays);
+    for (let row = 0; row < buckets.buckets; row++) {
+      if (buckets.counts[row * buckets.users + userIndex] > 0) dates.add(isoDay(days.first + row * DAY_MS));
     }
     
-    // Summiere Punkte pro Tag
-    userExecutions.forEach(exec => {
-      const date = new Date(exec.date).toISOString().split('T')[0];
-      dailyMap.set(date, (dailyMap.get(date) || 0) + (exec.pointsAwarded || 0));
-    });
-    
     // Konvertiere zu Array mit kumulativen Werten
     let cumulative = 0;
-    return Array.from(dailyMap.entries()).map(([date, points]) => {
+    return Array.from(dates).map(date => {
+      const row = days.rowOf(date);
+      const points = row >= 0 && row < buckets.buckets ? buckets.points[row * buckets.users + userIndex] : 0;
       cumulative += points;
       return { date, points, cumulative };
     });
   }
   
   // Berechne Timeline für Chart
-  private static calculateTimeline(executions: any[], members: any[], startDate: Date, endDate: Date) {
-    const timelineMap = new Map<string, { totalPoints: number; memberPoints: Record<string, number> }>();
-    
-    // Initialisiere alle Tage
-    for (let d = new Date(startDate); d <= endDate; d.setDate(d.getDate() + 1)) {
-      const dateStr = d.toISOString().split('T')[0];
-      timelineMap.set(dateStr, {
-        totalPoints: 0,
-        memberPoints: Object.fromEntries(members.map(m => [m.id, 0]))
-      });
-    }
-    
-    // Summiere Executions pro Tag
-    executions.forEach(exec => {
-      const dateStr = new Date(exec.date).toISOString().split('T')[0];
-      const dayData = timelineMap.get(dateStr);
-      if (dayData) {
-        dayData.totalPoints += exec.pointsAwarded || 0;
-        dayData.memberPoints[exec.executedBy] = (dayData.memberPoints[exec.executedBy] || 0) + (exec.pointsAwarded || 0);
+  private static calculateTimeline(days: PeriodDays, userIds: string[], memberIndex: Uint8Array, members: any[]) {
+    const { buckets } = days;
+    return Array.from(new Set(days.loopDays)).map(date => {
+      const memberPoints: Record<string, number> = Object.fromEntries(members.map(m => [m.id, 0]));
+      let totalPoints = 0;
+      const row = days.rowOf(date);
+      if (row >= 0 && row < buckets.buckets) {
+        const offset = row * buckets.users;
+        for (let u = 0; u < buckets.users; u++) {
+          if (!memberIndex[u] && buckets.counts[offset + u] === 0) continue;
+          totalPoints += buckets.points[offset + u];
+          memberPoints[userIds[u]] = (memberPoints[userIds[u]] || 0) + buckets.points[offset + u];
+        }
       }
+      return { date, totalPoints, memberPoints };
     });
-    
-    return Array.from(timelineMap.entries()).map(([date, data]) => ({
-      date,
-      totalPoints: data.totalPoints,
-      memberPoints: data.memberPoints
-    }));
   }
   
   // Finde Mitglieder die ihre Ziele nicht erreicht haben
@@ -239,21 +279,32 @@ export class PeriodAnalyticsService {
     user: any; 
     periods: { periodId: string; period: PeriodDefinition; achievement: number; missing: number }[] 
   }[] {
-    const members = dataManager.getCurrentWG()?.memberIds.map(id => dataManager.getState().users[id]).filter(Boolean) || [];
+    const state = dataManager.getState();
+    const currentWG = dataManager.getCurrentWG();
+    if (!currentWG) return [];
+    const members = currentWG.memberIds.map(id => state.users[id]).filter(Boolean);
+    
+    // Pro Zeitraum eine Summe je User über die Spalten statt der vollen Analytics
+    const sumsByPeriod = new Map(periodIds.map(periodId => {
+      const period = currentWG.periods?.find(p => p.id === periodId);
+      if (!period) return [periodId, null] as const;
+      const columns = this.periodColumns(state, currentWG, period);
+      const sums = sumPointsByUser(columns, new Date(period.startDate).getTime(), new Date(period.endDate).getTime());
+      return [periodId, { period, columns, sums }] as const;
+    }));
     
     return members.map(user => {
       const periods = periodIds.map(periodId => {
-        const analytics = this.calculatePeriodAnalytics(periodId);
-        if (!analytics) return null;
-        
-        const memberProgress = analytics.memberProgress.find(mp => mp.userId === user.id);
-        if (!memberProgress) return null;
+        const entry = sumsByPeriod.get(periodId);
+        if (!entry) return null;
         
+        const { period, columns, sums } = entry;
+        const currentPoints = sums[columns.userIndex.get(user.id)!];
         return {
           periodId,
-          period: analytics.period,
-          achievement: memberProgress.achievement,
-          missing: Math.max(0, memberProgress.targetPoints - memberProgress.currentPoints)
+          period,
+          achievement: period.targetPoints > 0 ? Math.round((currentPoints / period.targetPoints) * 100) : 0,
+          missing: Math.max(0, period.targetPoints - currentPoints)
         };
       }).filter(Boolean);
       
@@ -264,4 +315,4 @@ export class PeriodAnalyticsService {
       };
     }).filter(member => member.periods.some(p => p.achievement < 100));
   }
-}
\ No newline at end of file
+}
@@ -1,5 +1,5 @@
 import { dataManager } from './dataManager';
-import { AppState, User, WG, Task, TaskRating, TaskExecution, ExecutionStatus } from '../types';
+import { AppState, User, WG, Task, TaskRating, TaskExecution, ExecutionStatus, PeriodInfo } from '../types';
 
 // Deterministic IDs & timestamps for reproducible tests
 const FIXED_DATE = new Date('2025-01-01T10:00:00Z');
@@ -322,6 +322,99 @@ function buildSeedStateDarius(): AppState {
   } as AppState;
 }
 
+// ------------------------------------------------------
+// BENCHMARK VARIANT (große, deterministische Datenmengen)
+// ------------------------------------------------------
+
+export interface BenchmarkSeedOptions {
+  /** Anzahl WGs (je 6 Mitglieder & 18 Tasks wie die Darius-WG) */
+  wgCount?: number;
+  /** Executions pro WG, typischerweise 10_000 – 100_000 */
+  executionsPerWg?: number;
+  /** Länge eines Zeitraums in Tagen; Executions verteilen sich über 12 Zeiträume */
+  periodDays?: number;
+}
+
+/**
+ * Baut einen großen, reproduzierbaren State auf Basis der Darius-WG für
+ * Performance-Messungen (siehe src/__tests__/stateIndex.bench.ts). Die IDs
+ * jeder WG werden mit `w<n>-` präfixiert; etwa die Hälfte der Executions trägt
+ * eine periodId, der Rest wird nur über das Datum einem Zeitraum zugeordnet.
+ */
+export function buildBenchmarkState(options: BenchmarkSeedOptions = {}): AppState {
+  const { wgCount = 1, executionsPerWg = 10_000, periodDays = 30 } = options;
+  const template = buildSeedStateDarius();
+  const templateTasks = Object.values(template.tasks);
+  const periodCount = 12;
+  const periodMs = periodDays * 86400000;
+
+  const state: AppState = { ...template, currentUser: null, wgs: {}, users: {}, tasks: {}, executions: {}, ratings: {} };
+  for (let w = 0; w < wgCount; w++) {
+    const prefix = `w${w}-`;
+    const memberIds = dariusMembers.map(m => prefix + m.id);
+    const periods: PeriodInfo[] = Array.from({ length: periodCount }, (_, p) => {
+      const start = new Date(FIXED_DATE.getTime() + p * periodMs);
+      return { id: `${prefix}p${p}`, start, end: new Date(start.getTime() + periodMs - 1), days: periodDays };
+    });
+    const wg: WG = {
+      ...(template.currentWG as WG),
+      id: prefix + 'wg',
+      name: `Benchmark WG ${w + 1}`,
+      inviteCode: `BENCH${w}`,
+      memberIds,
+      periods: periods.map((p, idx) => ({
+        id: p.id,
+        name: `Zeitraum ${idx + 1}`,
+        startDate: p.start.toISOString(),
+        endDate: p.end.toISOString(),
+        targetPoints: 120,
+        isActive: idx === periodCount - 1,
+        createdAt: p.start.toISOString()
+      }))
+    };
+    state.wgs[wg.id] = wg;
+
+    dariusMembers.forEach(m => {
+      state.users[prefix + m.id] = { ...template.users[m.id], id: prefix + m.id, currentMonthPoints: 0, totalCompletedTasks: 0 };
+    });
+    templateTasks.forEach(task => {
+      state.tasks[prefix + task.id] = { ...task, id: prefix + task.id, wgId: wg.id, createdBy: memberIds[0] };
+    });
+    Object.values(template.ratings).forEach(rating => {
+      state.ratings[prefix + rating.id] = { ...rating, id: prefix + rating.id, taskId: prefix + rating.taskId, userId: prefix + rating.userId };
+    });
+
+    for (let i = 0; i < executionsPerWg; i++) {
+      const key = prefix + i;
+      const task = state.tasks[prefix + templateTasks[hashNum(key + 't', templateTasks.length)].id];
+      const executedBy = memberIds[hashNum(key + 'u', memberIds.length)];
+      const period = periods[Math.floor((i / executionsPerWg) * periodCount)];
+      const executedAt = new Date(period.start.getTime() + hashNum(key + 'd', periodDays * 24) * 3600000);
+      const execution: TaskExecution = {
+        id: prefix + 'e' + i,
+        taskId: task.id,
+        executedBy,
+        executedAt,
+        pointsAwarded: task.pointsPerExecution,
+        isVerified: true,
+        status: ExecutionStatus.VERIFIED,
+        ...(i % 2 === 0 ? { periodId: period.id } : {})
+      };
+      state.executions[execution.id] = execution;
+    }
+  }
+
+  const firstWg = state.wgs['w0-wg'] || null;
+  const lastPeriod = firstWg?.periods?.[periodCount - 1];
+  return {
+    ...state,
+    currentWG: firstWg,
+    currentPeriod: lastPeriod
+      ? { id: lastPeriod.id, start: new Date(lastPeriod.startDate), end: new Date(lastPeriod.endDate), days: periodDays }
+      : undefined
+  };
+}
+
 export function seedDemoData(options: SeedOptions = {}) {
   const { force, variant = 'darius' } = options;
   const seededFlagKey = `${seededFlagPrefix}-${variant}`;
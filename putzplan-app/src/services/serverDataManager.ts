@@ -1,5 +1,6 @@
 import { AppState, User, WG, Task, TaskExecution, TaskRating, Notification, ExecutionStatus, Absence, TemporaryResident, PostExecutionRating, PeriodInfo } from '../types';
 import { generateId } from '../utils/taskUtils';
+import { ServerSync } from './serverSync';
 
 // ========================================
 // SERVER-BASIERTES DATENMANAGEMENT
@@ -26,6 +27,9 @@ const initialState: AppState = {
   debugMode: false
 };
 
+// Chosen per device, never taken over from other clients
+const LOCAL_KEYS = ['currentUser', 'currentWG'];
+
 /**
  * Server-basierter DataManager
  * Speichert Daten auf dem Server statt im localStorage
@@ -35,6 +39,9 @@ class ServerDataManager {
   private saveTimeout: NodeJS.Timeout | null = null;
   private isOnline: boolean = true;
   private pendingChanges: boolean = false;
+  // Baseline for delta saves and the push channel (see serverSync.ts)
+  private sync: ServerSync | null = null;
+  private listeners: Set<(state: AppState) => void> = new Set();
 
   constructor() {
     this.loadFromServer();
@@ -78,6 +85,7 @@ class ServerDataManager {
       
       this.state = merged;
       console.log('📡 Data loaded from server');
+      this.connectSync(merged, Number(data.seq) || 0);
       return merged;
       
     } catch (error) {
@@ -87,6 +95,42 @@ class ServerDataManager {
     }
   }
 
+  /**
+   * Öffnet den Push-Kanal (server/syncHub.js): Änderungen anderer Clients
+   * kommen als Deltas an, statt dass der ganze State neu geladen wird.
+   */
+  private connectSync(state: AppState, seq: number): void {
+    if (typeof EventSource === 'undefined') return;
+    this.sync?.close();
+    this.sync = new ServerSync({
+      baseUrl: API_BASE,
+      localKeys: LOCAL_KEYS,
+      deserialize: value => this.deserializeDates(value),
+      getState: () => this.state,
+      onRemoteState: next => {
+        this.state = { ...initialState, ...next };
+        this.refreshLocalKeys();
+        this.notifyListeners();
+      }
+    });
+    this.sync.attach(state, seq);
+  }
+
+  private refreshLocalKeys(): void {
+    const { currentUser, currentWG } = this.state;
+    if (currentUser && this.state.users[currentUser.id]) this.state.currentUser = this.state.users[currentUser.id];
+    if (currentWG && this.state.wgs?.[currentWG.id]) this.state.currentWG = this.state.wgs[currentWG.id];
+  }
+
+  subscribe(listener: (state: AppState) => void): () => void {
+    this.listeners.add(listener);
+    return () => this.listeners.delete(listener);
+  }
+
+  private notifyListeners(): void {
+    this.listeners.forEach(listener => listener(this.state));
+  }
+
   private async saveToServer(): Promise<void> {
     if (!this.isOnline) {
       this.pendingChanges = true;
@@ -95,6 +139,15 @@ class ServerDataManager {
     }
 
     try {
+      if (this.sync) {
+        const result = await this.sync.save();
+        this.pendingChanges = false;
+        if (result) console.log('💾 Data saved to server:', result.savedAt);
+        return;
+      }
+
+      // Without the push channel (no EventSource): full upload, the server
+      // journals only the difference
       const response = await fetch(`${API_BASE}/api/data`, {
         method: 'POST',
         headers: {
@@ -0,0 +1,157 @@
+import { AppState } from '../types';
+import { applyDelta, captureState, DeltaOp, diffState, getAtPath } from './stateDelta';
+import { SyncChannel, SyncEventSource } from './syncChannel';
+
+// ========================================
+// SERVER-SYNC FÜR DIE DATA MANAGER
+// ========================================
+
+export interface ServerSyncOptions {
+  baseUrl?: string;
+  clientId?: string;
+  fetch?: typeof fetch;
+  createEventSource?: (url: string) => SyncEventSource;
+  /** Keys chosen per device: sent along, but never taken over from other clients. */
+  localKeys?: string[];
+  /** Turns JSON from the server back into app values (ISO strings to Dates). */
+  deserialize?: (value: any) => any;
+  /** Current local state (read before every save and remote merge). */
+  getState: () => AppState;
+  /** Receives the local state with remote changes merged in. */
+  onRemoteState: (state: AppState) => void;
+}
+
+/**
+ * Keeps a data manager's state in sync with server/dataStore.js.
+ *
+ * `synced` is the state as the server knows it; `save()` sends the delta from
+ * there to the local state over the SyncChannel and remote deltas are merged
+ * into both. A remote op is applied locally only where the local value still
+ * equals the server's (plus any save in flight), so unsaved edits survive
+ * until they are sent. Saves run one at a time; after a save `synced` is
+ * rebased (sent ops first, then the remote ops that arrived meanwhile) rather
+ * than replaced, so a concurrent remote change is not mistaken for a local
+ * edit and sent back.
+ */
+export class ServerSync {
+  readonly channel: SyncChannel;
+
+  private options: ServerSyncOptions;
+  private synced: AppState | null = null;
+  private inFlight: DeltaOp[] | null = null;
+  private remoteDuringSave: DeltaOp[] = [];
+  private reloadedDuringSave = false;
+  private queue: Promise<unknown> = Promise.resolve();
+  private timer: ReturnType<typeof setTimeout> | null = null;
+
+  constructor(options: ServerSyncOptions) {
+    this.options = options;
+    this.channel = new SyncChannel({
+      baseUrl: options.baseUrl,
+      clientId: options.clientId,
+      fetch: options.fetch,
+      createEventSource: options.createEventSource,
+      onDelta: ops => this.applyRemote(ops),
+      onSnapshot: ({ state }) => this.applySnapshot(state)
+    });
+  }
+
+  /** True once `attach()` set the server baseline. */
+  get attached(): boolean {
+    return this.synced !== null;
+  }
+
+  /** Fetches the server's state (`GET /api/data`), without applying it. */
+  async load(): Promise<{ state: any; seq: number }> {
+    const impl = this.options.fetch || fetch;
+    const response = await impl(`${this.options.baseUrl || ''}/api/data`);
+    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+    const data = await response.json();
+    return { state: this.deserialize(data.state || {}), seq: Number(data.seq) || 0 };
+  }
+
+  /** Takes `state` as what the server holds at `seq` and opens the push channel. */
+  attach(state: AppState, seq: number): void {
+    this.synced = captureState(state);
+    this.channel.connect(seq);
+  }
+
+  /** Sends local changes since the last sync; null if there were none. */
+  save(): Promise<{ seq: number; savedAt: string } | null> {
+    const run = this.queue.then(() => this.saveNow());
+    this.queue = run.catch(() => {});
+    return run;
+  }
+
+  /** Debounced `save()`; errors are logged and the changes go out with the next save. */
+  scheduleSave(delayMs = 500): void {
+    if (!this.synced) return;
+    if (this.timer) clearTimeout(this.timer);
+    this.timer = setTimeout(() => {
+      this.timer = null;
+      this.save().catch(error => console.error('❌ [Sync] Save failed:', error));
+    }, delayMs);
+  }
+
+  close(): void {
+    if (this.timer) clearTimeout(this.timer);
+    this.timer = null;
+    this.channel.close();
+  }
+
+  // ----------------------------------------
+  // Intern
+  // ----------------------------------------
+
+  private async saveNow(): Promise<{ seq: number; savedAt: string } | null> {
+    if (!this.synced) return null;
+    const ops = diffState(this.synced, captureState(this.options.getState()));
+    if (ops.length === 0) return null;
+
+    const base = this.synced;
+    this.inFlight = ops;
+    this.remoteDuringSave = [];
+    this.reloadedDuringSave = false;
+    try {
+      const result = await this.channel.send(ops);
+      // Remote ops delivered meanwhile were sequenced after ours: they go on top.
+      // After a full reload the channel replays our echo into `synced` instead.
+      if (!this.reloadedDuringSave) this.synced = applyDelta(applyDelta(base, ops), this.remoteDuringSave);
+      return result;
+    } finally {
+      this.inFlight = null;
+      this.remoteDuringSave = [];
+    }
+  }
+
+  private applyRemote(ops: DeltaOp[]): void {
+    if (!this.synced) return;
+    const localKeys = this.options.localKeys || [];
+    const remote = ops
+      .filter(op => !localKeys.includes(op.path[0]))
+      .map(op => (op.delete ? op : { ...op, value: this.deserialize(op.value) }));
+    if (remote.length === 0) return;
+
+    // What the local state looks like without unsaved edits
+    const clean = this.inFlight ? applyDelta(this.synced, this.inFlight) : this.synced;
+    const state = this.options.getState();
+    const apply = remote.filter(op => getAtPath(state, op.path) === getAtPath(clean, op.path));
+
+    this.synced = applyDelta(this.synced, remote);
+    if (this.inFlight) this.remoteDuringSave.push(...remote);
+    if (apply.length > 0) this.options.onRemoteState(applyDelta(state, apply));
+  }
+
+  private applySnapshot(serverState: any): void {
+    const state = this.deserialize(serverState || {});
+    const local: any = this.options.getState();
+    (this.options.localKeys || []).forEach(key => { state[key] = local[key]; });
+    this.synced = captureState(state);
+    if (this.inFlight) this.reloadedDuringSave = true;
+    this.options.onRemoteState({ ...local, ...state });
+  }
+
+  private deserialize(value: any): any {
+    return this.options.deserialize ? this.options.deserialize(value) : value;
+  }
+}
@@ -0,0 +1,545 @@
+// ========================================
+// CONTENT-ADRESSIERTER SNAPSHOT-SPEICHER
+// ========================================
+
+/** The part of the Web Storage API the stores use; `key`/`length` are optional. */
+export interface StorageLike {
+  getItem(key: string): string | null;
+  setItem(key: string, value: string): void;
+  removeItem(key: string): void;
+  key?(index: number): string | null;
+  readonly length?: number;
+}
+
+export interface SnapshotManifest {
+  id: string;
+  timestamp: number;
+  /** Hash of the root node. */
+  root: string;
+  /** Characters the value takes serialized on its own, i.e. without sharing. */
+  size: number;
+  /** Characters this snapshot added to storage (blobs no earlier snapshot had). */
+  added: number;
+  meta: Record<string, any>;
+}
+
+export interface ChangeCount {
+  added: number;
+  modified: number;
+  removed: number;
+}
+
+/** cyrb53: fast 53-bit string hash. */
+const cyrb53 = (str: string, seed: number): string => {
+  let h1 = 0xdeadbeef ^ seed;
+  let h2 = 0x41c6ce57 ^ seed;
+  for (let i = 0; i < str.length; i++) {
+    const ch = str.charCodeAt(i);
+    h1 = Math.imul(h1 ^ ch, 2654435761);
+    h2 = Math.imul(h2 ^ ch, 1597334677);
+  }
+  h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507) ^ Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+  h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507) ^ Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+  return (4294967296 * (2097151 & h2) + (h1 >>> 0)).toString(36).padStart(11, '0');
+};
+
+/** 106-bit content hash (two seeded cyrb53 runs). */
+export const hashString = (str: string): string => cyrb53(str, 0) + cyrb53(str, 0x9e3779b9);
+
+const TREE = 'T';
+
+const isPlainObject = (value: unknown): value is Record<string, unknown> =>
+  !!value && typeof value === 'object' && !Array.isArray(value) && !(value instanceof Date);
+
+// A keyed map of records (`tasks`, `users`, ...): split so each record is shared on its own
+const isCollection = (value: Record<string, unknown>) => {
+  const values = Object.values(value);
+  return values.length > 0 && values.every(isPlainObject);
+};
+
+interface TreeNode {
+  hash: string;
+  size: number;
+  /** Leaf: serialized value. Tree: child hashes by key. */
+  blob?: string;
+  value?: unknown;
+  children?: Record<string, TreeNode>;
+}
+
+interface StoreIndex {
+  version: 1;
+  snapshots: SnapshotManifest[];
+}
+
+/**
+ * Snapshots of (large, mostly unchanged) objects in Web Storage.
+ *
+ * A value is split into a tree: the root object and every keyed map of
+ * records become nodes that list their children by hash, everything else is
+ * stored as a JSON leaf under `<prefix>:blob:<hash>`. Identical content is
+ * stored once, so fifty snapshots of a state in which one task changed cost
+ * one task plus the two nodes above it each.
+ *
+ * Blobs are reference counted; removing a snapshot deletes what no other
+ * snapshot uses. `maxBytes` bounds the stored characters — when a new
+ * snapshot does not fit (or the browser reports a full quota), unreferenced
+ * blobs and then the oldest snapshots are evicted first. `put()` returns null
+ * if that is still not enough; the store is left as it was minus evictions.
+ *
+ * Leaf hashes are memoized per object, so values must not be mutated after
+ * they were stored or diffed (DataManager replaces records on every update).
+ */
+export class SnapshotStore {
+  private readonly prefix: string;
+  private readonly maxBytes: number;
+  private readonly storage: () => StorageLike;
+
+  private index: StoreIndex = { version: 1, snapshots: [] };
+  private refs = new Map<string, number>();
+  private sizes = new Map<string, number>();
+  private bytes = 0;
+  // Storage object and index string the in-memory counts belong to
+  private loadedFrom: StorageLike | null = null;
+  private loadedIndex: string | null = null;
+  private leafMemo = new WeakMap<object, { hash: string; size: number }>();
+
+  constructor(options: { prefix: string; maxBytes: number; storage?: () => StorageLike }) {
+    this.prefix = options.prefix;
+    this.maxBytes = options.maxBytes;
+    this.storage = options.storage || (() => localStorage);
+  }
+
+  /** Manifests, oldest first. */
+  list(): SnapshotManifest[] {
+    this.sync();
+    return [...this.index.snapshots];
+  }
+
+  has(id: string): boolean {
+    return this.list().some(s => s.id === id);
+  }
+
+  /** Characters currently used (blobs and index). */
+  get storedBytes(): number {
+    this.sync();
+    return this.bytes + (this.loadedIndex || '').length;
+  }
+
+  /**
+   * Stores `value` under `id` (replacing an older snapshot with that id).
+   * Returns null if it does not fit even after evicting everything else.
+   */
+  put(id: string, value: unknown, meta: Record<string, any> = {}, timestamp = Date.now()): SnapshotManifest | null {
+    this.sync();
+    const tree = this.build(value, 0);
+    const before = this.bytes;
+    try {
+      this.retain(tree);
+      const added = this.bytes - before;
+      // Replacing: released only now, so blobs both versions share stay in place
+      this.dropManifest(id);
+      const manifest: SnapshotManifest = { id, timestamp, root: tree.hash, size: tree.size, added, meta };
+      this.index.snapshots.push(manifest);
+      this.index.snapshots.sort((a, b) => a.timestamp - b.timestamp);
+      while (this.bytes > this.maxBytes && this.evictOldest(id)) { /* evict */ }
+      this.writeIndex();
+      return manifest;
+    } catch (error) {
+      console.error(`❌ [SnapshotStore] Could not store ${id}:`, error);
+      // Recount from the stored index; the blobs written so far become orphans and go
+      this.loadedFrom = null;
+      this.sync();
+      return null;
+    }
+  }
+
+  /** Rebuilds the stored value, or undefined if `id` is unknown. */
+  get(id: string): any {
+    const manifest = this.list().find(s => s.id === id);
+    return manifest ? this.materialize(manifest.root) : undefined;
+  }
+
+  remove(id: string): boolean {
+    this.sync();
+    const removed = this.dropManifest(id);
+    if (removed) this.writeIndex();
+    return removed;
+  }
+
+  /** Removes the oldest snapshots until `keep` remain (optionally only those matching `filter`). */
+  prune(keep: number, filter: (manifest: SnapshotManifest) => boolean = () => true): number {
+    const candidates = this.list().filter(filter);
+    const excess = candidates.slice(0, Math.max(0, candidates.length - keep));
+    excess.forEach(manifest => this.dropManifest(manifest.id));
+    if (excess.length > 0) this.writeIndex();
+    return excess.length;
+  }
+
+  clear(): void {
+    this.sync();
+    [...this.index.snapshots].forEach(manifest => this.dropManifest(manifest.id));
+    this.storage().removeItem(this.indexKey);
+    this.loadedIndex = null;
+  }
+
+  /**
+   * Record-level differences per top-level key between `current` and the
+   * snapshot `id`, found by comparing hashes — records that did not change
+   * are neither serialized nor read back.
+   */
+  diff(current: unknown, id: string, keys: string[]): Record<string, ChangeCount> {
+    const manifest = this.list().find(s => s.id === id);
+    if (!manifest) throw new Error(`Snapshot ${id} not found`);
+    const here = this.build(current, 0).children || {};
+    const there = this.childHashes(manifest.root);
+    const result: Record<string, ChangeCount> = {};
+    keys.forEach(key => {
+      const a = here[key];
+      const b = there[key];
+      if (a && b === a.hash) {
+        result[key] = { added: 0, modified: 0, removed: 0 };
+        return;
+      }
+      const currentChildren: Record<string, string> = {};
+      if (a?.children) Object.entries(a.children).forEach(([k, node]) => { currentChildren[k] = node.hash; });
+      else if (a && isPlainObject(a.value)) Object.entries(a.value).forEach(([k, v]) => { currentChildren[k] = this.build(v, 2).hash; });
+      const targetChildren = b ? this.childHashes(b) : {};
+      const currentKeys = Object.keys(currentChildren);
+      result[key] = {
+        added: Object.keys(targetChildren).filter(k => !(k in currentChildren)).length,
+        removed: currentKeys.filter(k => !(k in targetChildren)).length,
+        modified: currentKeys.filter(k => k in targetChildren && targetChildren[k] !== currentChildren[k]).length
+      };
+    });
+    return result;
+  }
+
+  // ----------------------------------------
+  // Intern
+  // ----------------------------------------
+
+  private get indexKey() { return `${this.prefix}:index`; }
+  private blobKey(hash: string) { return `${this.prefix}:blob:${hash}`; }
+
+  private build(value: unknown, depth: number): TreeNode {
+    if (isPlainObject(value) && (depth === 0 || isCollection(value) || Object.values(value).some(v => isPlainObject(v) && isCollection(v)))) {
+      const children: Record<string, TreeNode> = {};
+      const hashes: Record<string, string> = {};
+      let size = 2;
+      Object.keys(value).forEach(key => {
+        if (value[key] === undefined) return;
+        const child = this.build(value[key], depth + 1);
+        children[key] = child;
+        hashes[key] = child.hash;
+        size += child.size + key.length + 4;
+      });
+      const blob = TREE + JSON.stringify(hashes);
+      return { hash: hashString(blob), size, blob, children };
+    }
+    const memo = value && typeof value === 'object' ? this.leafMemo.get(value) : undefined;
+    if (memo) return { ...memo, value };
+    const blob = JSON.stringify(value === undefined ? null : value);
+    const node = { hash: hashString(blob), size: blob.length };
+    if (value && typeof value === 'object') this.leafMemo.set(value, node);
+    return { ...node, blob, value };
+  }
+
+  /** Takes a reference on `node`, writing it (and its new children) if not stored yet. */
+  private retain(node: TreeNode): void {
+    const count = this.refs.get(node.hash);
+    if (count) {
+      this.refs.set(node.hash, count + 1);
+      return;
+    }
+    if (node.children) Object.values(node.children).forEach(child => this.retain(child));
+    const blob = node.blob ?? JSON.stringify(node.value === undefined ? null : node.value);
+    this.write(this.blobKey(node.hash), blob);
+    this.refs.set(node.hash, 1);
+    this.sizes.set(node.hash, blob.length);
+    this.bytes += blob.length;
+  }
+
+  private release(hash: string): void {
+    const count = this.refs.get(hash);
+    if (!count) return;
+    if (count > 1) {
+      this.refs.set(hash, count - 1);
+      return;
+    }
+    const children = this.childHashes(hash);
+    this.storage().removeItem(this.blobKey(hash));
+    this.refs.delete(hash);
+    this.bytes -= this.sizes.get(hash) || 0;
+    this.sizes.delete(hash);
+    Object.values(children).forEach(child => this.release(child));
+  }
+
+  /** setItem that makes room when the quota is hit; throws once nothing is left to evict. */
+  private write(key: string, value: string): void {
+    for (;;) {
+      try {
+        this.storage().setItem(key, value);
+        return;
+      } catch (error) {
+        if (!this.makeRoom()) throw error;
+        this.writeIndex();
+      }
+    }
+  }
+
+  // Unreferenced blobs first, then the oldest snapshot
+  private makeRoom(): boolean {
+    return this.removeOrphans(this.storage()) > 0 || this.evictOldest();
+  }
+
+  private evictOldest(keepId?: string): boolean {
+    const oldest = this.index.snapshots.find(s => s.id !== keepId);
+    if (!oldest) return false;
+    console.log(`🧹 [SnapshotStore] Evicting ${oldest.id} (${this.prefix}, ${this.bytes} chars stored)`);
+    return this.dropManifest(oldest.id);
+  }
+
+  private dropManifest(id: string): boolean {
+    const at = this.index.snapshots.findIndex(s => s.id === id);
+    if (at === -1) return false;
+    const [manifest] = this.index.snapshots.splice(at, 1);
+    this.release(manifest.root);
+    return true;
+  }
+
+  private childHashes(hash: string): Record<string, string> {
+    const blob = this.storage().getItem(this.blobKey(hash));
+    return blob && blob.startsWith(TREE) ? JSON.parse(blob.slice(TREE.length)) : {};
+  }
+
+  private materialize(hash: string): any {
+    const blob = this.storage().getItem(this.blobKey(hash));
+    if (blob === null) throw new Error(`Snapshot data ${hash} missing`);
+    if (!blob.startsWith(TREE)) return JSON.parse(blob);
+    const hashes: Record<string, string> = JSON.parse(blob.slice(TREE.length));
+    const value: Record<string, unknown> = {};
+    Object.entries(hashes).forEach(([key, child]) => { value[key] = this.materialize(child); });
+    return value;
+  }
+
+  private writeIndex(): void {
+    for (;;) {
+      const serialized = JSON.stringify(this.index);
+      try {
+        this.storage().setItem(this.indexKey, serialized);
+        this.loadedIndex = serialized;
+        return;
+      } catch (error) {
+        if (!this.makeRoom()) throw error;
+      }
+    }
+  }
+
+  /**
+   * Reloads the index and reference counts if storage changed underneath
+   * (another tab, a cleared storage, a swapped storage object in tests).
+   */
+  private sync(): void {
+    const storage = this.storage();
+    const raw = storage.getItem(this.indexKey);
+    if (storage === this.loadedFrom && raw === this.loadedIndex) return;
+    this.loadedFrom = storage;
+    this.loadedIndex = raw;
+    this.refs.clear();
+    this.sizes.clear();
+    this.bytes = 0;
+    try {
+      this.index = raw ? JSON.parse(raw) : { version: 1, snapshots: [] };
+    } catch {
+      console.warn(`⚠️ [SnapshotStore] Unreadable index ${this.indexKey}, starting empty`);
+      this.index = { version: 1, snapshots: [] };
+    }
+    const missing = new Set<string>();
+    const count = (hash: string): boolean => {
+      const refs = this.refs.get(hash);
+      if (refs) {
+        this.refs.set(hash, refs + 1);
+        return true;
+      }
+      const blob = storage.getItem(this.blobKey(hash));
+      if (blob === null) {
+        missing.add(hash);
+        return false;
+      }
+      this.refs.set(hash, 1);
+      this.sizes.set(hash, blob.length);
+      this.bytes += blob.length;
+      if (!blob.startsWith(TREE)) return true;
+      const children: string[] = Object.values(JSON.parse(blob.slice(TREE.length)));
+      return children.map(count).every(Boolean);
+    };
+    // Snapshots whose data is incomplete (e.g. cleared by hand) cannot be restored
+    this.index.snapshots = this.index.snapshots.filter(manifest => {
+      if (count(manifest.root)) return true;
+      this.release(manifest.root);
+      return false;
+    });
+    this.removeOrphans(storage);
+  }
+
+  // Blobs no snapshot references, e.g. left behind by a closed tab mid-write
+  private removeOrphans(storage: StorageLike): number {
+    if (typeof storage.key !== 'function' || typeof storage.length !== 'number') return 0;
+    const blobPrefix = `${this.prefix}:blob:`;
+    const orphans: string[] = [];
+    for (let i = 0; i < storage.length; i++) {
+      const key = storage.key(i);
+      if (key && key.startsWith(blobPrefix) && !this.refs.has(key.slice(blobPrefix.length))) orphans.push(key);
+    }
+    orphans.forEach(key => storage.removeItem(key));
+    return orphans.length;
+  }
+}
+
+// ========================================
+// SEGMENTIERTES EVENT-LOG
+// ========================================
+
+interface SegmentInfo {
+  first: number;
+  last: number;
+}
+
+/**
+ * Append-only list in Web Storage, split into segments of `segmentSize`
+ * entries under `<prefix>:seg:<n>`. Appending rewrites only the last
+ * segment; trimming drops whole segments from the front.
+ *
+ * When the storage quota is hit, the oldest segments are dropped until the
+ * write fits and returned to the caller, like `trim()` does. If only the
+ * segment being written is left, the write throws and the log is unchanged.
+ */
+export class SegmentedLog<T> {
+  private readonly prefix: string;
+  private readonly segmentSize: number;
+  private readonly storage: () => StorageLike;
+  private segments: T[][] = [];
+  private first = 0;
+
+  constructor(options: { prefix: string; segmentSize?: number; storage?: () => StorageLike }) {
+    this.prefix = options.prefix;
+    this.segmentSize = options.segmentSize || 100;
+    this.storage = options.storage || (() => localStorage);
+    this.load();
+  }
+
+  get length(): number {
+    return this.segments.reduce((sum, segment) => sum + segment.length, 0);
+  }
+
+  items(): T[] {
+    return ([] as T[]).concat(...this.segments);
+  }
+
+  /** Appends `item`; returns the oldest entries dropped to make room (usually none). */
+  append(item: T): T[] {
+    let tail = this.segments[this.segments.length - 1];
+    const opened = !tail || tail.length >= this.segmentSize;
+    if (opened) {
+      tail = [];
+      this.segments.push(tail);
+    }
+    tail.push(item);
+    try {
+      return this.withRoom(() => {
+        this.writeSegment(this.segments.length - 1);
+        if (opened) this.writeInfo();
+      });
+    } catch (error) {
+      tail.pop();
+      if (opened) this.segments.pop();
+      throw error;
+    }
+  }
+
+  /** Drops the oldest segments while at least `maxItems` entries remain; returns the dropped entries. */
+  trim(maxItems: number): T[] {
+    const dropped: T[] = [];
+    while (this.segments.length > 1 && this.length - this.segments[0].length >= maxItems) {
+      dropped.push(...this.dropOldest());
+    }
+    if (dropped.length > 0) dropped.push(...this.withRoom(() => this.writeInfo()));
+    return dropped;
+  }
+
+  /** Rewrites the whole log (for deletions and migrations); returns entries dropped for room. */
+  replace(items: T[]): T[] {
+    this.clear();
+    const dropped: T[] = [];
+    for (let i = 0; i < items.length; i += this.segmentSize) {
+      this.segments.push(items.slice(i, i + this.segmentSize));
+      try {
+        dropped.push(...this.withRoom(() => this.writeSegment(this.segments.length - 1)));
+      } catch (error) {
+        this.segments.pop();
+        this.clear();
+        throw error;
+      }
+    }
+    dropped.push(...this.withRoom(() => this.writeInfo()));
+    return dropped;
+  }
+
+  clear(): void {
+    this.segments.forEach((_, i) => this.storage().removeItem(this.segmentKey(this.first + i)));
+    this.storage().removeItem(`${this.prefix}:segments`);
+    this.segments = [];
+    this.first = 0;
+  }
+
+  private segmentKey(n: number) { return `${this.prefix}:seg:${n}`; }
+
+  private writeSegment(i: number): void {
+    this.storage().setItem(this.segmentKey(this.first + i), JSON.stringify(this.segments[i]));
+  }
+
+  private writeInfo(): void {
+    const info: SegmentInfo = { first: this.first, last: this.first + this.segments.length - 1 };
+    this.storage().setItem(`${this.prefix}:segments`, JSON.stringify(info));
+  }
+
+  /** Runs `write`, dropping the oldest segments (never the last one) while it fails. */
+  private withRoom(write: () => void): T[] {
+    const dropped: T[] = [];
+    for (;;) {
+      try {
+        write();
+        if (dropped.length > 0) this.writeInfo();
+        return dropped;
+      } catch (error) {
+        if (this.segments.length < 2) throw error;
+        console.warn(`⚠️ [SegmentedLog] Storage full, dropping ${this.segments[0].length} oldest entries of ${this.prefix}`);
+        dropped.push(...this.dropOldest());
+      }
+    }
+  }
+
+  private dropOldest(): T[] {
+    const segment = this.segments.shift()!;
+    this.storage().removeItem(this.segmentKey(this.first));
+    this.first++;
+    return segment;
+  }
+
+  private load(): void {
+    try {
+      const raw = this.storage().getItem(`${this.prefix}:segments`);
+      if (!raw) return;
+      const info: SegmentInfo = JSON.parse(raw);
+      this.first = info.first;
+      for (let n = info.first; n <= info.last; n++) {
+        const segment = this.storage().getItem(this.segmentKey(n));
+        this.segments.push(segment ? JSON.parse(segment) : []);
+      }
+    } catch (error) {
+      console.warn(`⚠️ [SegmentedLog] Unreadable log ${this.prefix}, starting empty:`, error);
+      this.segments = [];
+      this.first = 0;
+    }
+  }
+}
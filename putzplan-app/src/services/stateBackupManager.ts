@@ -1,6 +1,8 @@
 // Universal State Backup & Restore Manager
 // Speichert alle State-Änderungen für vollständige Wiederherstellbarkeit
 
+import { SnapshotStore } from './snapshotStore';
+
 export interface StateSnapshot {
   id: string;
   timestamp: string;
@@ -23,10 +25,22 @@ export interface StateBackupData {
   version: string;
 }
 
+const INDEX_VERSION = '2.0.0';
+
+// Fields holding entity or state copies; stored content-addressed, not in the index
+const PAYLOAD_FIELDS = ['data', 'beforeState', 'afterState'];
+
+/**
+ * Der Index unter `storageKey` enthält nur die Kopfdaten der Snapshots; die
+ * Payloads liegen in einem SnapshotStore (pro Snapshot-ID), sodass z.B. ein
+ * Full-State-Backup alle unveränderten Datensätze mit früheren Backups teilt.
+ * Fällt eine Payload dem Speicherbudget zum Opfer, verschwindet ihr Eintrag.
+ */
 class StateBackupManager {
   private storageKey = 'putzplan-state-backups';
   private maxSnapshots = 100; // Limit to prevent storage overflow
-  
+  private payloads = new SnapshotStore({ prefix: 'putzplan-state-backups', maxBytes: 1_000_000 });
+
   constructor() {
     console.log('🔄 [StateBackup] Manager initialized');
   }
@@ -42,23 +56,27 @@ class StateBackupManager {
     };
 
     try {
-      const backups = this.loadBackups();
-      backups.snapshots.push(snapshot);
-      
+      const backups = this.loadIndex();
+      if (!this.storePayload(snapshot)) return '';
+      backups.snapshots.push(this.header(snapshot));
+
       // Keep only recent snapshots
       if (backups.snapshots.length > this.maxSnapshots) {
         backups.snapshots = backups.snapshots.slice(-this.maxSnapshots);
       }
-      
+
       backups.lastBackupAt = new Date().toISOString();
-      
-      localStorage.setItem(this.storageKey, JSON.stringify(backups));
-      
+
+      if (!this.saveBackups(backups)) {
+        this.payloads.remove(snapshot.id);
+        return '';
+      }
+
       console.log(`💾 [StateBackup] Saved ${change.type} for ${change.entity}:${change.entityId}`, {
         description: change.description,
         snapshotId: snapshot.id
       });
-      
+
       return snapshot.id;
     } catch (error) {
       console.error('❌ [StateBackup] Failed to save state change:', error);
@@ -67,65 +85,130 @@ class StateBackupManager {
   }
 
   /**
-   * Speichert die Backup-Daten in localStorage
+   * Speichert den Index in localStorage und entfernt Payloads ohne Eintrag.
+   * Ist der Speicher voll, werden die ältesten Backups verworfen, bis der
+   * Index passt; `false`, wenn er selbst mit nur einem Eintrag nicht passt.
    */
-  private saveBackups(backups: StateBackupData): void {
-    try {
-      const serialized = JSON.stringify(backups);
-      localStorage.setItem(this.storageKey, serialized);
-      console.log(`💾 [StateBackup] Backups saved (${backups.snapshots.length} snapshots, ${serialized.length} bytes)`);
-    } catch (error) {
-      console.error('❌ [StateBackup] Failed to save backups:', error);
+  private saveBackups(backups: StateBackupData): boolean {
+    for (;;) {
+      try {
+        const ids = new Set(backups.snapshots.map(s => s.id));
+        this.payloads.list().forEach(manifest => {
+          if (!ids.has(manifest.id)) this.payloads.remove(manifest.id);
+        });
+        const serialized = JSON.stringify({ ...backups, version: INDEX_VERSION });
+        localStorage.setItem(this.storageKey, serialized);
+        console.log(`💾 [StateBackup] Backups saved (${backups.snapshots.length} snapshots, ${serialized.length + this.payloads.storedBytes} bytes)`);
+        return true;
+      } catch (error) {
+        if (backups.snapshots.length <= 1) {
+          console.error('❌ [StateBackup] Failed to save backups:', error);
+          return false;
+        }
+        const [oldest] = backups.snapshots.splice(0, 1);
+        console.warn(`⚠️ [StateBackup] Storage full, dropping oldest backup ${oldest.id}`);
+      }
     }
   }
 
   /**
-   * Lädt alle gespeicherten State-Backups
+   * Lädt alle gespeicherten State-Backups (inklusive Payloads)
    */
   loadBackups(): StateBackupData {
+    const backups = this.loadIndex();
+    return { ...backups, snapshots: backups.snapshots.map(header => this.withPayload(header)) };
+  }
+
+  /**
+   * Lädt nur die Kopfdaten (ohne Payloads)
+   */
+  private loadIndex(): StateBackupData {
     try {
       const stored = localStorage.getItem(this.storageKey);
       if (!stored) {
         return {
           snapshots: [],
           lastBackupAt: new Date().toISOString(),
-          version: '1.0.0'
+          version: INDEX_VERSION
         };
       }
-      
-      const backups = JSON.parse(stored);
+
+      const backups: StateBackupData = JSON.parse(stored);
+      if (backups.version !== INDEX_VERSION) return this.migrate(backups);
+      const storedIds = new Set(this.payloads.list().map(manifest => manifest.id));
+      backups.snapshots = backups.snapshots.filter(s => storedIds.has(s.id));
       return backups;
     } catch (error) {
       console.error('❌ [StateBackup] Failed to load backups:', error);
       return {
         snapshots: [],
         lastBackupAt: new Date().toISOString(),
-        version: '1.0.0'
+        version: INDEX_VERSION
       };
     }
   }
 
+  /**
+   * Übernimmt Backups aus Version 1 (alle Payloads inline unter einem Key).
+   * `legacy` ist bereits geparst; der alte Key wird vor dem Schreiben
+   * entfernt, damit die Payloads den Platz des alten Blobs nutzen können.
+   */
+  private migrate(legacy: StateBackupData): StateBackupData {
+    localStorage.removeItem(this.storageKey);
+    const backups: StateBackupData = {
+      snapshots: [],
+      lastBackupAt: legacy.lastBackupAt || new Date().toISOString(),
+      version: INDEX_VERSION
+    };
+    (legacy.snapshots || []).forEach(snapshot => {
+      if (this.storePayload(snapshot)) backups.snapshots.push(this.header(snapshot));
+    });
+    this.saveBackups(backups);
+    console.log(`🔄 [StateBackup] Migrated ${backups.snapshots.length} backups to content-addressed storage`);
+    return backups;
+  }
+
+  private storePayload(snapshot: StateSnapshot): boolean {
+    const payload: Record<string, unknown> = {};
+    PAYLOAD_FIELDS.forEach(field => {
+      const value = (snapshot as any)[field];
+      if (value !== undefined) payload[field] = value;
+    });
+    return this.payloads.put(snapshot.id, payload, {}, Date.parse(snapshot.timestamp) || Date.now()) !== null;
+  }
+
+  private header(snapshot: StateSnapshot): StateSnapshot {
+    const header: any = { ...snapshot };
+    PAYLOAD_FIELDS.forEach(field => { delete header[field]; });
+    return header;
+  }
+
+  private withPayload(header: StateSnapshot): StateSnapshot {
+    return { ...header, ...this.payloads.get(header.id) };
+  }
+
   /**
    * Gibt alle Snapshots für eine bestimmte Entity zurück
    */
   getSnapshotsForEntity(entity: string, entityId?: string): StateSnapshot[] {
-    const backups = this.loadBackups();
-    return backups.snapshots.filter(s => 
+    const backups = this.loadIndex();
+    return backups.snapshots.filter(s =>
       s.entity === entity && (!entityId || s.entityId === entityId)
-    ).sort((a, b) => new Date(b.timestamp).getTime() - new Date(a.timestamp).getTime());
+    ).sort((a, b) => new Date(b.timestamp).getTime() - new Date(a.timestamp).getTime())
+      .map(header => this.withPayload(header));
   }
 
   /**
    * Stellt einen bestimmten State-Snapshot wieder her
    */
   restoreSnapshot(snapshotId: string): StateSnapshot | null {
-    const backups = this.loadBackups();
-    const snapshot = backups.snapshots.find(s => s.id === snapshotId);
-    
-    if (!snapshot) {
+    const header = this.loadIndex().snapshots.find(s => s.id === snapshotId);
+
+    if (!header) {
       console.error(`❌ [StateBackup] Snapshot not found: ${snapshotId}`);
       return null;
     }
+    const snapshot = this.withPayload(header);
 
     console.log(`🔄 [StateBackup] Restoring snapshot: ${snapshot.description}`, {
       type: snapshot.type,
@@ -141,22 +224,22 @@ class StateBackupManager {
    * Löscht alte Snapshots (für Performance)
    */
   cleanupOldSnapshots(olderThanDays: number = 30): number {
-    const backups = this.loadBackups();
+    const backups = this.loadIndex();
     const cutoffDate = new Date();
     cutoffDate.setDate(cutoffDate.getDate() - olderThanDays);
-    
+
     const originalCount = backups.snapshots.length;
-    backups.snapshots = backups.snapshots.filter(s => 
+    backups.snapshots = backups.snapshots.filter(s =>
       new Date(s.timestamp) > cutoffDate
     );
-    
+
     const deletedCount = originalCount - backups.snapshots.length;
-    
+
     if (deletedCount > 0) {
-      localStorage.setItem(this.storageKey, JSON.stringify(backups));
+      this.saveBackups(backups);
       console.log(`🧹 [StateBackup] Cleaned up ${deletedCount} old snapshots`);
     }
-    
+
     return deletedCount;
   }
 
@@ -195,21 +278,21 @@ class StateBackupManager {
     newestBackup: string | null;
     storageSize: number;
   } {
-    const backups = this.loadBackups();
-    
+    const backups = this.loadIndex();
+
     const entitiesByType: Record<string, number> = {};
     backups.snapshots.forEach(s => {
       entitiesByType[s.entity] = (entitiesByType[s.entity] || 0) + 1;
     });
-    
+
     const timestamps = backups.snapshots.map(s => s.timestamp).sort();
-    
+
     return {
       totalSnapshots: backups.snapshots.length,
       entitiesByType,
       oldestBackup: timestamps[0] || null,
       newestBackup: timestamps[timestamps.length - 1] || null,
-      storageSize: JSON.stringify(backups).length
+      storageSize: JSON.stringify(backups).length + this.payloads.storedBytes
     };
   }
 
@@ -217,21 +300,21 @@ class StateBackupManager {
    * Bereinigt alte Backups basierend auf Alter (in Millisekunden)
    */
   cleanup(maxAge: number = 7 * 24 * 60 * 60 * 1000): number { // Default: 7 Tage
-    const backups = this.loadBackups();
+    const backups = this.loadIndex();
     const cutoffTime = new Date(Date.now() - maxAge);
-    
+
     const initialCount = backups.snapshots.length;
-    backups.snapshots = backups.snapshots.filter(s => 
+    backups.snapshots = backups.snapshots.filter(s =>
       new Date(s.timestamp) > cutoffTime
     );
-    
+
     const removedCount = initialCount - backups.snapshots.length;
-    
+
     if (removedCount > 0) {
       this.saveBackups(backups);
       console.log(`🧹 [StateBackup] Cleaned up ${removedCount} old backups (older than ${new Date(cutoffTime).toLocaleString()})`);
     }
-    
+
     return removedCount;
   }
 
@@ -239,13 +322,13 @@ class StateBackupManager {
    * Löscht alle Backups (für Tests und Reset)
    */
   clearAll(): void {
-    const emptyBackups: BackupData = {
+    const emptyBackups: StateBackupData = {
       snapshots: [],
-      metadata: {
-        version: '1.0.0'
-      }
+      lastBackupAt: new Date().toISOString(),
+      version: INDEX_VERSION
     };
-    
+
+    this.payloads.clear();
     this.saveBackups(emptyBackups);
     console.log('🗑️ [StateBackup] All backups cleared');
   }
@@ -260,4 +343,4 @@ class StateBackupManager {
 }
 
 // Singleton instance
-export const stateBackupManager = new StateBackupManager();
\ No newline at end of file
+export const stateBackupManager = new StateBackupManager();
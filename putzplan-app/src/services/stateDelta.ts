@@ -0,0 +1,113 @@
+import { AppState } from '../types';
+
+// ========================================
+// STATE-DELTAS FÜR DEN SERVER-SYNC
+// ========================================
+
+/**
+ * One change to the persisted state: `path` is `[key]` for a top-level field
+ * or `[collection, id]` for a single entity. `delete: true` removes the entry,
+ * otherwise it is replaced by `value`. Applied in order by server/dataStore.js.
+ */
+export interface DeltaOp {
+  path: string[];
+  value?: unknown;
+  delete?: true;
+}
+
+/** Keyed entity maps that are diffed record by record instead of as a whole. */
+export const ENTITY_COLLECTIONS = [
+  'wgs', 'users', 'tasks', 'executions', 'ratings', 'notifications',
+  'monthlyStats', 'absences', 'temporaryResidents', 'postExecutionRatings'
+] as const;
+
+const isCollection = (key: string) => (ENTITY_COLLECTIONS as readonly string[]).includes(key);
+
+/**
+ * Shallow copy of `state` with each entity map copied as well, so later
+ * in-place writes (`state.tasks[id] = ...`) do not leak into the baseline
+ * that `diffState` compares against.
+ */
+export const captureState = (state: AppState): AppState => {
+  const copy: any = { ...state };
+  ENTITY_COLLECTIONS.forEach(key => {
+    if (copy[key] && typeof copy[key] === 'object') copy[key] = { ...copy[key] };
+  });
+  return copy;
+};
+
+/**
+ * Ops that turn `prev` into `next`. Entities and top-level fields are compared
+ * by reference, which matches how the data managers write: every update puts
+ * a new object under its id.
+ */
+export const diffState = (prev: AppState, next: AppState): DeltaOp[] => {
+  const ops: DeltaOp[] = [];
+  const before: any = prev;
+  const after: any = next;
+
+  Object.keys(before).forEach(key => {
+    if (!(key in after)) ops.push({ path: [key], delete: true });
+  });
+  Object.keys(after).forEach(key => {
+    const a = before[key];
+    const b = after[key];
+    if (a === b) return;
+    if (!isCollection(key) || !a || !b || typeof a !== 'object' || typeof b !== 'object') {
+      ops.push(b === undefined ? { path: [key], delete: true } : { path: [key], value: b });
+      return;
+    }
+    Object.keys(a).forEach(id => {
+      if (!(id in b)) ops.push({ path: [key, id], delete: true });
+    });
+    Object.keys(b).forEach(id => {
+      if (a[id] === b[id]) return;
+      ops.push(b[id] === undefined ? { path: [key, id], delete: true } : { path: [key, id], value: b[id] });
+    });
+  });
+  return ops;
+};
+
+/** Value at `path` in `state` (undefined if any level is missing). */
+export const getAtPath = (state: unknown, path: string[]): unknown => {
+  let target: any = state;
+  for (const key of path) {
+    if (!target || typeof target !== 'object') return undefined;
+    target = target[key];
+  }
+  return target;
+};
+
+/**
+ * Applies `ops` without mutating `state`: every object along a written path
+ * is copied once, everything else is shared with the input.
+ */
+export const applyDelta = <T extends object>(state: T, ops: DeltaOp[]): T => {
+  const next: any = { ...state };
+  const copied = new Set<string>();
+  ops.forEach(op => {
+    let target = next;
+    for (let i = 0; i < op.path.length - 1; i++) {
+      const key = op.path[i];
+      const prefix = op.path.slice(0, i + 1).join('\u0000');
+      const child = target[key];
+      if (!child || typeof child !== 'object') {
+        if (op.delete) return;
+        target[key] = {};
+      } else if (!copied.has(prefix)) {
+        target[key] = Array.isArray(child) ? [...child] : { ...child };
+      }
+      copied.add(prefix);
+      target = target[key];
+    }
+    const last = op.path[op.path.length - 1];
+    if (op.delete) delete target[last];
+    else target[last] = op.value;
+    // A replaced subtree is not one of our copies any more
+    const written = op.path.join('\u0000');
+    copied.forEach(prefix => {
+      if (prefix === written || prefix.startsWith(written + '\u0000')) copied.delete(prefix);
+    });
+  });
+  return next;
+};
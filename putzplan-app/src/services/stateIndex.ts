@@ -0,0 +1,278 @@
+import { AppState, Task, TaskExecution, TaskRating } from '../types';
+
+// ========================================
+// SEKUNDÄRINDIZES FÜR DEN APP-STATE
+// ========================================
+
+type Keyed<T> = Record<string, T>;
+
+/** Above this many changed records a full rebuild is cheaper than patching. */
+const REBUILD_THRESHOLD = 256;
+
+const addTo = (map: Map<string, Set<string>>, key: string | undefined | null, id: string) => {
+  if (key === undefined || key === null) return;
+  let set = map.get(key);
+  if (!set) { set = new Set(); map.set(key, set); }
+  set.add(id);
+};
+
+const removeFrom = (map: Map<string, Set<string>>, key: string | undefined | null, id: string) => {
+  if (key === undefined || key === null) return;
+  const set = map.get(key);
+  if (!set) return;
+  set.delete(id);
+  if (set.size === 0) map.delete(key);
+};
+
+/** Timestamp used for date-range filtering; mirrors `new Date(e.date || e.executedAt)`. */
+export const executionTime = (execution: any): number => {
+  const raw = execution?.date || execution?.executedAt;
+  if (raw instanceof Date) return raw.getTime();
+  return raw === undefined || raw === null ? NaN : new Date(raw).getTime();
+};
+
+/** Index of the first element in the sorted `times` array that is >= `time`. */
+const lowerBound = (times: number[], time: number): number => {
+  let lo = 0;
+  let hi = times.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1;
+    if (times[mid] < time) lo = mid + 1; else hi = mid;
+  }
+  return lo;
+};
+
+/**
+ * Secondary indexes over `tasks`, `executions` and `ratings`.
+ *
+ * The index remembers which collection objects it was built from. `sync()`
+ * compares references and, for a changed collection, diffs the old against
+ * the new map and patches only the records that differ — DataManager already
+ * copies a collection on every write, so this keeps index maintenance at the
+ * cost of the write itself. Queries return records in the same order as the
+ * underlying map so callers see the same result as a `filter()` would give.
+ */
+export class StateIndex {
+  private tasksRef: Keyed<Task> | null = null;
+  private executionsRef: Keyed<TaskExecution> | null = null;
+  private ratingsRef: Keyed<TaskRating> | null = null;
+
+  private tasksByWg = new Map<string, Set<string>>();
+  private executionsByTask = new Map<string, Set<string>>();
+  private executionsByUser = new Map<string, Set<string>>();
+  private executionsByPeriod = new Map<string, Set<string>>();
+  private ratingsByTask = new Map<string, Set<string>>();
+  private ratingsByUser = new Map<string, Set<string>>();
+
+  // Position of each id in its collection (object key order) for stable results
+  private taskSeq = new Map<string, number>();
+  private executionSeq = new Map<string, number>();
+  private ratingSeq = new Map<string, number>();
+  private nextSeq = 0;
+
+  // Timeline: parallel arrays sorted by time
+  private executionTimes = new Map<string, number>();
+  private timelineTimes: number[] = [];
+  private timelineIds: string[] = [];
+  private timelineDirty = false;
+
+  /** Brings all indexes up to date with `state`; returns `this` for chaining. */
+  sync(state: Pick<AppState, 'tasks' | 'executions' | 'ratings'>): this {
+    const tasks = state.tasks || {};
+    if (tasks !== this.tasksRef) {
+      this.patch(this.tasksRef, tasks, this.taskSeq,
+        () => this.tasksByWg.clear(),
+        (id, t) => addTo(this.tasksByWg, t?.wgId, id),
+        (id, t) => removeFrom(this.tasksByWg, t?.wgId, id));
+      this.tasksRef = tasks;
+    }
+
+    const executions = state.executions || {};
+    if (executions !== this.executionsRef) {
+      this.patch(this.executionsRef, executions, this.executionSeq,
+        () => this.resetExecutions(),
+        (id, e) => this.addExecution(id, e),
+        (id, e) => this.removeExecution(id, e));
+      this.executionsRef = executions;
+      if (this.timelineDirty) this.rebuildTimeline();
+    }
+
+    const ratings = state.ratings || {};
+    if (ratings !== this.ratingsRef) {
+      this.patch(this.ratingsRef, ratings, this.ratingSeq,
+        () => { this.ratingsByTask.clear(); this.ratingsByUser.clear(); },
+        (id, r) => { addTo(this.ratingsByTask, r?.taskId, id); addTo(this.ratingsByUser, r?.userId, id); },
+        (id, r) => { removeFrom(this.ratingsByTask, r?.taskId, id); removeFrom(this.ratingsByUser, r?.userId, id); });
+      this.ratingsRef = ratings;
+    }
+    return this;
+  }
+
+  // ----------------------------------------
+  // Queries (call sync() first)
+  // ----------------------------------------
+
+  tasksForWg(wgId: string): Task[] {
+    return this.ordered(this.tasksRef, this.taskSeq, this.tasksByWg.get(wgId));
+  }
+
+  ratingsForTask(taskId: string): TaskRating[] {
+    return this.ordered(this.ratingsRef, this.ratingSeq, this.ratingsByTask.get(taskId));
+  }
+
+  ratingsForUser(userId: string): TaskRating[] {
+    return this.ordered(this.ratingsRef, this.ratingSeq, this.ratingsByUser.get(userId));
+  }
+
+  executionsForTask(taskId: string): TaskExecution[] {
+    return this.ordered(this.executionsRef, this.executionSeq, this.executionsByTask.get(taskId));
+  }
+
+  executionsForUser(userId: string): TaskExecution[] {
+    return this.ordered(this.executionsRef, this.executionSeq, this.executionsByUser.get(userId));
+  }
+
+  /** Executions explicitly tagged with `periodId`. */
+  executionsForPeriod(periodId: string): TaskExecution[] {
+    return this.ordered(this.executionsRef, this.executionSeq, this.executionsByPeriod.get(periodId));
+  }
+
+  /** Executions of all tasks that currently belong to `wgId`. */
+  executionsForWg(wgId: string): TaskExecution[] {
+    const ids: string[] = [];
+    this.tasksByWg.get(wgId)?.forEach(taskId => {
+      this.executionsByTask.get(taskId)?.forEach(id => ids.push(id));
+    });
+    return this.ordered(this.executionsRef, this.executionSeq, ids);
+  }
+
+  /** Executions whose `date || executedAt` lies within [start, end] (inclusive). */
+  executionsBetween(start: number, end: number): TaskExecution[] {
+    const ids: string[] = [];
+    for (let i = lowerBound(this.timelineTimes, start); i < this.timelineTimes.length && this.timelineTimes[i] <= end; i++) {
+      ids.push(this.timelineIds[i]);
+    }
+    return this.ordered(this.executionsRef, this.executionSeq, ids);
+  }
+
+  /**
+   * Executions belonging to a period: tagged with `periodId`, or untagged with
+   * a timestamp inside [start, end]. Same rules as the legacy filter in
+   * DataManager.getDisplayPeriodExecutions.
+   */
+  executionsInPeriod(periodId: string, start: number, end: number): TaskExecution[] {
+    const executions = this.executionsRef || {};
+    const ids = Array.from(this.executionsByPeriod.get(periodId) || []);
+    for (let i = lowerBound(this.timelineTimes, start); i < this.timelineTimes.length && this.timelineTimes[i] <= end; i++) {
+      const id = this.timelineIds[i];
+      const periodTag = (executions[id] as any)?.periodId;
+      if (periodTag === undefined || periodTag === null) ids.push(id);
+    }
+    return this.ordered(this.executionsRef, this.executionSeq, ids);
+  }
+
+  // ----------------------------------------
+  // Maintenance
+  // ----------------------------------------
+
+  private patch<T>(
+    prev: Keyed<T> | null,
+    next: Keyed<T>,
+    seq: Map<string, number>,
+    reset: () => void,
+    add: (id: string, value: T) => void,
+    remove: (id: string, value: T) => void
+  ): void {
+    if (prev) {
+      let changes = 0;
+      for (const id in prev) {
+        if (!(id in next)) {
+          if (++changes > REBUILD_THRESHOLD) break;
+          remove(id, prev[id]);
+          seq.delete(id);
+        }
+      }
+      if (changes <= REBUILD_THRESHOLD) {
+        for (const id in next) {
+          const before = prev[id];
+          const after = next[id];
+          if (before === after) continue;
+          if (++changes > REBUILD_THRESHOLD) break;
+          // A replaced record keeps its key position; a new key is appended
+          if (before !== undefined) remove(id, before);
+          else seq.set(id, this.nextSeq++);
+          add(id, after);
+        }
+      }
+      if (changes <= REBUILD_THRESHOLD) return;
+    }
+    reset();
+    seq.clear();
+    for (const id in next) {
+      seq.set(id, this.nextSeq++);
+      add(id, next[id]);
+    }
+  }
+
+  private resetExecutions(): void {
+    this.executionsByTask.clear();
+    this.executionsByUser.clear();
+    this.executionsByPeriod.clear();
+    this.executionTimes.clear();
+    this.timelineTimes = [];
+    this.timelineIds = [];
+    this.timelineDirty = true;
+  }
+
+  private addExecution(id: string, e: TaskExecution): void {
+    addTo(this.executionsByTask, e?.taskId, id);
+    addTo(this.executionsByUser, e?.executedBy, id);
+    addTo(this.executionsByPeriod, (e as any)?.periodId, id);
+
+    const time = executionTime(e);
+    if (Number.isNaN(time)) return;
+    this.executionTimes.set(id, time);
+    if (this.timelineDirty) return;
+    const at = lowerBound(this.timelineTimes, time);
+    this.timelineTimes.splice(at, 0, time);
+    this.timelineIds.splice(at, 0, id);
+  }
+
+  private removeExecution(id: string, e: TaskExecution): void {
+    removeFrom(this.executionsByTask, e?.taskId, id);
+    removeFrom(this.executionsByUser, e?.executedBy, id);
+    removeFrom(this.executionsByPeriod, (e as any)?.periodId, id);
+
+    const time = this.executionTimes.get(id);
+    if (time === undefined) return;
+    this.executionTimes.delete(id);
+    if (this.timelineDirty) return;
+    for (let i = lowerBound(this.timelineTimes, time); i < this.timelineTimes.length && this.timelineTimes[i] === time; i++) {
+      if (this.timelineIds[i] === id) {
+        this.timelineTimes.splice(i, 1);
+        this.timelineIds.splice(i, 1);
+        break;
+      }
+    }
+  }
+
+  private rebuildTimeline(): void {
+    const entries = Array.from(this.executionTimes.entries()).sort((a, b) => a[1] - b[1]);
+    this.timelineIds = entries.map(([id]) => id);
+    this.timelineTimes = entries.map(([, time]) => time);
+    this.timelineDirty = false;
+  }
+
+  private ordered<T>(source: Keyed<T> | null, seq: Map<string, number>, ids: Iterable<string> | undefined): T[] {
+    if (!source || !ids) return [];
+    const keyed: Array<[number, string]> = [];
+    for (const id of ids) keyed.push([seq.get(id) ?? 0, id]);
+    keyed.sort((a, b) => a[0] - b[0]);
+    const out: T[] = [];
+    for (const [, id] of keyed) {
+      const value = source[id];
+      if (value !== undefined) out.push(value);
+    }
+    return out;
+  }
+}
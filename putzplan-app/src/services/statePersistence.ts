@@ -0,0 +1,243 @@
+import { AppState } from '../types';
+
+// ========================================
+// DELTA-PERSISTENZ FÜR DEN APP-STATE
+// ========================================
+
+/**
+ * Entity collections stored under their own localStorage key
+ * (`<baseKey>:<entity>`). Everything else in AppState is small and lives in
+ * the main record under `<baseKey>`.
+ */
+export const PERSISTED_ENTITIES = ['users', 'wgs', 'tasks', 'executions', 'ratings'] as const;
+export type PersistedEntity = typeof PERSISTED_ENTITIES[number];
+
+export const SPLIT_LAYOUT = 'split';
+
+const PERIOD_LISTS = ['periods', 'historicalPeriods'] as const;
+
+interface SnapshotRef { $snapshot: string }
+interface EntityRef { $ref: PersistedEntity; id: string }
+
+const isSnapshotRef = (v: any): v is SnapshotRef => !!v && typeof v === 'object' && typeof v.$snapshot === 'string';
+const isEntityRef = (v: any): v is EntityRef => !!v && typeof v === 'object' && typeof v.$ref === 'string' && typeof v.id === 'string';
+
+/**
+ * Persists AppState as a set of keys and only rewrites what changed.
+ *
+ * - A collection is re-serialized only when its object reference differs from
+ *   the one last written (DataManager always replaces collections immutably).
+ * - `savedState` snapshots of WG periods are stored under their own keys and
+ *   written once per snapshot object; after loading they are hydrated lazily on
+ *   first access instead of being parsed at startup.
+ * - `currentWG` / `currentUser` are stored as references into `wgs` / `users`
+ *   when they are the same object.
+ *
+ * Data in the legacy single-key layout is read transparently and migrated on
+ * the next save.
+ */
+export class StatePersistence {
+  private written = new Map<PersistedEntity, unknown>();
+  private snapshotKeys = new Set<string>();
+  private writtenSnapshots = new WeakMap<object, string>();
+  private lazySnapshots = new WeakMap<object, string>();
+
+  constructor(private storage: Storage, private baseKey: string) {}
+
+  entityKey(entity: PersistedEntity): string {
+    return `${this.baseKey}:${entity}`;
+  }
+
+  /**
+   * Reads the main record and, for the split layout, merges the entity keys
+   * back into `record.state`. Returns null if nothing is stored. Throws on
+   * corrupt JSON like `JSON.parse` does.
+   */
+  read(): { version?: string; layout?: string; state?: any; [key: string]: any } | null {
+    this.forget();
+    const stored = this.storage.getItem(this.baseKey);
+    if (!stored) return null;
+    const data = JSON.parse(stored);
+    if (data && data.layout === SPLIT_LAYOUT && data.state) {
+      for (const entity of PERSISTED_ENTITIES) {
+        const raw = this.storage.getItem(this.entityKey(entity));
+        data.state[entity] = raw ? JSON.parse(raw) : {};
+      }
+    }
+    return data;
+  }
+
+  /**
+   * Finishes loading a state returned by `read()` after its dates have been
+   * deserialized: resolves entity references, installs lazy snapshot getters
+   * and records which collections storage already holds.
+   */
+  attach(state: any, layout: string | undefined, deserialize: (raw: any) => any): void {
+    this.forget();
+    if (layout !== SPLIT_LAYOUT || !state) return;
+
+    for (const field of ['currentWG', 'currentUser'] as const) {
+      const ref = state[field];
+      if (isEntityRef(ref)) state[field] = (state[ref.$ref] || {})[ref.id] || null;
+    }
+    Object.values(state.wgs || {}).forEach((wg: any) => {
+      PERIOD_LISTS.forEach(list => {
+        (Array.isArray(wg?.[list]) ? wg[list] : []).forEach((period: any) => {
+          if (period && isSnapshotRef(period.savedState)) {
+            this.installLazySnapshot(period, period.savedState.$snapshot, deserialize);
+          }
+        });
+      });
+    });
+    PERSISTED_ENTITIES.forEach(entity => this.written.set(entity, state[entity]));
+  }
+
+  /**
+   * Writes all dirty collections plus the main record. Returns the keys that
+   * were written so callers can log or assert on them.
+   */
+  save(state: AppState, record: Record<string, unknown>): string[] {
+    // Storage wiped behind our back (e.g. localStorage.clear()): rewrite everything
+    if (this.written.size > 0 && this.storage.getItem(this.baseKey) === null) this.forget();
+
+    const writtenKeys: string[] = [];
+    for (const entity of PERSISTED_ENTITIES) {
+      const value = (state as any)[entity] || {};
+      if (this.written.get(entity) === value) continue;
+      const json = entity === 'wgs' ? this.serializeWgs(value, writtenKeys) : JSON.stringify(value);
+      this.storage.setItem(this.entityKey(entity), json);
+      this.written.set(entity, value);
+      writtenKeys.push(this.entityKey(entity));
+    }
+
+    const meta: Record<string, unknown> = { ...state };
+    PERSISTED_ENTITIES.forEach(entity => { delete meta[entity]; });
+    meta.currentWG = this.toRef('wgs', state.currentWG, state.wgs);
+    meta.currentUser = this.toRef('users', state.currentUser, state.users);
+
+    this.storage.setItem(this.baseKey, JSON.stringify({ ...record, layout: SPLIT_LAYOUT, state: meta }));
+    writtenKeys.push(this.baseKey);
+    return writtenKeys;
+  }
+
+  /** Forget what has been written so the next save rewrites every collection. */
+  forget(): void {
+    this.written.clear();
+    this.snapshotKeys = new Set();
+    this.writtenSnapshots = new WeakMap();
+  }
+
+  /** Removes the main record and every entity/snapshot key. */
+  clear(): void {
+    const prefix = `${this.baseKey}:`;
+    const keys: string[] = [];
+    for (let i = 0; i < this.storage.length; i++) {
+      const key = this.storage.key(i);
+      if (key && key.startsWith(prefix)) keys.push(key);
+    }
+    keys.forEach(key => this.storage.removeItem(key));
+    this.storage.removeItem(this.baseKey);
+    this.forget();
+  }
+
+  private toRef(entity: PersistedEntity, value: any, collection: Record<string, any> | undefined): unknown {
+    if (value && typeof value === 'object' && value.id && collection && collection[value.id] === value) {
+      return { $ref: entity, id: value.id } as EntityRef;
+    }
+    return value;
+  }
+
+  private serializeWgs(wgs: Record<string, any>, writtenKeys: string[]): string {
+    const keys = new Set<string>();
+    const out: Record<string, any> = {};
+    Object.entries(wgs).forEach(([wgId, wg]) => {
+      out[wgId] = this.detachSnapshots(wgId, wg, keys, writtenKeys);
+    });
+    const json = JSON.stringify(out);
+    this.snapshotKeys.forEach(key => { if (!keys.has(key)) this.storage.removeItem(key); });
+    this.snapshotKeys = keys;
+    return json;
+  }
+
+  private detachSnapshots(wgId: string, wg: any, keys: Set<string>, writtenKeys: string[]): any {
+    if (!wg || typeof wg !== 'object') return wg;
+    let copy: any = null;
+    PERIOD_LISTS.forEach(list => {
+      if (!Array.isArray(wg[list])) return;
+      copy = copy || { ...wg };
+      copy[list] = wg[list].map((period: any) => this.detachSnapshot(`${wgId}:${list}`, period, keys, writtenKeys));
+    });
+    return copy || wg;
+  }
+
+  private detachSnapshot(scope: string, period: any, keys: Set<string>, writtenKeys: string[]): any {
+    if (!period || typeof period !== 'object' || !Object.prototype.hasOwnProperty.call(period, 'savedState')) {
+      return period;
+    }
+    let key = `${this.baseKey}:snapshot:${scope}:${period.id}`;
+    while (keys.has(key)) key += '+';
+
+    const plain: Record<string, any> = {};
+    Object.keys(period).forEach(k => { if (k !== 'savedState') plain[k] = period[k]; });
+
+    const lazyKey = this.lazySnapshots.get(period);
+    if (lazyKey !== undefined) {
+      // Not hydrated yet: keep the stored JSON, moving it if the period moved.
+      if (lazyKey !== key) {
+        const raw = this.storage.getItem(lazyKey);
+        if (raw !== null) this.storage.setItem(key, raw);
+        this.lazySnapshots.set(period, key);
+        writtenKeys.push(key);
+      }
+      keys.add(key);
+      plain.savedState = { $snapshot: key } as SnapshotRef;
+      return plain;
+    }
+
+    const saved = period.savedState;
+    if (!saved || typeof saved !== 'object') {
+      plain.savedState = saved;
+      return plain;
+    }
+    if (this.writtenSnapshots.get(saved) !== key || !this.snapshotKeys.has(key)) {
+      this.storage.setItem(key, JSON.stringify(saved));
+      this.writtenSnapshots.set(saved, key);
+      writtenKeys.push(key);
+    }
+    keys.add(key);
+    plain.savedState = { $snapshot: key } as SnapshotRef;
+    return plain;
+  }
+
+  private installLazySnapshot(period: any, key: string, deserialize: (raw: any) => any): void {
+    this.lazySnapshots.set(period, key);
+    this.snapshotKeys.add(key);
+    const persistence = this;
+    const define = (value: any) => {
+      Object.defineProperty(period, 'savedState', { value, writable: true, enumerable: true, configurable: true });
+    };
+    Object.defineProperty(period, 'savedState', {
+      enumerable: true,
+      configurable: true,
+      get() {
+        const currentKey = persistence.lazySnapshots.get(period) ?? key;
+        persistence.lazySnapshots.delete(period);
+        let value: any;
+        try {
+          const raw = persistence.storage.getItem(currentKey);
+          value = raw ? deserialize(JSON.parse(raw)) : undefined;
+        } catch (error) {
+          console.warn(`[StatePersistence] Could not hydrate snapshot ${currentKey}:`, error);
+          value = undefined;
+        }
+        if (value && typeof value === 'object') persistence.writtenSnapshots.set(value, currentKey);
+        define(value);
+        return value;
+      },
+      set(value: any) {
+        persistence.lazySnapshots.delete(period);
+        define(value);
+      }
+    });
+  }
+}
@@ -0,0 +1,195 @@
+import { generateId } from '../utils/taskUtils';
+import { DeltaOp } from './stateDelta';
+
+// ========================================
+// SYNC-KANAL (CLIENT)
+// ========================================
+
+/** One change as broadcast by server/syncHub.js. */
+export interface SyncDelta {
+  seq: number;
+  origin: string | null;
+  clock: number;
+  at: string;
+  ops: DeltaOp[];
+  /** Highest `clock` the server has applied per client. */
+  vector: Record<string, number>;
+}
+
+/** Minimal EventSource surface, so tests can run several clients in-process. */
+export interface SyncEventSource {
+  addEventListener(type: string, listener: (event: { data: string }) => void): void;
+  close(): void;
+}
+
+export interface SyncChannelOptions {
+  baseUrl?: string;
+  clientId?: string;
+  fetch?: typeof fetch;
+  createEventSource?: (url: string) => SyncEventSource;
+  /** Remote changes to apply; ops on paths with unacknowledged local writes are left out. */
+  onDelta: (ops: DeltaOp[], delta: SyncDelta) => void;
+  /** Full state after the server could not fill a gap. */
+  onSnapshot: (data: { state: any; seq: number }) => void;
+}
+
+const pathKey = (path: string[]) => path.join('\u0000');
+const overlaps = (a: string, b: string) =>
+  a === b || a.startsWith(b + '\u0000') || b.startsWith(a + '\u0000');
+
+/**
+ * Client side of the push channel.
+ *
+ * Writes go out as PATCH deltas tagged with this client's id and a running
+ * `clock`; the server echoes every change to all clients over SSE in `seq`
+ * order. A delta is applied only if its `seq` directly follows the last one
+ * seen; on a gap the missing deltas are fetched from `/api/sync/changes`, and
+ * only if the server no longer has them the full state is reloaded.
+ *
+ * A local write stays pending until the server's version vector shows it
+ * (`vector[clientId] >= clock`). Remote ops on a pending path were sequenced
+ * before that write and would be overwritten by it, so they are skipped —
+ * otherwise the UI would briefly flip back to the older value.
+ */
+export class SyncChannel {
+  readonly clientId: string;
+  seq = 0;
+  vector: Record<string, number> = {};
+
+  private options: SyncChannelOptions;
+  private clock = 0;
+  private pending = new Map<number, string[]>();
+  // Writes in flight during a full reload: their echo must be applied, the snapshot may predate them
+  private replay = new Set<number>();
+  private source: SyncEventSource | null = null;
+  private catchingUp: Promise<void> | null = null;
+
+  constructor(options: SyncChannelOptions) {
+    this.options = options;
+    this.clientId = options.clientId || generateId();
+  }
+
+  /** Opens the event stream, continuing after `seq` (as returned by GET /api/data). */
+  connect(seq: number): void {
+    this.close();
+    this.seq = seq;
+    const create = this.options.createEventSource || ((url: string) => new EventSource(url) as SyncEventSource);
+    const source = create(`${this.options.baseUrl || ''}/api/sync/events?since=${seq}`);
+    source.addEventListener('hello', event => {
+      const hello = JSON.parse(event.data) as { seq: number; vector: Record<string, number> };
+      this.mergeVector(hello.vector);
+      // The server lost changes we have seen (e.g. restored backup): start over
+      if (hello.seq < this.seq) this.reload();
+    });
+    source.addEventListener('delta', event => this.receive(JSON.parse(event.data)));
+    source.addEventListener('resync', () => this.reload());
+    this.source = source;
+  }
+
+  close(): void {
+    this.source?.close();
+    this.source = null;
+  }
+
+  /** Sends local changes; resolves with the server's answer. */
+  async send(ops: DeltaOp[]): Promise<{ seq: number; savedAt: string }> {
+    const clock = ++this.clock;
+    // An empty PATCH is not journaled, so it would never be acknowledged
+    if (ops.length > 0) this.pending.set(clock, ops.map(op => pathKey(op.path)));
+    try {
+      const response = await this.fetch('/api/data', {
+        method: 'PATCH',
+        headers: {
+          'Content-Type': 'application/json',
+          'X-Sync-Client': this.clientId,
+          'X-Sync-Clock': String(clock)
+        },
+        body: JSON.stringify({ ops })
+      });
+      if (!response.ok) throw new Error(`HTTP ${response.status}`);
+      return await response.json();
+    } catch (error) {
+      // Remote ops skipped for this write will not be overwritten after all
+      this.pending.delete(clock);
+      this.reload();
+      throw error;
+    }
+  }
+
+  /** Handles one broadcast delta (also used when replaying fetched gaps). */
+  receive(delta: SyncDelta): void {
+    if (delta.seq <= this.seq) return;
+    if (delta.seq > this.seq + 1) {
+      this.catchUp();
+      return;
+    }
+    this.seq = delta.seq;
+    const own = delta.origin === this.clientId;
+    const replayOwn = own && this.replay.delete(delta.clock);
+    // Acknowledge first: a remote op sequenced after our write must win
+    this.mergeVector(delta.vector);
+
+    if (own) {
+      if (replayOwn) this.options.onDelta(delta.ops, delta);
+      return;
+    }
+    const pendingPaths = Array.from(this.pending.values()).flat();
+    const ops = pendingPaths.length === 0
+      ? delta.ops
+      : delta.ops.filter(op => !pendingPaths.some(path => overlaps(path, pathKey(op.path))));
+    if (ops.length > 0) this.options.onDelta(ops, delta);
+  }
+
+  /** Fetches the deltas after `seq`; reloads everything if the server cannot provide them. */
+  catchUp(): Promise<void> {
+    if (this.catchingUp) return this.catchingUp;
+    this.catchingUp = (async () => {
+      try {
+        const response = await this.fetch(`/api/sync/changes?since=${this.seq}`);
+        if (response.status === 410) {
+          await this.loadSnapshot();
+          return;
+        }
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        const { deltas } = await response.json() as { deltas: SyncDelta[] };
+        deltas.forEach(delta => this.receive(delta));
+      } catch (error) {
+        console.error('❌ [Sync] Catch-up failed:', error);
+      } finally {
+        this.catchingUp = null;
+      }
+    })();
+    return this.catchingUp;
+  }
+
+  private reload(): void {
+    this.loadSnapshot().catch(error => console.error('❌ [Sync] Reload failed:', error));
+  }
+
+  private async loadSnapshot(): Promise<void> {
+    const response = await this.fetch('/api/data');
+    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+    const data = await response.json();
+    this.pending.forEach((_, clock) => this.replay.add(clock));
+    this.seq = Number(data.seq) || 0;
+    this.options.onSnapshot({ state: data.state, seq: this.seq });
+  }
+
+  private mergeVector(vector: Record<string, number> = {}): void {
+    Object.entries(vector).forEach(([client, clock]) => {
+      if (!(this.vector[client] >= clock)) this.vector[client] = clock;
+    });
+    const acked = this.vector[this.clientId] || 0;
+    this.pending.forEach((_, clock) => {
+      if (clock <= acked) this.pending.delete(clock);
+    });
+    this.replay.forEach(clock => {
+      if (clock <= acked) this.replay.delete(clock);
+    });
+  }
+
+  private fetch(path: string, init?: RequestInit): Promise<Response> {
+    const impl = this.options.fetch || fetch;
+    return impl(`${this.options.baseUrl || ''}${path}`, init);
+  }
+}
@@ -435,6 +435,45 @@ class WhatsAppService {
     }
   }
 
+  /**
+   * Reiht eine Hot-Task-Benachrichtigung in die Server-Warteschlange ein.
+   * Wartet nicht auf WAHA: der Server bündelt kurz hintereinander erstellte
+   * Hot Tasks zu einer Nachricht und wiederholt fehlgeschlagene Sendungen.
+   */
+  async queueHotTaskNotification(taskName, taskDetails = '') {
+    try {
+      const response = await fetch('http://localhost:5175/api/whatsapp/notify', {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({
+          chatId: this.getTargetGroupId(),
+          title: taskName,
+          details: taskDetails
+        })
+      });
+
+      if (!response.ok) {
+        throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+      }
+
+      const result = await response.json();
+      console.log('📬 Hot Task Benachrichtigung eingereiht:', result.id);
+      return {
+        success: true,
+        message: '🔥 Hot Task Benachrichtigung wird gesendet',
+        queueId: result.id
+      };
+    } catch (error) {
+      console.error('❌ Fehler beim Einreihen der Hot Task Benachrichtigung:', error);
+      return {
+        success: false,
+        message: `Benachrichtigung konnte nicht eingereiht werden: ${error.message}`
+      };
+    }
+  }
+
   /**
    * Hauptfunktion: Prüft API, startet Service falls nötig, sendet Benachrichtigung
    */
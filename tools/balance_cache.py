@@ -0,0 +1,125 @@
+"""Persistent result cache for the balance checkers.
+
+Entries are keyed by check mode and absolute path and validated first by
+``(mtime_ns, size)`` and, if those changed, by a BLAKE2 hash of the content,
+so touching a file without editing it does not cause a rescan.  Entries for
+deleted files, entries written by another scanner version and the least
+recently used entries beyond ``max_entries`` are evicted on save.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_FILE = Path(__file__).resolve().parents[1] / '.balance-cache.json'
+DEFAULT_MAX_ENTRIES = 5000
+
+
+def file_digest(path: str) -> str:
+    with open(path, 'rb') as fh:
+        return hashlib.file_digest(fh, 'blake2b').hexdigest()
+
+
+class ResultCache:
+    def __init__(self, path: Path = DEFAULT_CACHE_FILE, *, scanner_version: str,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.scanner_version = scanner_version
+        self.max_entries = max_entries
+        self.entries: dict[str, dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return
+        if data.get('version') != CACHE_VERSION or data.get('scanner') != self.scanner_version:
+            self._dirty = True
+            return
+        self.entries = data.get('entries', {})
+
+    @staticmethod
+    def key(mode: str, path: str) -> str:
+        return f'{mode}:{os.path.abspath(path)}'
+
+    def lookup(self, mode: str, path: str) -> tuple[dict | None, tuple[int, int] | None]:
+        """Return ``(cached_result, stat)`` for ``path``; the result is None on a miss."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.misses += 1
+            return None, None
+        stat = (st.st_mtime_ns, st.st_size)
+        entry = self.entries.get(self.key(mode, path))
+        if entry is None:
+            self.misses += 1
+            return None, stat
+        if (entry['mtime_ns'], entry['size']) != stat:
+            if entry['size'] != st.st_size or entry['digest'] != file_digest(path):
+                self.misses += 1
+                return None, stat
+            entry['mtime_ns'] = st.st_mtime_ns
+        entry['used'] = time.time()
+        self._dirty = True
+        self.hits += 1
+        return entry['result'], stat
+
+    def store(self, mode: str, path: str, stat: tuple[int, int] | None, digest: str,
+              result: dict) -> None:
+        """Cache ``result``; ``digest`` must hash the bytes the result was computed from."""
+        if stat is None:
+            return
+        self.entries[self.key(mode, path)] = {
+            'mtime_ns': stat[0],
+            'size': stat[1],
+            'digest': digest,
+            'used': time.time(),
+            'result': result,
+        }
+        self._dirty = True
+
+    def evict(self) -> int:
+        """Drop entries for missing files and trim to ``max_entries``; return the count removed."""
+        before = len(self.entries)
+        self.entries = {
+            key: entry for key, entry in self.entries.items()
+            if os.path.exists(key.split(':', 1)[1])
+        }
+        if len(self.entries) > self.max_entries:
+            newest = sorted(self.entries.items(), key=lambda item: item[1]['used'], reverse=True)
+            self.entries = dict(newest[:self.max_entries])
+        removed = before - len(self.entries)
+        self._dirty = self._dirty or removed > 0
+        return removed
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.evict()
+        # A unique temp file per writer, so concurrent runs (editor hook and
+        # pre-commit) never replace the cache with each other's partial write
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f'{self.path.name}.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+                json.dump({
+                    'version': CACHE_VERSION,
+                    'scanner': self.scanner_version,
+                    'entries': self.entries,
+                }, fh)
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        self._dirty = False
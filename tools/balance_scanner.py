@@ -0,0 +1,483 @@
+"""Shared bracket / string / template-literal scanner for the balance checkers.
+
+Used by ``tools/check_balance.py``, ``tools/scan_backticks.py`` and
+``scripts/check_balance.py``.  Files are memory-mapped and tokenized with
+compiled byte regexes: in code the scanner jumps straight to the next
+interesting byte (brackets, quotes, ``/``), and string, comment, regex and
+template bodies are skipped with one ``search``/``find`` per escape or
+terminator instead of one Python step per character.  All delimiters are
+ASCII, so scanning raw UTF-8 bytes is safe.
+
+For ``.html`` files only inline ``<script>`` blocks are scanned.  Many files
+(paths, directories or globs) are scanned in parallel with a process pool and
+results can be emitted as JSON, e.g. as a pre-commit gate::
+
+    python tools/check_balance.py debug-demo.html putzplan-app/src --json
+
+Results are cached on disk (see balance_cache.py) so unchanged files are not
+rescanned; ``--watch`` keeps polling and rescans only files that changed, and
+``--timings`` reports where scan time went::
+
+    python tools/check_balance.py putzplan-app/src --watch --timings
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import hashlib
+import json
+import mmap
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from balance_cache import DEFAULT_CACHE_FILE, ResultCache
+
+SCANNER_VERSION = '1'
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_TARGETS = ('debug-demo.html',)
+SOURCE_SUFFIXES = frozenset({'.js', '.jsx', '.mjs', '.cjs', '.ts', '.tsx', '.html', '.htm'})
+HTML_SUFFIXES = frozenset({'.html', '.htm'})
+SKIP_DIRS = frozenset({
+    '.git', '.vite', 'node_modules', 'dist', 'build', 'coverage',
+    'playwright-report', 'test-results', '__pycache__',
+})
+
+PAIRS = {b'(': b')', b'[': b']', b'{': b'}'}
+CLOSERS = {v: k for k, v in PAIRS.items()}
+
+# Next token that matters while in plain code.
+_CODE_TOKEN = re.compile(rb"[()\[\]{}\"'`/]")
+# Escape or terminator inside the various literal bodies.
+_QUOTE_END = {b'"': re.compile(rb'[\\"\n]'), b"'": re.compile(rb"[\\'\n]")}
+_TEMPLATE_END = re.compile(rb"\\|`|\$\{")
+_REGEX_END = re.compile(rb"[\\/\[\]\n]")
+_SCRIPT_OPEN = re.compile(rb"<script\b([^>]*)>", re.IGNORECASE)
+_SCRIPT_CLOSE = re.compile(rb"</script\s*>", re.IGNORECASE)
+_SRC_ATTR = re.compile(rb"\bsrc\s*=", re.IGNORECASE)
+_WORD_BEFORE = re.compile(rb"([A-Za-z_$][\w$]*)$")
+
+# After these bytes a '/' starts a regex literal rather than a division.
+_REGEX_PRECEDERS = frozenset(b'(,=:[!&|?{};+-*%<>~^')
+_REGEX_KEYWORDS = frozenset({
+    b'return', b'typeof', b'instanceof', b'in', b'of', b'new', b'delete',
+    b'void', b'throw', b'case', b'do', b'else', b'yield', b'await',
+})
+_WHITESPACE = frozenset(b' \t\r\n\f\v')
+_LOOKBEHIND = 64
+
+
+@dataclass
+class Issue:
+    kind: str
+    message: str
+    line: int
+    col: int
+    opened_at: list[int] | None = None
+    context: str = ''
+
+
+@dataclass
+class ScanResult:
+    path: str
+    ok: bool
+    size: int = 0
+    elapsed_ms: float = 0.0
+    issues: list[Issue] = field(default_factory=list)
+    cached: bool = False
+    digest: str = ''
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ScanResult':
+        issues = [Issue(**issue) for issue in data.get('issues', [])]
+        return cls(**{**data, 'issues': issues})
+
+
+class _Found(Exception):
+    """Raised inside the tokenizer to stop at the first structural problem."""
+
+    def __init__(self, kind: str, message: str, offset: int, opened: int | None = None):
+        super().__init__(message)
+        self.kind = kind
+        self.message = message
+        self.offset = offset
+        self.opened = opened
+
+
+def _starts_regex(buf, pos: int, start: int) -> bool:
+    """Guess whether the '/' at ``pos`` begins a regex literal."""
+    i = pos - 1
+    while i >= start and buf[i] in _WHITESPACE:
+        i -= 1
+    if i < start:
+        return True
+    prev = buf[i]
+    if prev == 0x3C and i == pos - 1:  # '</' closes a JSX/HTML tag
+        return False
+    if prev in _REGEX_PRECEDERS:
+        return True
+    word = _WORD_BEFORE.search(buf[max(start, i + 1 - _LOOKBEHIND):i + 1])
+    return bool(word) and word.group(1) in _REGEX_KEYWORDS
+
+
+def _skip_quoted(buf, pos: int, end: int, quote: bytes) -> int:
+    """Return the offset just past the closing quote of a string at ``pos``."""
+    pattern = _QUOTE_END[quote]
+    i = pos + 1
+    while True:
+        m = pattern.search(buf, i, end)
+        if m is None or m.group() == b'\n':
+            raise _Found('unclosed-string', f'Unclosed string literal ({quote.decode()})', pos)
+        if m.group() == b'\\':
+            i = m.end() + (2 if buf[m.end():m.end() + 2] == b'\r\n' else 1)
+            continue
+        return m.end()
+
+
+def _skip_regex(buf, pos: int, end: int) -> int | None:
+    """Return the offset past a regex literal at ``pos``, or None if it is not one."""
+    i = pos + 1
+    in_class = False
+    while True:
+        m = _REGEX_END.search(buf, i, end)
+        if m is None or m.group() == b'\n':
+            return None
+        tok = m.group()
+        if tok == b'\\':
+            i = m.end() + 1
+        elif tok == b'[':
+            in_class = True
+            i = m.end()
+        elif tok == b']':
+            in_class = False
+            i = m.end()
+        elif in_class:
+            i = m.end()
+        else:
+            return m.end()
+
+
+def _scan_region(buf, start: int, end: int, check_brackets: bool) -> None:
+    """Tokenize ``buf[start:end]`` as JavaScript/TypeScript, raising ``_Found`` on errors."""
+    stack: list[tuple[bytes, int]] = []
+    pos = start
+    while True:
+        if stack and stack[-1][0] == b'`':
+            m = _TEMPLATE_END.search(buf, pos, end)
+            if m is None:
+                break
+            tok = m.group()
+            if tok == b'\\':
+                pos = m.end() + 1
+            elif tok == b'`':
+                stack.pop()
+                pos = m.end()
+            else:
+                stack.append((b'${', m.start()))
+                pos = m.end()
+            continue
+
+        m = _CODE_TOKEN.search(buf, pos, end)
+        if m is None:
+            break
+        tok = m.group()
+        p = m.start()
+        pos = m.end()
+
+        if tok in _QUOTE_END:
+            pos = _skip_quoted(buf, p, end, tok)
+        elif tok == b'`':
+            stack.append((tok, p))
+        elif tok == b'/':
+            nxt = buf[pos:pos + 1]
+            if nxt == b'/':
+                nl = buf.find(b'\n', pos, end)
+                pos = end if nl < 0 else nl + 1
+            elif nxt == b'*':
+                close = buf.find(b'*/', pos + 1, end)
+                if close < 0:
+                    raise _Found('unclosed-comment', 'Unclosed block comment', p)
+                pos = close + 2
+            elif _starts_regex(buf, p, start):
+                pos = _skip_regex(buf, p, end) or pos
+        elif tok in PAIRS:
+            stack.append((tok, p))
+        else:
+            top = stack[-1][0] if stack else None
+            if tok == b'}' and top == b'${':
+                stack.pop()
+            elif top == CLOSERS[tok]:
+                stack.pop()
+            elif check_brackets:
+                if top is None or top == b'`':
+                    raise _Found('unmatched-closer', f'Unmatched closing {tok.decode()}', p)
+                raise _Found(
+                    'mismatched',
+                    f'Mismatched {top.decode()} closed by {tok.decode()}',
+                    p, stack[-1][1],
+                )
+
+    for tok, offset in reversed(stack):
+        if tok in (b'`', b'${'):
+            raise _Found('unclosed-template', 'Unclosed template literal', offset)
+    if stack and check_brackets:
+        tok, offset = stack[-1]
+        raise _Found('unclosed-opener', f'Unclosed opener {tok.decode()}', offset)
+
+
+def _script_regions(buf, size: int):
+    """Yield (start, end) byte ranges of inline <script> bodies in an HTML buffer."""
+    pos = 0
+    while True:
+        m = _SCRIPT_OPEN.search(buf, pos, size)
+        if m is None:
+            return
+        close = _SCRIPT_CLOSE.search(buf, m.end(), size)
+        body_end = close.start() if close else size
+        if not _SRC_ATTR.search(m.group(1)):
+            yield m.end(), body_end
+        pos = close.end() if close else size
+
+
+def _position(buf, offset: int) -> tuple[int, int]:
+    """1-based line and character column of a byte offset."""
+    line = buf[:offset].count(b'\n') + 1
+    line_start = buf.rfind(b'\n', 0, offset) + 1
+    col = len(buf[line_start:offset].decode('utf-8', 'replace')) + 1
+    return line, col
+
+
+def _context(buf, offset: int, before: int = 2, after: int = 2) -> str:
+    """A few lines of source around ``offset`` for diagnostics."""
+    start = buf.rfind(b'\n', 0, offset) + 1
+    for _ in range(before):
+        if start == 0:
+            break
+        start = buf.rfind(b'\n', 0, start - 1) + 1
+    stop = offset
+    for _ in range(after + 1):
+        nl = buf.find(b'\n', stop + 1)
+        if nl < 0:
+            stop = len(buf)
+            break
+        stop = nl
+    return buf[start:stop].decode('utf-8', 'replace')
+
+
+def scan_buffer(buf, *, html: bool = False, check_brackets: bool = True) -> list[Issue]:
+    """Scan an in-memory bytes-like buffer (bytes, mmap, ...) and return found issues."""
+    size = len(buf)
+    regions = list(_script_regions(buf, size)) if html else [(0, size)]
+    for start, end in regions:
+        try:
+            _scan_region(buf, start, end, check_brackets)
+        except _Found as found:
+            line, col = _position(buf, found.offset)
+            opened_at = list(_position(buf, found.opened)) if found.opened is not None else None
+            return [Issue(found.kind, found.message, line, col, opened_at, _context(buf, found.offset))]
+    return []
+
+
+def scan_file(path: str, check_brackets: bool = True) -> ScanResult:
+    """Scan a single file through a read-only memory map.
+
+    ``digest`` is the BLAKE2 hash of the scanned bytes, so a cache entry always
+    pairs a result with the content it was computed from.
+    """
+    started = time.perf_counter()
+    html = Path(path).suffix.lower() in HTML_SUFFIXES
+    digest = ''
+    try:
+        with open(path, 'rb') as fh:
+            size = os.fstat(fh.fileno()).st_size
+            if size == 0:
+                issues = []
+                digest = hashlib.blake2b(b'').hexdigest()
+            else:
+                with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                    issues = scan_buffer(buf, html=html, check_brackets=check_brackets)
+                    digest = hashlib.blake2b(buf).hexdigest()
+    except OSError as exc:
+        size = 0
+        issues = [Issue('io-error', str(exc), 0, 0)]
+    elapsed = (time.perf_counter() - started) * 1000
+    return ScanResult(path, not issues, size, round(elapsed, 3), issues, digest=digest)
+
+
+def _walk(directory: Path):
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in SOURCE_SUFFIXES:
+                yield os.path.join(root, name)
+
+
+def expand_targets(patterns, base: Path | None = None) -> list[str]:
+    """Resolve files, directories and (recursive) globs into a de-duplicated file list."""
+    base = base or Path.cwd()
+    seen: dict[str, None] = {}
+    for pattern in patterns:
+        candidate = Path(pattern)
+        if not candidate.is_absolute():
+            candidate = base / candidate
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(str(candidate), recursive=True))
+            for match in matches:
+                if os.path.isdir(match):
+                    seen.update(dict.fromkeys(_walk(Path(match))))
+                else:
+                    seen[match] = None
+        elif candidate.is_dir():
+            seen.update(dict.fromkeys(_walk(candidate)))
+        else:
+            seen[str(candidate)] = None
+    return list(seen)
+
+
+def _scan_one(args: tuple[str, bool]) -> ScanResult:
+    return scan_file(*args)
+
+
+def scan_paths(paths, *, check_brackets: bool = True, jobs: int | None = None) -> list[ScanResult]:
+    """Scan many files, in parallel when there is more than one and ``jobs`` != 1."""
+    work = [(p, check_brackets) for p in paths]
+    if jobs == 1 or len(work) < 2:
+        return [_scan_one(w) for w in work]
+    workers = min(jobs or os.cpu_count() or 1, len(work))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_scan_one, work, chunksize=max(1, len(work) // (workers * 4))))
+
+
+def scan_paths_cached(paths, cache: ResultCache | None, *, check_brackets: bool = True,
+                      jobs: int | None = None) -> list[ScanResult]:
+    """Like ``scan_paths`` but serve unchanged files from ``cache`` and store new results."""
+    if cache is None:
+        return scan_paths(paths, check_brackets=check_brackets, jobs=jobs)
+    mode = 'balance' if check_brackets else 'backticks'
+    results: dict[str, ScanResult] = {}
+    stats: dict[str, tuple[int, int] | None] = {}
+    for path in paths:
+        hit, stats[path] = cache.lookup(mode, path)
+        if hit is not None:
+            results[path] = ScanResult.from_dict({**hit, 'path': path, 'cached': True})
+    misses = [p for p in paths if p not in results]
+    for result in scan_paths(misses, check_brackets=check_brackets, jobs=jobs):
+        results[result.path] = result
+        if result.digest:
+            cache.store(mode, result.path, stats[result.path], result.digest, result.to_dict())
+    cache.save()
+    return [results[p] for p in paths]
+
+
+def timing_report(results: list[ScanResult], wall_ms: float, top: int, out=sys.stderr) -> None:
+    """Summarize cache hits and list the ``top`` slowest freshly scanned files."""
+    scanned = [r for r in results if not r.cached]
+    scan_ms = sum(r.elapsed_ms for r in scanned)
+    print(f'[timings] {len(results)} file(s): {len(scanned)} scanned, '
+          f'{len(results) - len(scanned)} cached; scan {scan_ms:.1f} ms, wall {wall_ms:.1f} ms',
+          file=out)
+    for result in sorted(scanned, key=lambda r: r.elapsed_ms, reverse=True)[:top]:
+        print(f'[timings] {result.elapsed_ms:9.3f} ms  {result.size:>9} B  '
+              f'{_display_path(result.path)}', file=out)
+
+
+def _display_path(path: str) -> str:
+    try:
+        return os.path.relpath(path)
+    except ValueError:
+        return path
+
+
+def report(results: list[ScanResult], *, as_json: bool, ok_message: str, out=sys.stdout) -> int:
+    """Print results as text or JSON; return the process exit code."""
+    failed = [r for r in results if not r.ok]
+    if as_json:
+        json.dump({
+            'ok': not failed,
+            'files': len(results),
+            'failed': len(failed),
+            'results': [r.to_dict() for r in results],
+        }, out, indent=2)
+        out.write('\n')
+        return 1 if failed else 0
+
+    for result in failed:
+        for issue in result.issues:
+            where = f'{_display_path(result.path)}:{issue.line}:{issue.col}'
+            opened = f' (opened at {issue.opened_at[0]}:{issue.opened_at[1]})' if issue.opened_at else ''
+            print(f'{where}: {issue.message}{opened}', file=out)
+            if issue.context:
+                print('--- context ---', file=out)
+                print(issue.context, file=out)
+                print('---------------', file=out)
+    if failed:
+        print(f'FAILED: {len(failed)} of {len(results)} file(s)', file=out)
+        return 1
+    print(f'{ok_message} ({len(results)} file(s))', file=out)
+    return 0
+
+
+def build_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('paths', nargs='*',
+                        help='files, directories or globs (default: debug-demo.html)')
+    parser.add_argument('--json', action='store_true', help='emit machine-readable JSON')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='worker processes (default: CPU count, 1 = serial)')
+    parser.add_argument('--no-cache', action='store_true', help='ignore the on-disk result cache')
+    parser.add_argument('--cache-file', type=Path, default=DEFAULT_CACHE_FILE,
+                        help=f'result cache location (default: {DEFAULT_CACHE_FILE.name} in the repo root)')
+    parser.add_argument('--watch', action='store_true', help='keep running and rescan changed files')
+    parser.add_argument('--interval', type=float, default=0.5, help='watch poll interval in seconds')
+    parser.add_argument('--timings', nargs='?', type=int, const=10, default=None, metavar='N',
+                        help='report scan time and the N slowest files (default N: 10)')
+    return parser
+
+
+def _stat_key(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def main(argv=None, *, description: str, check_brackets: bool = True, ok_message: str = 'OK') -> int:
+    args = build_parser(description).parse_args(argv)
+    cache = None if args.no_cache else ResultCache(args.cache_file, scanner_version=SCANNER_VERSION)
+
+    def targets() -> list[str]:
+        if args.paths:
+            return expand_targets(args.paths)
+        return expand_targets(DEFAULT_TARGETS, REPO_ROOT)
+
+    def run(paths: list[str]) -> int:
+        started = time.perf_counter()
+        results = scan_paths_cached(paths, cache, check_brackets=check_brackets, jobs=args.jobs)
+        code = report(results, as_json=args.json, ok_message=ok_message)
+        if args.timings is not None:
+            timing_report(results, (time.perf_counter() - started) * 1000, args.timings)
+        return code
+
+    if not args.watch:
+        return run(targets())
+
+    known: dict[str, tuple[int, int] | None] = {}
+    try:
+        while True:
+            current = {path: _stat_key(path) for path in targets()}
+            changed = [path for path, stat in current.items() if known.get(path) != stat]
+            if changed:
+                run(changed)
+                sys.stdout.flush()
+            known = current
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        return 0
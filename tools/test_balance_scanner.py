@@ -0,0 +1,126 @@
+"""Tests for the shared balance scanner and its result cache.
+
+Run with ``python -m pytest tools``.
+"""
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from balance_cache import ResultCache
+from balance_scanner import SCANNER_VERSION, scan_buffer, scan_file, scan_paths, scan_paths_cached
+
+
+def kinds(source: str, **kwargs) -> list[str]:
+    return [issue.kind for issue in scan_buffer(source.encode('utf-8'), **kwargs)]
+
+
+@pytest.mark.parametrize('source', [
+    'const ratio = width / 2 + (height / 3);',
+    'const half = (a + b) / 2; const third = items[0] / 3;',
+    'const re = /[(]/; call(re);',
+    'if (/\\)/.test(s)) { run(); }',
+    'function f(s) { return /[{]+/g.exec(s); }',
+    'const x = a\n  / b / (c);',
+    'const el = <div>{value}</div>;',
+])
+def test_tells_regex_literals_from_division(source):
+    assert kinds(source) == []
+
+
+@pytest.mark.parametrize('source', [
+    'const s = `a ${b ? `c ${d}` : "}"} e`;',
+    'const s = `${ {x: 1}.x } and ${[1, 2].map(n => `(${n}`)}`;',
+    'const s = `escaped \\` and \\${ not (code }`;',
+    'const s = "(" + \'[\' + "it\\"s {"; // ) ]',
+    'const s = 1; /* ) } ] */ call();',
+])
+def test_skips_brackets_in_strings_comments_and_templates(source):
+    assert kinds(source) == []
+
+
+@pytest.mark.parametrize('source, kind', [
+    ('const s = `abc ${x}', 'unclosed-template'),
+    ('const s = `abc ${f(x)', 'unclosed-template'),
+    ("const s = 'abc;\ncall();", 'unclosed-string'),
+    ('call(); /* never closed', 'unclosed-comment'),
+    ('call(a]', 'mismatched'),
+    ('call(a))', 'unmatched-closer'),
+    ('if (a) {', 'unclosed-opener'),
+])
+def test_reports_the_first_structural_problem(source, kind):
+    assert kinds(source) == [kind]
+
+
+def test_backtick_mode_ignores_brackets():
+    assert kinds('call(a]', check_brackets=False) == []
+    assert kinds('const s = `abc', check_brackets=False) == ['unclosed-template']
+
+
+def test_positions_count_characters_and_point_at_the_opener():
+    [issue] = scan_buffer('const ü = "ä";\nfoo(a]\n'.encode('utf-8'))
+    assert (issue.kind, issue.line, issue.col, issue.opened_at) == ('mismatched', 2, 6, [2, 4])
+    assert 'foo(a]' in issue.context
+
+
+def test_html_scans_only_inline_script_bodies():
+    page = (
+        '<p>Text with ( and `</p>\n'
+        '<script src="app.js">(</script>\n'
+        '<script type="module">const a = [1, 2];</script>\n'
+    )
+    assert kinds(page, html=True) == []
+
+    broken = page + '<script>\nfunction f() {\n</script>\n'
+    [issue] = scan_buffer(broken.encode('utf-8'), html=True)
+    assert (issue.kind, issue.line) == ('unclosed-opener', 5)
+
+
+@pytest.fixture
+def sources(tmp_path):
+    good = tmp_path / 'good.js'
+    good.write_text('export const f = (a) => `${a / 2}`;\n', encoding='utf-8')
+    broken = tmp_path / 'broken.ts'
+    broken.write_text('export function g() {\n  return [1, 2;\n}\n', encoding='utf-8')
+    page = tmp_path / 'page.html'
+    page.write_text('<script>const t = `open\n</script>\n', encoding='utf-8')
+    return [str(good), str(broken), str(page)]
+
+
+def test_scan_file_reports_a_known_broken_file(sources):
+    good, broken, page = (scan_file(path) for path in sources)
+    assert good.ok and good.issues == [] and good.digest
+    assert not broken.ok
+    assert [(i.kind, i.line, i.opened_at) for i in broken.issues] == [('mismatched', 3, [2, 10])]
+    assert [i.kind for i in page.issues] == ['unclosed-template']
+
+
+def test_parallel_scan_matches_sequential(sources):
+    def summary(results):
+        return [(r.path, r.ok, [(i.kind, i.line, i.col) for i in r.issues]) for r in results]
+
+    assert summary(scan_paths(sources, jobs=2)) == summary(scan_paths(sources, jobs=1))
+
+
+def test_cache_returns_the_same_result_as_a_fresh_scan(tmp_path, sources):
+    def summary(results):
+        return [(r.path, r.ok, r.size, r.issues) for r in results]
+
+    fresh = scan_paths(sources, jobs=1)
+    cache_file = tmp_path / 'cache.json'
+
+    first = scan_paths_cached(sources, ResultCache(cache_file, scanner_version=SCANNER_VERSION), jobs=1)
+    cache = ResultCache(cache_file, scanner_version=SCANNER_VERSION)
+    second = scan_paths_cached(sources, cache, jobs=1)
+    assert summary(first) == summary(second) == summary(fresh)
+    assert [r.cached for r in second] == [True, True, True]
+
+    # Touching a file without editing it keeps the entry; editing it rescans
+    os.utime(sources[0])
+    with open(sources[1], 'w', encoding='utf-8') as fh:
+        fh.write('export function g() {\n  return [1, 2];\n}\n')
+    third = scan_paths_cached(sources, ResultCache(cache_file, scanner_version=SCANNER_VERSION), jobs=1)
+    assert [r.cached for r in third] == [True, False, True]
+    assert third[1].ok
+    assert summary(third) == summary(scan_paths(sources, jobs=1))